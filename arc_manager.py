@@ -18,9 +18,9 @@ DEFAULT_VILLAIN = {
 class ArcManager:
     """Manage campaign-level story arcs and villains."""
 
-    def __init__(self, campaign_name: str) -> None:
+    def __init__(self, campaign_name: str, campaign: CampaignManager | None = None) -> None:
         self.campaign_name = campaign_name
-        self.campaign = CampaignManager(campaign_name)
+        self.campaign = campaign or CampaignManager(campaign_name)
         self.dm_memory = WorldMemoryManager(campaign_name, hidden=True)
         self.villain_id = self._ensure_villain()
 
@@ -29,15 +29,15 @@ class ArcManager:
     # --------------------------------------------------------------
     def _ensure_villain(self) -> str:
         """Return the existing villain ID or create a default villain."""
-        villains = self.dm_memory.search_memory("", type_filter="villain")
+        villains = self.dm_memory.find_ids(type="villain")
         if villains:
-            return villains[0]["id"]
+            return villains[0]
         return self.dm_memory.add_memory_entry(DEFAULT_VILLAIN)
 
     def get_villain(self) -> Dict[str, Any]:
         """Return the current villain entry."""
-        results = self.dm_memory.search_memory("", type_filter="villain")
-        return results[0] if results else {}
+        villains = self.dm_memory.find_ids(type="villain")
+        return self.dm_memory.get_entry(villains[0]) if villains else {}
 
     def progress_villain(self, description: str) -> str:
         """Record the villain's latest move in the DM event log."""
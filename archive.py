@@ -0,0 +1,250 @@
+"""Streaming export and import of whole campaigns as compressed archives."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+from . import campaign_manager
+
+ARCHIVE_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+CHUNK_SIZE = 1 << 20
+
+# Top-level folders inside an archive
+CAMPAIGN_PREFIX = "campaign"
+JOURNAL_PREFIX = "journals"
+JOURNAL_SUFFIX = "_journal.json"
+
+
+def _journal_dir(name: str) -> str:
+    """Return the folder ``JournalManager`` uses for ``name``'s journals."""
+    safe = name.lower().replace(" ", "_")
+    return os.path.join(campaign_manager.CAMPAIGNS_DIR, safe, "players")
+
+
+def _check_name(name: Any) -> str:
+    """Return ``name`` if it is safe to use as a campaign folder name."""
+    if (
+        not isinstance(name, str)
+        or not name.strip()
+        or ".." in name
+        or "/" in name
+        or "\\" in name
+        or os.path.isabs(name)
+        or os.path.splitdrive(name)[0]
+    ):
+        raise ValueError(f"Invalid campaign name: {name!r}")
+    return name
+
+
+class _HashingReader:
+    """File wrapper computing a SHA-256 digest of everything read."""
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        self.sha = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fp.read(size)
+        self.sha.update(data)
+        return data
+
+
+def _iter_sources(name: str) -> List[Tuple[str, str]]:
+    """Return ``(archive_name, path)`` pairs for every file of a campaign."""
+    root = os.path.join(campaign_manager.CAMPAIGNS_DIR, name)
+    files: List[Tuple[str, str]] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            files.append((f"{CAMPAIGN_PREFIX}/{rel}", path))
+    journal_dir = _journal_dir(name)
+    if os.path.normpath(journal_dir) != os.path.normpath(os.path.join(root, "players")):
+        if os.path.isdir(journal_dir):
+            for filename in sorted(os.listdir(journal_dir)):
+                if filename.endswith(JOURNAL_SUFFIX):
+                    files.append((f"{JOURNAL_PREFIX}/{filename}", os.path.join(journal_dir, filename)))
+    return files
+
+
+def export_campaign(name: str, dest: str | None = None) -> str:
+    """Write ``name`` and its player journals to a ``.tar.gz`` archive.
+
+    Files are streamed one chunk at a time, so memory use does not depend on
+    campaign size. A manifest with sizes and SHA-256 checksums is appended
+    as the last member. Returns the archive path.
+    """
+    root = os.path.join(campaign_manager.CAMPAIGNS_DIR, name)
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Campaign not found: {name}")
+    dest = dest or f"{name.replace(' ', '_')}.tar.gz"
+    version = None
+    version_file = os.path.join(root, "version.json")
+    if os.path.exists(version_file):
+        with open(version_file, "r", encoding="utf-8") as f:
+            version = json.load(f).get("version")
+
+    entries: List[Dict[str, Any]] = []
+    with tarfile.open(dest, "w:gz") as tar:
+        for arcname, path in _iter_sources(name):
+            info = tar.gettarinfo(path, arcname=arcname)
+            with open(path, "rb") as fp:
+                reader = _HashingReader(fp)
+                tar.addfile(info, reader)
+            entries.append({"path": arcname, "size": info.size, "sha256": reader.sha.hexdigest()})
+
+        manifest = {
+            "format": ARCHIVE_FORMAT,
+            "campaign": name,
+            "version": version,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "files": entries,
+        }
+        raw = json.dumps(manifest, indent=2).encode("utf-8")
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(raw)
+        info.mtime = int(datetime.now(timezone.utc).timestamp())
+        tar.addfile(info, io.BytesIO(raw))
+    return dest
+
+
+def _check_member(member: tarfile.TarInfo) -> None:
+    """Reject archive members that could escape the staging folder."""
+    name = member.name
+    parts = name.split("/")
+    if name.startswith("/") or ".." in parts or "\\" in name:
+        raise ValueError(f"Unsafe path in archive: {name}")
+    if member.isdir():
+        return
+    if not member.isfile():
+        raise ValueError(f"Unsupported archive member: {name}")
+    if name != MANIFEST_NAME and parts[0] not in (CAMPAIGN_PREFIX, JOURNAL_PREFIX):
+        raise ValueError(f"Unexpected archive member: {name}")
+    if parts[0] == JOURNAL_PREFIX and (len(parts) != 2 or not parts[1].endswith(JOURNAL_SUFFIX)):
+        raise ValueError(f"Unexpected journal member: {name}")
+
+
+def _place_journals(journals: List[str], journal_dir: str, staging: str) -> List[str]:
+    """Move staged ``journals`` into ``journal_dir``; return the paths to remove to undo it."""
+    for path in journals:
+        if os.path.exists(os.path.join(journal_dir, os.path.basename(path))):
+            raise FileExistsError(f"Journal already exists: {os.path.basename(path)}")
+    root = os.path.dirname(journal_dir)
+    if not os.path.exists(root):
+        # a new folder: build it in staging and rename it into place at once
+        staged_root = os.path.join(staging, "journal_root")
+        staged_dir = os.path.join(staged_root, os.path.basename(journal_dir))
+        os.makedirs(staged_dir)
+        for path in journals:
+            os.replace(path, os.path.join(staged_dir, os.path.basename(path)))
+        os.replace(staged_root, root)
+        return [root]
+    os.makedirs(journal_dir, exist_ok=True)
+    placed = []
+    for path in journals:
+        dest = os.path.join(journal_dir, os.path.basename(path))
+        os.replace(path, dest)
+        placed.append(dest)
+    return placed
+
+
+def import_campaign(archive_path: str, new_name: str | None = None) -> str:
+    """Restore a campaign from ``archive_path`` and return its name.
+
+    Members are validated and checksummed while they are streamed into a
+    staging folder. The campaign only appears under ``CAMPAIGNS_DIR`` once
+    every checksum matched, via a single directory rename; journals are
+    placed just before it and removed again if that rename fails.
+    ``new_name`` imports the campaign under a different name. Names with
+    path separators or ``..`` raise ``ValueError``.
+    """
+    if new_name is not None:
+        _check_name(new_name)
+    os.makedirs(campaign_manager.CAMPAIGNS_DIR, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".import-", dir=campaign_manager.CAMPAIGNS_DIR)
+    try:
+        manifest: Dict[str, Any] | None = None
+        seen: Dict[str, Tuple[int, str]] = {}
+        with tarfile.open(archive_path, "r|gz") as tar:
+            for member in tar:
+                _check_member(member)
+                if member.isdir():
+                    continue
+                src = tar.extractfile(member)
+                if member.name == MANIFEST_NAME:
+                    manifest = json.load(src)
+                    continue
+                if member.name in seen:
+                    raise ValueError(f"Duplicate archive member: {member.name}")
+                target = os.path.join(staging, *member.name.split("/"))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                sha = hashlib.sha256()
+                size = 0
+                with open(target, "wb") as out:
+                    while True:
+                        chunk = src.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        sha.update(chunk)
+                        size += len(chunk)
+                        out.write(chunk)
+                seen[member.name] = (size, sha.hexdigest())
+
+        if manifest is None:
+            raise ValueError("Archive has no manifest")
+        if manifest.get("format") != ARCHIVE_FORMAT:
+            raise ValueError(f"Unsupported archive format: {manifest.get('format')}")
+        expected = {f["path"]: (f["size"], f["sha256"]) for f in manifest.get("files", [])}
+        if set(expected) != set(seen):
+            raise ValueError("Archive contents do not match manifest")
+        for path, digest in expected.items():
+            if seen[path] != tuple(digest):
+                raise ValueError(f"Checksum mismatch for {path}")
+
+        name = _check_name(new_name or manifest.get("campaign"))
+        target_dir = os.path.join(campaign_manager.CAMPAIGNS_DIR, name)
+        if os.path.exists(target_dir):
+            raise FileExistsError(f"Campaign already exists: {name}")
+        staged_campaign = os.path.join(staging, CAMPAIGN_PREFIX)
+        staged_players = os.path.join(staged_campaign, "players")
+        os.makedirs(staged_players, exist_ok=True)
+
+        # journals may sit in the campaign folder or beside it depending on
+        # the exported name; collect them and place them for ``name``
+        journals = [
+            os.path.join(staged_players, f) for f in os.listdir(staged_players) if f.endswith(JOURNAL_SUFFIX)
+        ]
+        staged_journals = os.path.join(staging, JOURNAL_PREFIX)
+        if os.path.isdir(staged_journals):
+            journals += [os.path.join(staged_journals, f) for f in os.listdir(staged_journals)]
+        journal_dir = _journal_dir(name)
+        placed: List[str] = []
+        if os.path.normpath(journal_dir) == os.path.normpath(os.path.join(target_dir, "players")):
+            for path in journals:
+                os.replace(path, os.path.join(staged_players, os.path.basename(path)))
+        elif journals:
+            placed = _place_journals(journals, journal_dir, staging)
+
+        # the campaign appears with one rename; undo the journals if it fails
+        try:
+            os.replace(staged_campaign, target_dir)
+        except BaseException:
+            for path in placed:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.exists(path):
+                    os.remove(path)
+            raise
+        return name
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
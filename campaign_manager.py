@@ -1,13 +1,12 @@
 """Campaign management module for a TTRPG chatbot engine."""
 
+import copy
 import json
 import os
-import uuid
 import shutil
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
-from typing import Dict, Any, List
-
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
 
 
 def deep_update(orig: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
@@ -26,8 +25,56 @@ def deep_update(orig: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
 PLAYERS_DIR = os.path.join(os.getcwd(), "players")
 CAMPAIGNS_DIR = os.path.join(os.getcwd(), "campaigns")
 
-# Campaign data schema versioning
-VERSION = 1
+# Campaign data schema versioning. Bump together with a new step in
+# ``migrations.py``.
+VERSION = 3
+
+# Contents of a new player state file
+DEFAULT_PLAYER_STATE: Dict[str, Any] = {
+    "platinum": 0,
+    "gold": 0,
+    "silver": 0,
+    "copper": 0,
+    "inventory": [],
+    "quests": [],
+}
+
+# Callbacks invoked with ``(campaign_path, filename)`` after a data file is
+# written. ``filename`` is relative to the campaign directory.
+_CHANGE_LISTENERS: List[Callable[[str, str], None]] = []
+
+
+def add_change_listener(callback: Callable[[str, str], None]) -> None:
+    """Register ``callback`` to be told about campaign file changes."""
+    if callback not in _CHANGE_LISTENERS:
+        _CHANGE_LISTENERS.append(callback)
+
+
+def remove_change_listener(callback: Callable[[str, str], None]) -> None:
+    """Unregister a callback added with :func:`add_change_listener`."""
+    if callback in _CHANGE_LISTENERS:
+        _CHANGE_LISTENERS.remove(callback)
+
+
+def notify_change(
+    campaign_path: str,
+    filename: str,
+    changes: Optional[Iterable[Tuple[Optional[str], str]]] = None,
+) -> None:
+    """Inform listeners that ``filename`` inside ``campaign_path`` changed.
+
+    ``changes`` lists ``(entity_id, op)`` pairs for the campaign change feed
+    (see ``changefeed.py``); without it one file-wide update is recorded.
+    Listener errors are swallowed so that a failing background service can
+    never break a foreground write.
+    """
+    from .changefeed import ChangeFeed
+    ChangeFeed(campaign_path).record(filename, changes if changes is not None else [(None, "update")])
+    for callback in list(_CHANGE_LISTENERS):
+        try:
+            callback(str(campaign_path), filename)
+        except Exception:
+            pass
 
 
 def list_campaigns() -> List[str]:
@@ -38,9 +85,27 @@ def list_campaigns() -> List[str]:
         name
         for name in os.listdir(CAMPAIGNS_DIR)
         if os.path.isdir(os.path.join(CAMPAIGNS_DIR, name))
+        and not name.startswith(".")
     ]
 
 
+def is_campaign(name: str) -> bool:
+    """Return True if the directory ``name`` holds campaign files.
+
+    Player journals live in lowercased sibling directories (see
+    ``journal_manager.py``) that :func:`list_campaigns` also returns; those
+    hold no ``version.json`` or campaign data files.
+    """
+    from .sharding import is_sharded
+    path = os.path.join(CAMPAIGNS_DIR, name)
+    if os.path.exists(os.path.join(path, "version.json")):
+        return True
+    return any(
+        os.path.exists(os.path.join(path, f)) or is_sharded(path, f)
+        for f in CampaignManager.DEFAULT_FILES
+    )
+
+
 def delete_campaign(name: str) -> bool:
     """Delete an entire campaign directory."""
     path = os.path.join(CAMPAIGNS_DIR, name)
@@ -124,20 +189,33 @@ class CampaignManager:
         "world_state.json",
     ]
 
+    # Files whose every save is kept as a revision (see ``versioning.py``)
+    VERSIONED_FILES = ("world_state.json", "npcs.json", "quests.json")
+
     def __init__(self, name: str):
         self.name = name
         self.path = os.path.join(CAMPAIGNS_DIR, name)
+        self._timelines: Dict[str, Any] = {}
         os.makedirs(self.path, exist_ok=True)
         # ensure versioning file
         version_file = os.path.join(self.path, "version.json")
         if not os.path.exists(version_file):
             with open(version_file, "w", encoding="utf-8") as fp:
                 json.dump({"version": VERSION}, fp, indent=2)
+        else:
+            # upgrade campaigns created by older releases on first open
+            from .migrations import migrate_campaign, pending_migrations
+            if pending_migrations(self.path):
+                migrate_campaign(self.path)
+            # finish a party update interrupted after its commit point
+            from .party import recover
+            recover(self)
 
         # create default data files
+        from .sharding import is_sharded
         for f in self.DEFAULT_FILES:
             file_path = os.path.join(self.path, f)
-            if not os.path.exists(file_path):
+            if not os.path.exists(file_path) and not is_sharded(self.path, f):
                 with open(file_path, "w", encoding="utf-8") as fp:
                     if f == "quests.json":
                         json.dump({"active": {}, "completed": {}, "missed": {}}, fp, indent=2)
@@ -148,17 +226,130 @@ class CampaignManager:
         os.makedirs(os.path.join(self.path, "players"), exist_ok=True)
         # initialize story arc with default villain
         from .arc_manager import ArcManager
-        ArcManager(name)
+        ArcManager(name, campaign=self)
 
     def _load_json(self, filename: str) -> Dict[str, Any]:
+        from .sharding import read_entities
+        return read_entities(self.path, filename)
+
+    def _save_json(
+        self,
+        filename: str,
+        data: Dict[str, Any],
+        changes: Optional[Iterable[Tuple[Optional[str], str]]] = None,
+    ):
+        from .sharding import open_store, source_exists
         path = os.path.join(self.path, filename)
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        if filename in self.VERSIONED_FILES:
+            old = self._load_json(filename) if source_exists(self.path, filename) else {}
+            self.history(filename).record(old, data)
+        store = open_store(self.path, filename)
+        if store is not None:
+            store.replace_all(data)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        notify_change(self.path, filename, changes)
 
-    def _save_json(self, filename: str, data: Dict[str, Any]):
-        path = os.path.join(self.path, filename)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+    # ------------------------------------------------------
+    # Single entity access (cheap for sharded files)
+    # ------------------------------------------------------
+    def _get_entity(self, filename: str, entity_id: str) -> Any:
+        from .sharding import open_store
+        store = open_store(self.path, filename)
+        if store is not None:
+            return store.get(entity_id)
+        return self._load_json(filename).get(entity_id)
+
+    def _get_entities(self, filename: str, entity_ids: Iterable[str]) -> Dict[str, Any]:
+        """Return the stored entities among ``entity_ids``."""
+        from .sharding import open_store
+        store = open_store(self.path, filename)
+        if store is not None:
+            return store.get_many(entity_ids)
+        data = self._load_json(filename)
+        return {i: data[i] for i in entity_ids if i in data}
+
+    def _put_entity(self, filename: str, entity_id: str, value: Dict[str, Any], op: str) -> None:
+        """Store one entity; a sharded file only rewrites its shard."""
+        self._put_entities(filename, {entity_id: value}, op)
+
+    def _put_entities(self, filename: str, values: Dict[str, Dict[str, Any]], op: str) -> None:
+        """Store several entities in one write; a sharded file only rewrites their shards."""
+        from .sharding import open_store
+        store = open_store(self.path, filename)
+        if store is None:
+            data = self._load_json(filename)
+            data.update(values)
+            self._save_json(filename, data, [(entity_id, op) for entity_id in values])
+            return
+        if filename in self.VERSIONED_FILES:
+            history = self.history(filename)
+            if history.head() < 0:
+                full = self._load_json(filename)
+                history.record(full, {**full, **values})
+            else:
+                # a diff of just these entities is the same as one of the whole
+                # file, but checkpoints need the whole file
+                history.record(
+                    store.get_many(values),
+                    dict(values),
+                    checkpoint=lambda: {**store.load_all(), **values},
+                )
+        store.update_many(values)
+        notify_change(self.path, filename, [(entity_id, op) for entity_id in values])
+
+    def _iter_entities(self, filename: str):
+        """Yield ``(id, entity)`` pairs, one shard at a time when sharded."""
+        from .sharding import open_store
+        store = open_store(self.path, filename)
+        if store is not None:
+            yield from store.items()
+        else:
+            yield from self._load_json(filename).items()
+
+    def timeline(self, filename: str):
+        """Return the :class:`ids.EntityTimeline` of ``filename``.
+
+        It lists entities by their time-ordered IDs, e.g.
+        ``cm.timeline("events_log.json").latest(5)``.
+        """
+        from .ids import EntityTimeline
+        if filename not in self._timelines:
+            self._timelines[filename] = EntityTimeline(self, filename)
+        return self._timelines[filename]
+
+    @property
+    def changes(self):
+        """The campaign's :class:`changefeed.ChangeFeed`."""
+        from .changefeed import ChangeFeed
+        return ChangeFeed(self.path)
+
+    def changes_since(self, rev: int) -> Optional[List[Dict[str, Any]]]:
+        """Return change records newer than ``rev`` (``None``: reload all)."""
+        return self.changes.changes_since(rev)
+
+    # ------------------------------------------------------
+    # Revision history
+    # ------------------------------------------------------
+    def history(self, filename: str):
+        """Return the :class:`versioning.FileHistory` of a versioned file."""
+        if filename not in self.VERSIONED_FILES:
+            raise ValueError(f"{filename} is not versioned")
+        from .versioning import FileHistory
+        return FileHistory(self.path, filename)
+
+    def state_at(self, filename: str, rev: int) -> Dict[str, Any]:
+        """Return the content of ``filename`` as of revision ``rev``."""
+        return self.history(filename).state_at(rev)
+
+    def rollback(self, filename: str, rev: int) -> int:
+        """Restore ``filename`` to revision ``rev``.
+
+        The rollback is itself stored as a new revision, which is returned.
+        """
+        self._save_json(filename, self.state_at(filename, rev), [(None, "rollback")])
+        return self.history(filename).head()
 
     # ------------------------------------------------------
     # Player state management
@@ -168,20 +359,24 @@ class CampaignManager:
         filename = f"{player_name.lower().replace(' ', '_')}.json"
         return os.path.join(self.path, "players", filename)
 
+    def list_players(self) -> List[str]:
+        """Return the file names (without ``.json``) of saved player states."""
+        folder = os.path.join(self.path, "players")
+        return sorted(
+            name[:-5]
+            for name in os.listdir(folder)
+            if name.endswith(".json") and not name.endswith("_journal.json")
+        )
+
     def initialize_player_state(self, player_name: str) -> None:
         """Create a default player state file if it doesn't exist."""
         file_path = self._player_state_file(player_name)
         if not os.path.exists(file_path):
-            default_state = {
-                "platinum": 0,
-                "gold": 0,
-                "silver": 0,
-                "copper": 0,
-                "inventory": [],
-                "quests": [],
-            }
             with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(default_state, f, indent=2)
+                json.dump(DEFAULT_PLAYER_STATE, f, indent=2)
+            notify_change(
+                self.path, os.path.join("players", os.path.basename(file_path)), [(player_name, "add")]
+            )
 
     def update_player_state(self, player_name: str, updates: Dict[str, Any]):
         """Update dynamic player state with provided values."""
@@ -192,18 +387,30 @@ class CampaignManager:
         deep_update(data, updates)
         with open(file_path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
+        notify_change(
+            self.path, os.path.join("players", os.path.basename(file_path)), [(player_name, "update")]
+        )
 
     # ------------------------------------------------------
     # Quest management helpers
     # ------------------------------------------------------
     def _load_quests(self) -> Dict[str, Dict[str, Any]]:
-        quests = self._load_json("quests.json")
-        if not all(k in quests for k in ("active", "completed", "missed")):
-            quests = {"active": {}, "completed": {}, "missed": {}}
-        return quests
-
-    def _save_quests(self, quests: Dict[str, Dict[str, Any]]):
-        self._save_json("quests.json", quests)
+        # malformed files are repaired by the version 2 migration
+        return self._load_json("quests.json")
+
+    def _save_quests(self, quests: Dict[str, Dict[str, Any]], changes=None, graph=None):
+        self._save_json("quests.json", quests, changes)
+        if graph is not None:
+            graph.save(self.path)
+
+    def _unlock_quests(self, quests: Dict[str, Dict[str, Any]], changed_quests=(), changed_keys=()):
+        """Unlock dependents of the changes in ``quests``; return ``(graph, unlocked_ids)``."""
+        from .quest_graph import QuestGraph
+        graph = QuestGraph.load(self.path, quests)
+        if not graph.affected_by(changed_quests, changed_keys):
+            return graph, []
+        world_state = self._load_json("world_state.json")
+        return graph, graph.unlock(quests, world_state, changed_quests, changed_keys)
 
     def add_npc(self, npc_data: Dict[str, Any]) -> str:
         """Add a new NPC to the campaign.
@@ -217,24 +424,29 @@ class CampaignManager:
                 }
             }
         """
-        npcs = self._load_json("npcs.json")
-        npc_id = str(uuid.uuid4())
+        from .ids import new_id
+        npc_id = new_id()
         npc_data.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
-        npcs[npc_id] = npc_data
-        self._save_json("npcs.json", npcs)
+        self._put_entity("npcs.json", npc_id, npc_data, "add")
         return npc_id
 
     def update_npc(self, npc_id: str, updates: Dict[str, Any]) -> bool:
         """Update an existing NPC entry using deep merging."""
-        npcs = self._load_json("npcs.json")
-        if npc_id not in npcs:
+        npc = self._get_entity("npcs.json", npc_id)
+        if npc is None:
             return False
-        deep_update(npcs[npc_id], updates)
-        self._save_json("npcs.json", npcs)
+        deep_update(npc, updates)
+        self._put_entity("npcs.json", npc_id, npc, "update")
         return True
 
     def add_quest(self, quest_data: Dict[str, Any]) -> str:
-        """Add a quest ensuring titles remain unique."""
+        """Add a quest ensuring titles remain unique.
+
+        ``quest_data`` may include ``requires`` (see :mod:`quest_graph`); a
+        quest whose requirements are not met yet starts in ``locked``.
+        """
+        from .ids import new_id
+        from .quest_graph import QuestGraph, requirements_met, validate_requires
         quests = self._load_quests()
         title = quest_data.get("title")
         if title:
@@ -243,12 +455,50 @@ class CampaignManager:
                 all_titles.extend(q.get("title") for q in section.values())
             if title in all_titles:
                 raise ValueError("Quest with this title already exists")
-        quest_id = str(uuid.uuid4())
+        quest_id = new_id()
+        section, graph = "active", None
+        requires = quest_data.get("requires")
+        if requires:
+            validate_requires(requires)
+            QuestGraph.check_acyclic(quests, quest_id, requires)
+            graph = QuestGraph.load(self.path, quests)
+            graph.add(quest_id, requires)
+            if not requirements_met(requires, quests, self._load_json("world_state.json")):
+                section = "locked"
         quest_data["timestamp"] = datetime.now(timezone.utc).isoformat()
-        quests["active"][quest_id] = quest_data
-        self._save_quests(quests)
+        quests.setdefault(section, {})[quest_id] = quest_data
+        self._save_quests(quests, [(quest_id, "add")], graph)
         return quest_id
 
+    def set_quest_requirements(self, quest_id: str, requires: Dict[str, Any] | None) -> bool:
+        """Replace the prerequisites of a quest, locking or unlocking it to match.
+
+        Raises ``ValueError`` if the new prerequisites would form a cycle.
+        """
+        from .quest_graph import QuestGraph, quest_status, requirements_met, validate_requires
+        quests = self._load_quests()
+        status = quest_status(quests, quest_id)
+        if status is None:
+            return False
+        requires = requires or {}
+        validate_requires(requires)
+        QuestGraph.check_acyclic(quests, quest_id, requires)
+        graph = QuestGraph.load(self.path, quests)
+        quest = quests[status][quest_id]
+        graph.remove(quest_id, quest.get("requires") or {})
+        graph.add(quest_id, requires)
+        if requires:
+            quest["requires"] = requires
+        else:
+            quest.pop("requires", None)
+        if status in ("active", "locked"):
+            met = requirements_met(requires, quests, self._load_json("world_state.json"))
+            target = "active" if met else "locked"
+            if target != status:
+                quests.setdefault(target, {})[quest_id] = quests[status].pop(quest_id)
+        self._save_quests(quests, [(quest_id, "update")], graph)
+        return True
+
     def complete_quest(self, quest_id: str, player_name: str | None = None) -> bool:
         """Move quest from active or missed to completed.
 
@@ -259,7 +509,8 @@ class CampaignManager:
         for status in ("active", "missed"):
             if quest_id in quests.get(status, {}):
                 quests["completed"][quest_id] = quests[status].pop(quest_id)
-                self._save_quests(quests)
+                graph, unlocked = self._unlock_quests(quests, changed_quests=[quest_id])
+                self._save_quests(quests, [(quest_id, "complete")] + [(q, "unlock") for q in unlocked], graph)
                 if player_name:
                     # append quest result to player's history
                     path = self._player_state_file(player_name)
@@ -276,6 +527,9 @@ class CampaignManager:
                     )
                     with open(path, "w", encoding="utf-8") as f:
                         json.dump(state, f, indent=2)
+                    notify_change(
+                        self.path, os.path.join("players", os.path.basename(path)), [(player_name, "update")]
+                    )
                 return True
         return False
 
@@ -284,70 +538,188 @@ class CampaignManager:
         quests = self._load_quests()
         if quest_id in quests.get("active", {}):
             quests["missed"][quest_id] = quests["active"].pop(quest_id)
-            self._save_quests(quests)
+            graph, unlocked = self._unlock_quests(quests, changed_quests=[quest_id])
+            self._save_quests(quests, [(quest_id, "miss")] + [(q, "unlock") for q in unlocked], graph)
             return True
         return False
 
     def log_event(self, event: str, hidden: bool = False):
         """Record an event. Set ``hidden`` to True for DM-only logs."""
+        from .ids import new_id
         filename = "events_dm_log.json" if hidden else "events_log.json"
         events = self._load_json(filename)
-        event_id = str(uuid.uuid4())
+        event_id = new_id()
         events[event_id] = {
             "description": event,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
-        self._save_json(filename, events)
+        self._save_json(filename, events, [(event_id, "add")])
         return event_id
 
     def update_world_state(self, updates: Dict[str, Any]):
         state = self._load_json("world_state.json")
         state.update(updates)
-        self._save_json("world_state.json", state)
+        self._save_json("world_state.json", state, [(key, "update") for key in updates])
+        from .quest_graph import QuestGraph
+        graph = QuestGraph.load(self.path)
+        if graph.affected_by(changed_keys=updates):
+            quests = self._load_quests()
+            unlocked = graph.unlock(quests, state, changed_keys=updates)
+            if unlocked:
+                self._save_quests(quests, [(q, "unlock") for q in unlocked], graph)
 
     def add_item(self, item_data: Dict[str, Any]) -> str:
-        items = self._load_json("items.json")
-        item_id = str(uuid.uuid4())
+        from .ids import new_id
+        item_id = new_id()
         item_data["timestamp"] = datetime.now(timezone.utc).isoformat()
-        items[item_id] = item_data
-        self._save_json("items.json", items)
+        self._put_entity("items.json", item_id, item_data, "add")
         return item_id
 
+    def _search_entities(self, filename: str, query: str):
+        """Yield ``(id, entity)`` pairs that may contain ``query``.
+
+        Uses the background search index when it is current and scans the
+        file otherwise.
+        """
+        from .maintenance import search_candidates
+        ids = search_candidates(self.path, filename, query)
+        if ids is None:
+            yield from self._iter_entities(filename)
+        elif ids:
+            yield from self._get_entities(filename, ids).items()
+
     def search_npcs(self, query: str) -> List[Dict[str, Any]]:
-        npcs = self._load_json("npcs.json")
-        return [v for v in npcs.values() if query.lower() in str(v).lower()]
+        return [v for _k, v in self._search_entities("npcs.json", query) if query.lower() in str(v).lower()]
 
     def search_items(self, query: str) -> List[Dict[str, Any]]:
-        items = self._load_json("items.json")
-        return [v for v in items.values() if query.lower() in str(v).lower()]
+        return [v for _k, v in self._search_entities("items.json", query) if query.lower() in str(v).lower()]
+
+    def search_events(self, query: str, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Return events containing the query string.
 
-    def search_events(self, query: str) -> List[Dict[str, Any]]:
-        """Return events containing the query string."""
+        Set ``include_archived`` to also search events moved to compressed
+        archives by :func:`retention.compact_events`.
+        """
+        if not include_archived:
+            return [
+                ev
+                for _k, ev in self._search_entities("events_log.json", query)
+                if query.lower() in str(ev.get("description", "")).lower()
+            ]
+        from .retention import iter_archived_events
         events = self._load_json("events_log.json")
-        return [
+        results = [
             ev
             for ev in events.values()
             if query.lower() in str(ev.get("description", "")).lower()
         ]
+        for event_id, ev in iter_archived_events(self.path, "events_log.json"):
+            if event_id not in events and query.lower() in str(ev.get("description", "")).lower():
+                results.append(ev)
+        return results
+
+
+def load_player_state(cm: CampaignManager, player_name: str) -> Dict[str, Any]:
+    """Return a player's dynamic state, or the defaults if none is saved."""
+    path = cm._player_state_file(player_name)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return copy.deepcopy(DEFAULT_PLAYER_STATE)
+
+
+# Campaign data keys used in prompts and the files they are read from
+CAMPAIGN_DATA_FILES = {
+    "npcs": "npcs.json",
+    "quests": "quests.json",
+    "items": "items.json",
+    "events": "events_log.json",
+}
+
+
+def _compact_campaign_file(key: str, data: Any) -> Any:
+    """Return one campaign data file as :mod:`records` tables."""
+    from .records import EventRecord, ItemRecord, NpcRecord, QuestRecord, compact_mapping
+    if key == "quests":
+        # quests.json groups quests by status
+        if not isinstance(data, dict):
+            return data
+        return {status: compact_mapping(group, QuestRecord) for status, group in data.items()}
+    record_cls = {"npcs": NpcRecord, "items": ItemRecord, "events": EventRecord}[key]
+    return compact_mapping(data, record_cls)
+
+
+def _latest_event(cm: CampaignManager) -> Dict[str, Any]:
+    """Return the newest logged event from the events timeline, or ``{}``."""
+    latest = cm.timeline("events_log.json").latest(1)
+    return latest[0][1] if latest else {}
+
+
+def load_campaign_data(cm: CampaignManager, compact: bool = False) -> Dict[str, Any]:
+    """Return the campaign files used to build prompts.
+
+    ``latest_event`` holds the newest event, so prompts need not scan the
+    log. With ``compact`` each file is held in :class:`records.RecordTable`
+    columns, which are read-only mappings of the same JSON shape.
+    """
+    data = {key: cm._load_json(filename) for key, filename in CAMPAIGN_DATA_FILES.items()}
+    if compact:
+        data = {key: _compact_campaign_file(key, value) for key, value in data.items()}
+    data["latest_event"] = _latest_event(cm)
+    return data
+
+
+class CampaignDataCache:
+    """:func:`load_campaign_data` that only rereads files changed since the last call.
+
+    The files are kept as read-only :class:`records.RecordTable` mappings,
+    which take several times less memory than the parsed JSON.
+    """
+
+    def __init__(self, cm: CampaignManager) -> None:
+        self.cm = cm
+        self.revision = 0
+        self.data: Dict[str, Any] = {}
+
+    def get(self) -> Dict[str, Any]:
+        feed = self.cm.changes
+        head = feed.revision()
+        changes = feed.changes_since(self.revision) if self.data else None
+        if changes is None:
+            stale = set(CAMPAIGN_DATA_FILES)
+        else:
+            files = {c["file"] for c in changes}
+            stale = {key for key, filename in CAMPAIGN_DATA_FILES.items() if filename in files}
+        for key in stale:
+            self.data[key] = _compact_campaign_file(key, self.cm._load_json(CAMPAIGN_DATA_FILES[key]))
+        if "events" in stale:
+            self.data["latest_event"] = _latest_event(self.cm)
+        # files changed after ``head`` are picked up by the next call
+        self.revision = head
+        return self.data
 
 
 # ----------------------------------------------------------------------
 # Web search helper
 # ----------------------------------------------------------------------
 
-def search_web(query: str) -> str:
-    """Return a brief web search result for the query.
+def search_web(query: str, max_results: int = 3) -> str:
+    """Return the top ``max_results`` web search results for the query.
 
-    This uses ``duckduckgo_search`` if available and falls back to a
-    simple placeholder when network access is restricted.
+    Each result is one ``title: body`` line. Lookups go through the shared
+    :class:`web_lookup.WebLookup` service, so repeated queries are served
+    from its cache and slow searches give up after
+    ``CONFIG.web_lookup_timeout`` seconds. A placeholder is returned when no
+    result arrives in time or network access is restricted.
     """
-    try:  # pragma: no cover - network may be blocked
-        from duckduckgo_search import DDGS
-
-        with DDGS() as ddgs:
-            results = ddgs.text(query, max_results=1)
-        if results:
-            return results[0]["body"]
-    except Exception:
-        pass
+    from .web_lookup import get_lookup
+
+    results = get_lookup().search(query, max_results=max_results)
+    lines = [
+        f"{r['title']}: {r['body']}" if r.get("title") else r["body"]
+        for r in results
+        if r.get("body")
+    ]
+    if lines:
+        return "\n".join(lines)
     return f"Web search is unavailable for '{query}'."
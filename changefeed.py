@@ -0,0 +1,159 @@
+"""Campaign-wide revision counter and change feed.
+
+Every write reported through :func:`campaign_manager.notify_change` appends
+one compact record per changed entity to ``<campaign>/changes.jsonl``::
+
+    {"rev": 42, "file": "npcs.json", "id": "<npc id>", "op": "update"}
+
+``rev`` increases by one per record, so a reader that remembers the last
+revision it saw can ask :meth:`ChangeFeed.changes_since` what to refresh
+instead of reparsing every file.
+
+The feed is shared with other processes (the CLI runs next to the Streamlit
+server), so appends and trims hold an exclusive ``flock`` on
+``changes.jsonl.lock`` and reads a shared one. Without ``fcntl`` (Windows)
+only threads of one process are synchronised.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+FEED_FILE = "changes.jsonl"
+# Records kept readable by ``changes_since``; older readers reload fully.
+FEED_WINDOW = 5000
+
+# ``(entity_id, op)``; ``entity_id`` is ``None`` for file-wide changes
+Change = Tuple[Optional[str], str]
+
+_LOCK = threading.Lock()
+_STATE: Dict[str, Dict[str, Any]] = {}
+
+
+def _state(path: str) -> Dict[str, Any]:
+    state = _STATE.get(path)
+    if state is None:
+        state = _STATE[path] = {
+            "offset": 0, "records": deque(maxlen=FEED_WINDOW), "head": 0, "count": 0, "first": None,
+        }
+    return state
+
+
+@contextmanager
+def _locked(path: str, exclusive: bool = False) -> Iterator[None]:
+    """Hold ``_LOCK`` and a file lock shared with other processes."""
+    with _LOCK:
+        folder = os.path.dirname(path)
+        if fcntl is None or not (exclusive or os.path.isdir(folder)):
+            yield
+            return
+        os.makedirs(folder, exist_ok=True)
+        with open(f"{path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _first_rev(path: str) -> Optional[int]:
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.readline())["rev"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _refresh(path: str) -> Dict[str, Any]:
+    """Read records appended to ``path`` since the last call. Hold ``_locked``."""
+    state = _state(path)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if state["offset"] and (size < state["offset"] or _first_rev(path) != state["first"]):
+        # the feed was trimmed by another process
+        state.update(offset=0, head=0, count=0, first=None)
+        state["records"].clear()
+    if size == state["offset"]:
+        return state
+    with open(path, "rb") as f:
+        f.seek(state["offset"])
+        chunk = f.read()
+    end = chunk.rfind(b"\n") + 1  # leave a partly written line for later
+    records: Deque[Dict[str, Any]] = state["records"]
+    for line in chunk[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        records.append(record)
+        if state["first"] is None:
+            state["first"] = record["rev"]
+        state["head"] = record["rev"]
+        state["count"] += 1
+    state["offset"] += end
+    return state
+
+
+class ChangeFeed:
+    """Revision counter and change records of one campaign."""
+
+    def __init__(self, campaign_path: str) -> None:
+        self.path = os.path.join(campaign_path, FEED_FILE)
+
+    def record(self, filename: str, changes: Iterable[Change] = ((None, "update"),)) -> int:
+        """Append one record per change and return the new revision."""
+        with _locked(self.path, exclusive=True):
+            state = _refresh(self.path)
+            rev = state["head"]
+            lines = []
+            for entity_id, op in changes:
+                rev += 1
+                lines.append(json.dumps({"rev": rev, "file": filename, "id": entity_id, "op": op}) + "\n")
+            if not lines:
+                return rev
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+            state = _refresh(self.path)
+            if state["count"] > 2 * FEED_WINDOW:
+                self._trim(state)
+            return state["head"]
+
+    def _trim(self, state: Dict[str, Any]) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in state["records"])
+        os.replace(tmp, self.path)
+        state.update(
+            offset=os.path.getsize(self.path),
+            count=len(state["records"]),
+            first=state["records"][0]["rev"] if state["records"] else None,
+        )
+
+    def revision(self) -> int:
+        """Return the latest revision (0 before the first change)."""
+        with _locked(self.path):
+            return _refresh(self.path)["head"]
+
+    def changes_since(self, rev: int) -> Optional[List[Dict[str, Any]]]:
+        """Return records newer than ``rev`` in order.
+
+        ``None`` means ``rev`` is older than the retained window and the
+        caller should reload everything.
+        """
+        with _locked(self.path):
+            state = _refresh(self.path)
+            records = state["records"]
+            if rev >= state["head"]:
+                return []
+            if not records or records[0]["rev"] > rev + 1:
+                return None
+            return [r for r in records if r["rev"] > rev]
@@ -0,0 +1,122 @@
+"""Append-only chat transcript storage for a single play session."""
+
+from __future__ import annotations
+
+import json
+import os
+from array import array
+from typing import List
+
+from . import campaign_manager
+
+
+def session_dir(campaign_name: str) -> str:
+    """Return the directory holding a campaign's session transcripts."""
+    return os.path.join(campaign_manager.CAMPAIGNS_DIR, campaign_name, "sessions")
+
+
+def session_prefix(player_name: str) -> str:
+    """Return the file name prefix of a player's sessions."""
+    return player_name.lower().replace(" ", "_") + "_"
+
+
+class ChatStore:
+    """Store chat lines as JSON Lines and read them back by page.
+
+    Lines are only ever appended, by a single writer per session. Byte
+    offsets of every line are kept in memory, so reading a page seeks
+    straight to it instead of parsing the whole transcript. They are also
+    appended to a ``.idx`` file next to the transcript, so reopening a
+    session only checks the lines written after the last indexed one.
+    """
+
+    def __init__(self, campaign_name: str, player_name: str, session_id: str = "default") -> None:
+        self.dir = session_dir(campaign_name)
+        os.makedirs(self.dir, exist_ok=True)
+        self.path = os.path.join(self.dir, f"{session_prefix(player_name)}{session_id}.jsonl")
+        self.index_path = self.path[: -len(".jsonl")] + ".idx"
+        self._offsets = array("Q")
+        self._end = 0
+        if os.path.exists(self.path):
+            self._open()
+
+    def _open(self) -> None:
+        """Load the offset index and pick up lines written after it."""
+        size = os.path.getsize(self.path)
+        indexed = array("Q")
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                raw = f.read()
+            indexed.frombytes(raw[: len(raw) - len(raw) % indexed.itemsize])
+        # trust the index up to its last entry that still fits in the file;
+        # that line itself is checked again below
+        count = len(indexed)
+        while count and indexed[count - 1] >= size:
+            count -= 1
+        start = indexed[count - 1] if count else 0
+        self._offsets = indexed[: max(count - 1, 0)]
+        self._scan(start)
+        if self._offsets != indexed:
+            self._write_index()
+
+    def _scan(self, offset: int = 0) -> None:
+        """Record the start offset of each complete line from ``offset`` on."""
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # ignore a torn final write
+                self._offsets.append(offset)
+                offset += len(raw)
+        self._end = offset
+
+    def _write_index(self) -> None:
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "wb") as f:
+            self._offsets.tofile(f)
+        os.replace(tmp, self.index_path)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def append(self, line: str) -> int:
+        """Append ``line`` and return its index."""
+        raw = (json.dumps(line) + "\n").encode("utf-8")
+        with open(self.path, "ab") as f:
+            if f.tell() != self._end:
+                f.truncate(self._end)
+            f.write(raw)
+        with open(self.index_path, "ab") as f:
+            array("Q", [self._end]).tofile(f)
+        self._offsets.append(self._end)
+        self._end += len(raw)
+        return len(self._offsets) - 1
+
+    def page(self, start: int, stop: int) -> List[str]:
+        """Return lines ``start`` to ``stop`` (exclusive)."""
+        start = max(start, 0)
+        stop = min(stop, len(self._offsets))
+        if start >= stop:
+            return []
+        end = self._offsets[stop] if stop < len(self._offsets) else self._end
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[start])
+            chunk = f.read(end - self._offsets[start])
+        return [json.loads(raw) for raw in chunk.splitlines()]
+
+    def tail(self, count: int) -> List[str]:
+        """Return the last ``count`` lines."""
+        return self.page(len(self._offsets) - count, len(self._offsets))
+
+    def export_new(self, dest: str, since: int) -> int:
+        """Append lines from index ``since`` onward to the log at ``dest``.
+
+        Returns the new line count, to be passed as ``since`` next time.
+        """
+        total = len(self._offsets)
+        if since < total:
+            os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+            with open(self.path, "rb") as src, open(dest, "ab") as out:
+                src.seek(self._offsets[since])
+                out.write(src.read(self._end - self._offsets[since]))
+        return total
@@ -1,6 +1,40 @@
+"""Campaign management command line.
+
+Run it as ``python cli.py`` from the repository root or as
+``python -m BlackFeather.cli``. The library modules use package-relative
+imports, so a direct run first loads this directory as the ``BlackFeather``
+package.
+"""
+
 import argparse
-from campaign_manager import CampaignManager, delete_campaign, list_campaigns
+import importlib.util
+import os
+import sys
+
+if not __package__:
+    _ROOT = os.path.dirname(os.path.abspath(__file__))
+    if "BlackFeather" not in sys.modules:
+        _spec = importlib.util.spec_from_file_location(
+            "BlackFeather", os.path.join(_ROOT, "__init__.py"), submodule_search_locations=[_ROOT]
+        )
+        _package = importlib.util.module_from_spec(_spec)
+        sys.modules["BlackFeather"] = _package
+        _spec.loader.exec_module(_package)
+    __package__ = "BlackFeather"
 
+from .config import CONFIG
+from .campaign_manager import CampaignManager, delete_campaign, is_campaign, list_campaigns
+from .archive import export_campaign, import_campaign
+from .dedupe import DUPLICATE_THRESHOLD, dedupe_memory
+from .ingest import ingest_file
+from .load_test import format_report, run_load_test
+from .migrations import migrate_all
+from .party import CURRENCIES, PartyUpdate, apply_party_update, read_experience
+from .records import benchmark_memory
+from .relationships import RelationshipStore
+from .retention import RetentionPolicy, compact_events
+from .sharding import DEFAULT_MAX_SHARD_BYTES, DEFAULT_SHARDS, SHARDABLE_FILES, shard_file, unshard_file
+from .world_memory import WorldMemoryManager
 
 def main():
     parser = argparse.ArgumentParser(description="Manage campaigns")
@@ -14,6 +48,80 @@ def main():
     del_p = sub.add_parser("delete")
     del_p.add_argument("name")
 
+    export_p = sub.add_parser("export")
+    export_p.add_argument("name")
+    export_p.add_argument("-o", "--output", help="Archive path (default: <name>.tar.gz)")
+
+    import_p = sub.add_parser("import")
+    import_p.add_argument("archive")
+    import_p.add_argument("--name", help="Import under a different campaign name")
+
+    migrate_p = sub.add_parser("migrate")
+    migrate_p.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    migrate_p.add_argument("--workers", type=int, default=None, help="Worker processes")
+
+    ingest_p = sub.add_parser("ingest")
+    ingest_p.add_argument("name")
+    ingest_p.add_argument("path", help="JSONL or CSV file with a 'kind' per record")
+    ingest_p.add_argument("--format", choices=["jsonl", "csv"], default=None)
+
+    compact_p = sub.add_parser("compact")
+    compact_p.add_argument("--max-age-days", type=float, default=CONFIG.event_retention_days)
+    compact_p.add_argument("--max-events", type=int, default=CONFIG.event_retention_count)
+    compact_p.add_argument("--no-digest", action="store_true", help="Skip archive digests")
+
+    load_p = sub.add_parser("loadtest")
+    load_p.add_argument("--players", type=int, default=50)
+    load_p.add_argument("--campaigns", type=int, default=10)
+    load_p.add_argument("--turns", type=int, default=5)
+    load_p.add_argument("--latency", type=float, default=0.05, help="Mock LLM latency in seconds")
+    load_p.add_argument("--jitter", type=float, default=0.0)
+    load_p.add_argument("--keep", action="store_true", help="Keep the generated campaigns")
+
+    dedupe_p = sub.add_parser("dedupe")
+    dedupe_p.add_argument("name")
+    dedupe_p.add_argument("--dm", action="store_true", help="Deduplicate DM-only world memory")
+    dedupe_p.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD)
+    dedupe_p.add_argument("--dry-run", action="store_true")
+
+    history_p = sub.add_parser("history")
+    history_p.add_argument("name")
+    history_p.add_argument("file", choices=CampaignManager.VERSIONED_FILES)
+
+    rollback_p = sub.add_parser("rollback")
+    rollback_p.add_argument("name")
+    rollback_p.add_argument("file", choices=CampaignManager.VERSIONED_FILES)
+    rollback_p.add_argument("rev", type=int)
+
+    party_p = sub.add_parser("party", help="Give currency, XP, items or quest credit to several players")
+    party_p.add_argument("name")
+    party_p.add_argument("players", nargs="+")
+    for coin in CURRENCIES:
+        party_p.add_argument(f"--{coin}", type=int, default=0)
+    party_p.add_argument("--xp", type=int, default=0)
+    party_p.add_argument("--item", action="append", default=[], help="Item to give each player")
+    party_p.add_argument("--remove-item", action="append", default=[])
+    party_p.add_argument("--complete", action="append", default=[], help="Quest ID to complete")
+
+    membench_p = sub.add_parser("membench", help="Compare memory use of dicts and compact records")
+    membench_p.add_argument("--entries", type=int, default=20000)
+
+    shard_p = sub.add_parser("shard", help="Split a large entity file into hash-partitioned shards")
+    shard_p.add_argument("name")
+    shard_p.add_argument("file", choices=SHARDABLE_FILES)
+    shard_p.add_argument("--shards", type=int, default=DEFAULT_SHARDS)
+    shard_p.add_argument("--max-shard-kb", type=int, default=DEFAULT_MAX_SHARD_BYTES // 1024)
+    shard_p.add_argument("--undo", action="store_true", help="Merge the shards back into one file")
+
+    rel_p = sub.add_parser("relations", help="Query or adjust numeric NPC relationships (default: average)")
+    rel_p.add_argument("name")
+    rel_p.add_argument("attribute", help="e.g. trust")
+    rel_p.add_argument("--npc", action="append", help="NPC name or ID")
+    rel_p.add_argument("--character", action="append")
+    rel_p.add_argument("--above", type=float)
+    rel_p.add_argument("--top", type=int)
+    rel_p.add_argument("--adjust", type=float, help="Add this amount to every selected relationship")
+
     args = parser.parse_args()
     if args.cmd == "list":
         for name in list_campaigns():
@@ -26,6 +134,125 @@ def main():
             print(f"Deleted campaign {args.name}")
         else:
             print("Campaign not found")
+    elif args.cmd == "export":
+        try:
+            path = export_campaign(args.name, args.output)
+        except FileNotFoundError:
+            print("Campaign not found")
+        else:
+            print(f"Exported campaign {args.name} to {path}")
+    elif args.cmd == "import":
+        try:
+            name = import_campaign(args.archive, args.name)
+        except (ValueError, FileExistsError) as e:
+            print(f"Import failed: {e}")
+        else:
+            print(f"Imported campaign {name}")
+    elif args.cmd == "migrate":
+        def report(done, total, result):
+            if "error" in result:
+                print(f"[{done}/{total}] {result['campaign']}: failed ({result['error']})")
+            else:
+                changed = sum(len(step["changed"]) for step in result["steps"])
+                print(f"[{done}/{total}] {result['campaign']}: v{result['from']} -> v{result['to']}, {changed} files")
+
+        results = migrate_all(args.workers, args.dry_run, report)
+        if not results:
+            print("All campaigns are up to date")
+        elif args.dry_run:
+            print("Dry run: no files were written")
+    elif args.cmd == "ingest":
+        report = ingest_file(args.name, args.path, args.format)
+        print(
+            f"Ingested {report['ingested']} records ({report['rejected']} rejected) "
+            f"in {report['seconds']:.2f}s, {report['records_per_minute']:.0f} records/min"
+        )
+        for error in report["errors"]:
+            print(f"  {error}")
+    elif args.cmd == "compact":
+        policy = RetentionPolicy(args.max_age_days, args.max_events, not args.no_digest)
+        for name in list_campaigns():
+            if not is_campaign(name):
+                continue
+            moved = compact_events(CampaignManager(name), policy)
+            print(f"{name}: archived {sum(moved.values())} events")
+    elif args.cmd == "loadtest":
+        report = run_load_test(
+            args.players, args.campaigns, args.turns, args.latency, args.jitter,
+            cleanup=not args.keep,
+        )
+        print(format_report(report))
+    elif args.cmd == "dedupe":
+        wm = WorldMemoryManager(args.name, hidden=args.dm)
+        report = dedupe_memory(wm, args.threshold, args.dry_run)
+        data = wm._load()
+        for cluster in report["clusters"]:
+            names = [data[i]["name"] for i in cluster if i in data] if args.dry_run else cluster
+            print("  merge: " + ", ".join(names))
+        print(
+            f"{len(report['clusters'])} clusters, {report['removed']} entries removed, "
+            f"{report['bytes_reclaimed']} bytes reclaimed"
+        )
+    elif args.cmd == "history":
+        for rev in CampaignManager(args.name).history(args.file).revisions():
+            print(f"{rev['rev']:>5}  {rev['timestamp'] or '(initial)':<34}{rev['changes']} changes")
+    elif args.cmd == "rollback":
+        try:
+            rev = CampaignManager(args.name).rollback(args.file, args.rev)
+        except ValueError as exc:
+            print(exc)
+        else:
+            print(f"Restored {args.file} to revision {args.rev} (now revision {rev})")
+    elif args.cmd == "party":
+        update = PartyUpdate(
+            currency={c: getattr(args, c) for c in CURRENCIES if getattr(args, c)},
+            experience=args.xp,
+            add_items=args.item,
+            remove_items=args.remove_item,
+            complete_quests=args.complete,
+        )
+        cm = CampaignManager(args.name)
+        try:
+            states = apply_party_update(cm, args.players, update)
+        except ValueError as exc:
+            print(exc)
+        else:
+            for player, state in states.items():
+                coins = ", ".join(f"{state.get(c, 0)} {c}" for c in CURRENCIES)
+                print(f"{player}: {coins}, {read_experience(cm, player)} xp")
+    elif args.cmd == "membench":
+        result = benchmark_memory(args.entries)
+        print(f"{result['entries']} world entries")
+        print(f"  dicts:        {result['dict_bytes'] / 1e6:8.2f} MB")
+        print(f"  records:      {result['record_bytes'] / 1e6:8.2f} MB ({result['record_ratio']:.1f}x smaller)")
+        print(f"  record table: {result['table_bytes'] / 1e6:8.2f} MB ({result['table_ratio']:.1f}x smaller)")
+    elif args.cmd == "shard":
+        path = CampaignManager(args.name).path
+        try:
+            if args.undo:
+                unshard_file(path, args.file)
+                print(f"Merged {args.file} back into one file")
+            else:
+                store = shard_file(path, args.file, args.shards, args.max_shard_kb * 1024)
+                print(f"Split {args.file} into {len(store.manifest['shards'])} shards")
+        except ValueError as exc:
+            print(exc)
+    elif args.cmd == "relations":
+        store = RelationshipStore(CampaignManager(args.name))
+        npcs = store.find_npcs(args.npc) if args.npc else None
+        if args.adjust is not None:
+            edges = store.adjust(args.attribute, args.adjust, npcs, args.character)
+        elif args.above is not None:
+            edges = store.above(args.attribute, args.above, npcs, args.character)
+        elif args.top is not None:
+            edges = store.top_k(args.attribute, args.top, npcs, args.character)
+        else:
+            edges = []
+            mean = store.mean(args.attribute, npcs, args.character)
+            print("no matching relationships" if mean is None else f"average {args.attribute}: {mean:.1f}")
+        names = {i: n.get("name", i) for i, n in store.cm._get_entities("npcs.json", {e[0] for e in edges}).items()}
+        for npc_id, character, value in edges:
+            print(f"{names.get(npc_id, npc_id)} -> {character}: {value:g}")
     else:
         parser.print_help()
 
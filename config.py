@@ -1,6 +1,15 @@
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+
+def _default_routes() -> Dict[str, Dict[str, Any]]:
+    # An empty model name means ``chat_model``.
+    return {
+        "fast": {"model": "gpt-3.5-turbo", "max_tokens": 128, "timeout": 4.0},
+        "capable": {"model": "", "timeout": 8.0},
+    }
 
 
 @dataclass
@@ -11,6 +20,18 @@ class Config:
     system_prompt: str = ""
     temperature: float = 0.7
     max_tokens: int = 256
+    event_retention_days: float = 30.0
+    event_retention_count: int = 1000
+    model_routes: Dict[str, Dict[str, Any]] = field(default_factory=_default_routes)
+    fallback_route: str = "fast"
+    latency_budget: float = 10.0
+    requests_per_minute: float = 60.0
+    tokens_per_minute: float = 90000.0
+    max_concurrent_requests: int = 4
+    world_digest_chars: int = 2000
+    session_summary_chars: int = 1500
+    web_cache_ttl: float = 86400.0
+    web_lookup_timeout: float = 5.0
 
 
 def load_config(path: str = "config.json") -> Config:
@@ -27,6 +48,35 @@ def load_config(path: str = "config.json") -> Config:
     cfg.system_prompt = os.getenv("SYSTEM_PROMPT", data.get("system_prompt", cfg.system_prompt))
     cfg.temperature = float(os.getenv("TEMPERATURE", data.get("temperature", cfg.temperature)))
     cfg.max_tokens = int(os.getenv("MAX_TOKENS", data.get("max_tokens", cfg.max_tokens)))
+    cfg.event_retention_days = float(
+        os.getenv("EVENT_RETENTION_DAYS", data.get("event_retention_days", cfg.event_retention_days))
+    )
+    cfg.event_retention_count = int(
+        os.getenv("EVENT_RETENTION_COUNT", data.get("event_retention_count", cfg.event_retention_count))
+    )
+    routes = os.getenv("MODEL_ROUTES")
+    cfg.model_routes = json.loads(routes) if routes else data.get("model_routes", cfg.model_routes)
+    cfg.fallback_route = os.getenv("FALLBACK_ROUTE", data.get("fallback_route", cfg.fallback_route))
+    cfg.latency_budget = float(os.getenv("LATENCY_BUDGET", data.get("latency_budget", cfg.latency_budget)))
+    cfg.requests_per_minute = float(
+        os.getenv("REQUESTS_PER_MINUTE", data.get("requests_per_minute", cfg.requests_per_minute))
+    )
+    cfg.tokens_per_minute = float(
+        os.getenv("TOKENS_PER_MINUTE", data.get("tokens_per_minute", cfg.tokens_per_minute))
+    )
+    cfg.max_concurrent_requests = int(
+        os.getenv("MAX_CONCURRENT_REQUESTS", data.get("max_concurrent_requests", cfg.max_concurrent_requests))
+    )
+    cfg.world_digest_chars = int(
+        os.getenv("WORLD_DIGEST_CHARS", data.get("world_digest_chars", cfg.world_digest_chars))
+    )
+    cfg.session_summary_chars = int(
+        os.getenv("SESSION_SUMMARY_CHARS", data.get("session_summary_chars", cfg.session_summary_chars))
+    )
+    cfg.web_cache_ttl = float(os.getenv("WEB_CACHE_TTL", data.get("web_cache_ttl", cfg.web_cache_ttl)))
+    cfg.web_lookup_timeout = float(
+        os.getenv("WEB_LOOKUP_TIMEOUT", data.get("web_lookup_timeout", cfg.web_lookup_timeout))
+    )
     return cfg
 
 
@@ -0,0 +1,221 @@
+"""Near-duplicate detection for world memory entries.
+
+Entries are summarized as MinHash signatures: one part over character
+trigrams of the normalized name, one over description words. Locality
+sensitive hashing buckets the name part by entry type, so finding
+candidates for a new entry only compares against entries sharing a bucket
+instead of the whole world memory.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Set
+
+# Words ignored when comparing names ("the port of Haven" ~ "Haven City")
+GENERIC_WORDS = {
+    "the", "a", "an", "of", "and", "city", "town", "village", "port",
+    "kingdom", "guild", "order", "clan", "house",
+}
+
+NAME_PERMS = 48
+DESC_PERMS = 16
+BANDS = 12
+ROWS = NAME_PERMS // BANDS
+NAME_WEIGHT = 0.75
+
+# Estimated similarity at or above which entries count as duplicates
+DUPLICATE_THRESHOLD = 0.6
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_PERMS = [
+    ((i * 0x9E3779B1 + 0x7F4A7C15) % _PRIME | 1, (i * 0x85EBCA77 + 0xC2B2AE3D) % _PRIME)
+    for i in range(1, NAME_PERMS + DESC_PERMS + 1)
+]
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase ``name`` and drop generic words."""
+    words = [w for w in _WORD_RE.findall(name.lower()) if w not in GENERIC_WORDS]
+    return " ".join(words) or name.lower().strip()
+
+
+def _name_features(name: str) -> Set[str]:
+    text = f" {normalize_name(name)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _desc_features(description: str) -> Set[str]:
+    return {w for w in _WORD_RE.findall(description.lower()) if w not in GENERIC_WORDS}
+
+
+def _minhash(features: Iterable[str], perms: List[tuple]) -> List[int]:
+    hashes = [zlib.crc32(f.encode("utf-8")) for f in features]
+    if not hashes:
+        return [_MAX_HASH] * len(perms)
+    return [min((a * h + b) % _PRIME & _MAX_HASH for h in hashes) for a, b in perms]
+
+
+def signature(entry: Dict[str, Any]) -> List[int]:
+    """Return the MinHash signature of an entry's name and description."""
+    return _minhash(_name_features(str(entry.get("name", ""))), _PERMS[:NAME_PERMS]) + _minhash(
+        _desc_features(str(entry.get("description", ""))), _PERMS[NAME_PERMS:]
+    )
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimate the weighted Jaccard similarity of two signatures."""
+    name = sum(a == b for a, b in zip(sig_a[:NAME_PERMS], sig_b[:NAME_PERMS])) / NAME_PERMS
+    desc = sum(a == b for a, b in zip(sig_a[NAME_PERMS:], sig_b[NAME_PERMS:])) / DESC_PERMS
+    return NAME_WEIGHT * name + (1 - NAME_WEIGHT) * desc
+
+
+class LSHIndex:
+    """Banded LSH over signatures, bucketed per entry type."""
+
+    def __init__(self) -> None:
+        self.signatures: Dict[str, List[int]] = {}
+        self.types: Dict[str, str] = {}
+        self.buckets: Dict[str, List[str]] = {}
+
+    @staticmethod
+    def _keys(entry_type: str, sig: List[int]) -> List[str]:
+        return [
+            f"{entry_type}:{band}:{zlib.crc32(repr(sig[band * ROWS:(band + 1) * ROWS]).encode())}"
+            for band in range(BANDS)
+        ]
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        entry_id = entry["id"]
+        if entry_id in self.signatures:
+            self.remove(entry_id)
+        sig = signature(entry)
+        self.signatures[entry_id] = sig
+        self.types[entry_id] = str(entry.get("type", ""))
+        for key in self._keys(self.types[entry_id], sig):
+            self.buckets.setdefault(key, []).append(entry_id)
+
+    def remove(self, entry_id: str) -> None:
+        sig = self.signatures.pop(entry_id, None)
+        entry_type = self.types.pop(entry_id, "")
+        if sig is None:
+            return
+        for key in self._keys(entry_type, sig):
+            bucket = self.buckets.get(key, [])
+            if entry_id in bucket:
+                bucket.remove(entry_id)
+            if not bucket:
+                self.buckets.pop(key, None)
+
+    def query(self, entry: Dict[str, Any], threshold: float = DUPLICATE_THRESHOLD) -> List[str]:
+        """Return IDs of indexed entries likely duplicating ``entry``."""
+        sig = signature(entry)
+        candidates: Dict[str, None] = {}
+        for key in self._keys(str(entry.get("type", "")), sig):
+            candidates.update(dict.fromkeys(self.buckets.get(key, [])))
+        candidates.pop(entry.get("id"), None)
+        return [c for c in candidates if similarity(sig, self.signatures[c]) >= threshold]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"signatures": self.signatures, "types": self.types, "buckets": self.buckets}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LSHIndex":
+        index = cls()
+        index.signatures = data.get("signatures", {})
+        index.types = data.get("types", {})
+        index.buckets = data.get("buckets", {})
+        return index
+
+    @classmethod
+    def build(cls, entries: Iterable[Dict[str, Any]]) -> "LSHIndex":
+        index = cls()
+        for entry in entries:
+            index.add(entry)
+        return index
+
+
+# ----------------------------------------------------------------------
+# Batch merging
+# ----------------------------------------------------------------------
+
+def find_clusters(data: Dict[str, Dict[str, Any]], threshold: float = DUPLICATE_THRESHOLD) -> List[List[str]]:
+    """Group entry IDs of likely duplicates; each cluster keeps file order."""
+    entries = [{**e, "id": e.get("id", k)} for k, e in data.items()]
+    index = LSHIndex.build(entries)
+    parent = {e["id"]: e["id"] for e in entries}
+
+    def root(x: str) -> str:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for entry in entries:
+        for other in index.query(entry, threshold):
+            a, b = root(entry["id"]), root(other)
+            if a != b:
+                parent[b] = a
+    clusters: Dict[str, List[str]] = {}
+    for entry in entries:
+        clusters.setdefault(root(entry["id"]), []).append(entry["id"])
+    order = {entry_id: pos for pos, entry_id in enumerate(data)}
+    return [sorted(c, key=order.__getitem__) for c in clusters.values() if len(c) > 1]
+
+
+def merge_clusters(data: Dict[str, Dict[str, Any]], clusters: List[List[str]]) -> Dict[str, str]:
+    """Merge each cluster into its first entry in place.
+
+    Tags and links are combined, other names are kept as ``aliases`` and
+    ``related_to`` links everywhere are rewritten to the surviving entry.
+    Returns a mapping of removed ID to surviving ID.
+    """
+    replaced: Dict[str, str] = {}
+    for cluster in clusters:
+        keep_id, *others = cluster
+        keep = data[keep_id]
+        aliases = keep.setdefault("aliases", [])
+        for other_id in others:
+            other = data.pop(other_id)
+            replaced[other_id] = keep_id
+            if other.get("name") and other["name"] != keep.get("name") and other["name"] not in aliases:
+                aliases.append(other["name"])
+            if not keep.get("description") and other.get("description"):
+                keep["description"] = other["description"]
+            keep["tags"] = list(dict.fromkeys((keep.get("tags") or []) + (other.get("tags") or [])))
+            keep["related_to"] = list(
+                dict.fromkeys((keep.get("related_to") or []) + (other.get("related_to") or []))
+            )
+        if not aliases:
+            keep.pop("aliases")
+    for entry_id, entry in data.items():
+        for field in ("related_to", "possible_duplicates"):
+            if field not in entry:
+                continue
+            links = [replaced.get(i, i) for i in entry[field]]
+            entry[field] = [i for i in dict.fromkeys(links) if i != entry_id and i in data]
+        if "possible_duplicates" in entry and not entry["possible_duplicates"]:
+            del entry["possible_duplicates"]
+    return replaced
+
+
+def dedupe_memory(wm, threshold: float = DUPLICATE_THRESHOLD, dry_run: bool = False) -> Dict[str, Any]:
+    """Merge duplicate clusters in a ``WorldMemoryManager`` and report savings."""
+    data = wm._load()
+    before = wm.storage_bytes()
+    clusters = find_clusters(data, threshold)
+    removed: Dict[str, str] = {}
+    if clusters and not dry_run:
+        removed = merge_clusters(data, clusters)
+        wm._save(data, rebuild=True)
+    after = wm.storage_bytes()
+    return {
+        "clusters": clusters,
+        "removed": len(removed) if not dry_run else sum(len(c) - 1 for c in clusters),
+        "bytes_before": before,
+        "bytes_after": after,
+        "bytes_reclaimed": before - after,
+    }
@@ -0,0 +1,263 @@
+"""Find known NPCs, items, quests and places mentioned in narrator replies.
+
+Every known name is compiled into one Aho-Corasick automaton, so a reply is
+scanned in a single pass however many names the campaign has. The spotter
+follows the campaign change feed and only re-reads entities that changed;
+new names are inserted into the trie and the failure links are recomputed
+once before the next scan. :meth:`EntitySpotter.update_journal` records
+everything a reply mentions with a single journal write.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Names shorter than this are too likely to match ordinary words
+MIN_NAME_LENGTH = 3
+
+# Journal list receiving each kind of mention. DM-only world memory types
+# (``villain``, ``plot``) are never spotted.
+JOURNAL_FIELDS = {
+    "npc": "npcs",
+    "quest": "quests",
+    "item": "items",
+    "city": "places",
+    "business": "places",
+    "faction": "lore",
+    "monster": "lore",
+    "event": "lore",
+}
+
+# Campaign files the spotter reads names from
+SOURCES = ("npcs.json", "items.json", "quests.json", "world_memory.json")
+# Quest sections the players know about
+KNOWN_QUEST_SECTIONS = ("active", "completed", "missed")
+
+
+class AhoCorasick:
+    """Multi-pattern matcher; patterns can be added and removed between scans."""
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._own: List[Optional[str]] = [None]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        self._live: Set[str] = set()
+        self._dead = 0
+        self._built = True
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self._live
+
+    def add(self, pattern: str) -> None:
+        if not pattern or pattern in self._live:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = self._goto[node][ch] = len(self._goto)
+                self._goto.append({})
+                self._own.append(None)
+            node = nxt
+        if self._own[node] is not None:
+            self._dead -= 1
+        self._own[node] = pattern
+        self._live.add(pattern)
+        self._built = False
+
+    def discard(self, pattern: str) -> None:
+        if pattern in self._live:
+            self._live.discard(pattern)
+            self._dead += 1
+            self._built = False
+
+    def _build(self) -> None:
+        if self._dead > len(self._live):
+            # mostly removed patterns: start from a fresh trie
+            live = list(self._live)
+            self.__init__()
+            for pattern in live:
+                self.add(pattern)
+        size = len(self._goto)
+        self._fail = [0] * size
+        self._out = [()] * size
+        queue = deque()
+        for child in self._goto[0].values():
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            own = self._own[node]
+            mine = (own,) if own in self._live else ()
+            self._out[node] = mine + self._out[self._fail[node]]
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                queue.append(child)
+        self._built = True
+
+    def find(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield ``(start, end, pattern)`` for every occurrence in ``text``."""
+        if not self._built:
+            self._build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern in out[node]:
+                yield i + 1 - len(pattern), i + 1, pattern
+
+
+@dataclass(frozen=True)
+class Mention:
+    kind: str
+    name: str
+    entity_id: str
+    start: int
+    end: int
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class EntitySpotter:
+    """Known entity names of a campaign, kept in step with the change feed."""
+
+    def __init__(self, cm, wm=None) -> None:
+        self.cm = cm
+        self.wm = wm
+        self.revision = 0
+        self.automaton = AhoCorasick()
+        # (file, entity id) -> (pattern, kind, display name)
+        self._entities: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+        # pattern -> entities using it
+        self._by_pattern: Dict[str, Set[Tuple[str, str]]] = {}
+        self._loaded = False
+
+    # ------------------------------------------------------------------
+    # Names
+    # ------------------------------------------------------------------
+    def _read(self, filename: str, ids: Optional[Iterable[str]] = None) -> Dict[str, Tuple[str, str]]:
+        """Return ``{id: (kind, name)}`` for ``filename`` (only ``ids`` if given)."""
+        found: Dict[str, Tuple[str, str]] = {}
+        if filename == "quests.json":
+            quests = self.cm._load_quests()
+            for section in KNOWN_QUEST_SECTIONS:
+                for quest_id, quest in quests.get(section, {}).items():
+                    if quest.get("title"):
+                        found[quest_id] = ("quest", quest["title"])
+        elif filename == "world_memory.json":
+            if self.wm is None:
+                return found
+            entries = self.wm._load() if ids is None else {e["id"]: e for e in self.wm.get_entries(ids)}
+            for entry_id, entry in entries.items():
+                if entry.get("type") in JOURNAL_FIELDS and entry.get("name"):
+                    found[entry_id] = (entry["type"], entry["name"])
+        else:
+            kind = "npc" if filename == "npcs.json" else "item"
+            entities = self.cm._load_json(filename) if ids is None else self.cm._get_entities(filename, ids)
+            for entity_id, entity in entities.items():
+                if entity.get("name"):
+                    found[entity_id] = (kind, entity["name"])
+        if ids is not None:
+            wanted = set(ids)
+            found = {k: v for k, v in found.items() if k in wanted}
+        return found
+
+    def _set(self, key: Tuple[str, str], value: Optional[Tuple[str, str]]) -> None:
+        old = self._entities.pop(key, None)
+        if old is not None:
+            users = self._by_pattern[old[0]]
+            users.discard(key)
+            if not users:
+                del self._by_pattern[old[0]]
+                self.automaton.discard(old[0])
+        if value is None:
+            return
+        kind, name = value
+        pattern = _normalize(name)
+        if len(pattern) < MIN_NAME_LENGTH:
+            return
+        self._entities[key] = (pattern, kind, name)
+        self._by_pattern.setdefault(pattern, set()).add(key)
+        self.automaton.add(pattern)
+
+    def _reload(self, filename: str, ids: Optional[Iterable[str]] = None) -> None:
+        found = self._read(filename, ids)
+        stale = ids if ids is not None else [k[1] for k in self._entities if k[0] == filename]
+        for entity_id in stale:
+            if entity_id not in found:
+                self._set((filename, entity_id), None)
+        for entity_id, value in found.items():
+            self._set((filename, entity_id), value)
+
+    def refresh(self) -> None:
+        """Apply entity changes recorded since the last call."""
+        feed = self.cm.changes
+        head = feed.revision()
+        changes = feed.changes_since(self.revision) if self._loaded else None
+        if changes is None:
+            for filename in SOURCES:
+                self._reload(filename)
+            self._loaded = True
+        else:
+            by_file: Dict[str, Set[Optional[str]]] = {}
+            for change in changes:
+                if change["file"] in SOURCES:
+                    by_file.setdefault(change["file"], set()).add(change["id"])
+            for filename, ids in by_file.items():
+                # quest status changes can hide or reveal a quest, so reread them all
+                if None in ids or filename == "quests.json":
+                    self._reload(filename)
+                else:
+                    self._reload(filename, ids)
+        # files changed after ``head`` are picked up by the next call
+        self.revision = head
+
+    # ------------------------------------------------------------------
+    # Spotting
+    # ------------------------------------------------------------------
+    def spot(self, text: str) -> List[Mention]:
+        """Return whole-word mentions in ``text``; overlaps keep the longest name."""
+        self.refresh()
+        # names are stored lowercased with single spaces between words
+        lowered = text.lower()
+        candidates = []
+        for start, end, pattern in self.automaton.find(lowered):
+            before = lowered[start - 1] if start else " "
+            after = lowered[end] if end < len(lowered) else " "
+            if before.isalnum() or after.isalnum():
+                continue
+            candidates.append((start, -(end - start), end, pattern))
+        candidates.sort()
+        mentions: List[Mention] = []
+        taken_until = 0
+        for start, _length, end, pattern in candidates:
+            if start < taken_until:
+                continue
+            taken_until = end
+            for key in sorted(self._by_pattern.get(pattern, ())):
+                _pattern, kind, name = self._entities[key]
+                mentions.append(Mention(kind, name, key[1], start, end))
+        return mentions
+
+    def journal_mentions(self, text: str) -> Dict[str, List[str]]:
+        """Return the names mentioned in ``text`` grouped by journal list."""
+        grouped: Dict[str, List[str]] = {}
+        for mention in self.spot(text):
+            names = grouped.setdefault(JOURNAL_FIELDS[mention.kind], [])
+            if mention.name not in names:
+                names.append(mention.name)
+        return grouped
+
+    def update_journal(self, journal, text: str) -> Dict[str, List[str]]:
+        """Record the mentions in ``text`` in ``journal`` with one write; return what was new."""
+        grouped = self.journal_mentions(text)
+        return journal.record_mentions(grouped) if grouped else {}
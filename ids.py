@@ -0,0 +1,205 @@
+"""Time-ordered entity IDs and ordered indexes over them.
+
+:func:`new_id` returns a 26-character ULID: 48 bits of milliseconds since
+the epoch followed by 80 random bits, written in Crockford base32 so that
+sorting the strings sorts by creation time. IDs made in the same
+millisecond by one process keep increasing. :class:`OrderedIndex` keeps IDs
+sorted for ``latest``, ``between`` and cursor pages in ``O(log n + k)``;
+:class:`EntityTimeline` keeps one in step with a campaign file through the
+change feed.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DIGITS = {c: i for i, c in enumerate(_ALPHABET)}
+ID_LENGTH = 26
+_RANDOM_BITS = 80
+
+_LOCK = threading.Lock()
+_LAST: List[int] = [0, 0]  # millisecond and random part of the last ID
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(ID_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def _millis(when: datetime | float) -> int:
+    seconds = when.timestamp() if isinstance(when, datetime) else when
+    return int(seconds * 1000)
+
+
+def new_id(when: datetime | float | None = None) -> str:
+    """Return a new time-ordered ID, for ``when`` or the current time."""
+    if when is not None:
+        return _encode(_millis(when) << _RANDOM_BITS | secrets.randbits(_RANDOM_BITS))
+    with _LOCK:
+        ms = int(time.time() * 1000)
+        if ms <= _LAST[0]:
+            # same millisecond (or clock went back): count up from the last ID
+            ms, rand = _LAST[0], _LAST[1] + 1
+            if rand >> _RANDOM_BITS:
+                ms, rand = ms + 1, 0
+        else:
+            rand = secrets.randbits(_RANDOM_BITS - 1)  # leave room to count up
+        _LAST[:] = [ms, rand]
+    return _encode(ms << _RANDOM_BITS | rand)
+
+
+def is_id(value: Any) -> bool:
+    """Return True for strings produced by :func:`new_id`."""
+    return (
+        isinstance(value, str)
+        and len(value) == ID_LENGTH
+        and value[0] <= "7"
+        and all(c in _DIGITS for c in value)
+    )
+
+
+def id_time(value: str) -> datetime:
+    """Return the creation time encoded in an ID."""
+    ms = 0
+    for c in value[:10]:
+        ms = ms * 32 + _DIGITS[c]
+    return datetime.fromtimestamp(ms / 1000, timezone.utc)
+
+
+def id_to_int(value: str) -> int:
+    """Return the 128-bit integer encoded by an ID (see :func:`is_id`)."""
+    number = 0
+    for c in value:
+        number = number * 32 + _DIGITS[c]
+    return number
+
+
+def id_from_int(value: int) -> str:
+    """Inverse of :func:`id_to_int`."""
+    return _encode(value)
+
+
+def lowest_id(when: datetime | float) -> str:
+    """Return the smallest possible ID created at ``when``."""
+    return _encode(_millis(when) << _RANDOM_BITS)
+
+
+def highest_id(when: datetime | float) -> str:
+    """Return the largest possible ID created at ``when``."""
+    return _encode(_millis(when) << _RANDOM_BITS | ((1 << _RANDOM_BITS) - 1))
+
+
+class OrderedIndex:
+    """IDs in creation order; keys that are not time-ordered IDs are skipped."""
+
+    def __init__(self, ids: Iterable[str] = ()) -> None:
+        self._ids = sorted(i for i in ids if is_id(i))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, entity_id: str) -> None:
+        if not is_id(entity_id):
+            return
+        pos = bisect_left(self._ids, entity_id)
+        if pos == len(self._ids) or self._ids[pos] != entity_id:
+            insort(self._ids, entity_id, lo=pos)
+
+    def discard(self, entity_id: str) -> None:
+        pos = bisect_left(self._ids, entity_id)
+        if pos < len(self._ids) and self._ids[pos] == entity_id:
+            del self._ids[pos]
+
+    def latest(self, n: int) -> List[str]:
+        """Return the ``n`` newest IDs, newest first."""
+        return self._ids[-n:][::-1] if n > 0 else []
+
+    def between(self, start: datetime | float, end: datetime | float | None = None) -> List[str]:
+        """Return IDs created from ``start`` to ``end`` (inclusive), oldest first."""
+        lo = bisect_left(self._ids, lowest_id(start))
+        hi = len(self._ids) if end is None else bisect_right(self._ids, highest_id(end))
+        return self._ids[lo:hi]
+
+    def page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        descending: bool = True,
+    ) -> Tuple[List[str], Optional[str]]:
+        """Return up to ``limit`` IDs after ``cursor`` and the cursor of the next page."""
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        if descending:
+            end = len(self._ids) if cursor is None else bisect_left(self._ids, cursor)
+            ids = self._ids[max(0, end - limit) : end][::-1]
+            more = end - limit > 0
+        else:
+            start = 0 if cursor is None else bisect_right(self._ids, cursor)
+            ids = self._ids[start : start + limit]
+            more = start + limit < len(self._ids)
+        return ids, (ids[-1] if more and ids else None)
+
+
+class EntityTimeline:
+    """:class:`OrderedIndex` of one campaign file, refreshed from the change feed."""
+
+    def __init__(self, cm, filename: str) -> None:
+        self.cm = cm
+        self.filename = filename
+        self.revision = 0
+        self._index: Optional[OrderedIndex] = None
+
+    def _keys(self) -> Iterable[str]:
+        data = self.cm._load_json(self.filename)
+        if self.filename == "quests.json":
+            return [quest_id for section in data.values() for quest_id in section]
+        return data
+
+    @property
+    def index(self) -> OrderedIndex:
+        feed = self.cm.changes
+        head = feed.revision()
+        changes = None if self._index is None else feed.changes_since(self.revision)
+        mine = [c for c in changes or () if c["file"] == self.filename]
+        if changes is None or any(c["id"] is None for c in mine):
+            self._index = OrderedIndex(self._keys())
+        else:
+            for change in mine:
+                if change["op"] == "delete":
+                    self._index.discard(change["id"])
+                else:
+                    self._index.add(change["id"])
+        # files changed after ``head`` are picked up by the next access
+        self.revision = head
+        return self._index
+
+    def _entities(self, ids: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        if self.filename == "quests.json":
+            wanted = set(ids)
+            quests = self.cm._load_quests()
+            found = {i: q for section in quests.values() for i, q in section.items() if i in wanted}
+        else:
+            found = self.cm._get_entities(self.filename, ids)
+        return [(i, found[i]) for i in ids if i in found]
+
+    def latest(self, n: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return the ``n`` newest ``(id, entity)`` pairs, newest first."""
+        return self._entities(self.index.latest(n))
+
+    def between(self, start: datetime | float, end: datetime | float | None = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return ``(id, entity)`` pairs created from ``start`` to ``end``, oldest first."""
+        return self._entities(self.index.between(start, end))
+
+    def page(self, cursor: Optional[str] = None, limit: int = 20, descending: bool = True):
+        """Return ``(pairs, next_cursor)`` for one page of entities."""
+        ids, next_cursor = self.index.page(cursor, limit, descending)
+        return self._entities(ids), next_cursor
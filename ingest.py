@@ -0,0 +1,151 @@
+"""Bulk ingestion of prepared content (NPCs, items, world memory).
+
+Records are streamed from JSONL or CSV and collected per target file, so
+each file is read once and written once no matter how many records it
+receives. Derived search indexes are rebuilt once per touched file.
+
+Every record needs a ``kind`` of ``npc``, ``item``, ``memory`` or
+``dm_memory`` (hidden world memory). In CSV files ``tags`` and
+``related_to`` are ``;``-separated and ``relationships`` is a JSON object.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .campaign_manager import CampaignManager
+from .ids import new_id
+from .maintenance import rebuild_search_index, summarize_file
+from .world_memory import WorldMemoryManager
+
+KIND_FILES = {
+    "npc": "npcs.json",
+    "item": "items.json",
+    "memory": "world_memory.json",
+    "dm_memory": "world_memory_dm.json",
+}
+
+_LIST_FIELDS = ("tags", "related_to")
+_JSON_FIELDS = ("relationships",)
+
+# Stop collecting error messages after this many; errors are still counted.
+MAX_REPORTED_ERRORS = 20
+
+
+def _detect_format(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _from_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {k: v for k, v in row.items() if k and v not in (None, "")}
+    for key in _LIST_FIELDS:
+        if key in record:
+            record[key] = [part.strip() for part in record[key].split(";") if part.strip()]
+    for key in _JSON_FIELDS:
+        if key in record:
+            record[key] = json.loads(record[key])
+    return record
+
+
+def iter_records(path: str, fmt: str | None = None) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(line_number, record)`` pairs from a JSONL or CSV file.
+
+    Lines that cannot be parsed yield the ``ValueError`` instead of a record.
+    """
+    fmt = fmt or _detect_format(path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                try:
+                    yield line_no, _from_csv_row(row)
+                except ValueError as e:
+                    yield line_no, e
+        elif fmt == "jsonl":
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError as e:
+                    yield line_no, e
+        else:
+            raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _build(kind: str, record: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Validate ``record`` and return ``(id, stored_entry)`` for ``kind``."""
+    if kind in ("memory", "dm_memory"):
+        entry = WorldMemoryManager.build_entry(record)
+        return entry["id"], entry
+    if not record.get("name"):
+        raise ValueError("Missing required field: name")
+    now = datetime.now(timezone.utc).isoformat()
+    if kind == "npc":
+        record.setdefault("timestamp", now)
+    else:
+        record["timestamp"] = now
+    return new_id(), record
+
+
+def ingest_file(
+    campaign_name: str,
+    path: str,
+    fmt: str | None = None,
+    update_indexes: bool = True,
+) -> Dict[str, Any]:
+    """Load every valid record of ``path`` into ``campaign_name``.
+
+    Returns counts per kind, rejected records and throughput figures.
+    """
+    started = time.perf_counter()
+    cm = CampaignManager(campaign_name)
+    targets: Dict[str, Dict[str, Any]] = {}
+    counts: Dict[str, int] = {kind: 0 for kind in KIND_FILES}
+    errors: List[str] = []
+    rejected = 0
+
+    for line_no, record in iter_records(path, fmt):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            if not isinstance(record, dict):
+                raise ValueError("Record is not an object")
+            kind = record.pop("kind", None)
+            if kind not in KIND_FILES:
+                raise ValueError(f"Invalid kind: {kind}")
+            entry_id, entry = _build(kind, record)
+        except ValueError as e:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"line {line_no}: {e}")
+            continue
+        filename = KIND_FILES[kind]
+        if filename not in targets:
+            if kind in ("memory", "dm_memory"):
+                WorldMemoryManager(campaign_name, hidden=kind == "dm_memory")
+            targets[filename] = cm._load_json(filename)
+        targets[filename][entry_id] = entry
+        counts[kind] += 1
+
+    for filename, data in targets.items():
+        # one file-wide change record; readers reload the whole file
+        cm._save_json(filename, data, [(None, "ingest")])
+        if update_indexes:
+            rebuild_search_index(cm.path, filename)
+            summarize_file(cm.path, filename)
+
+    elapsed = time.perf_counter() - started
+    ingested = sum(counts.values())
+    return {
+        "ingested": ingested,
+        "rejected": rejected,
+        "counts": counts,
+        "errors": errors,
+        "files": sorted(targets),
+        "seconds": elapsed,
+        "records_per_minute": ingested / elapsed * 60 if elapsed else 0.0,
+    }
@@ -5,9 +5,9 @@ from __future__ import annotations
 import json
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
-from campaign_manager import CAMPAIGNS_DIR
+from campaign_manager import CAMPAIGNS_DIR, notify_change
 
 
 class JournalManager:
@@ -21,6 +21,9 @@ class JournalManager:
 
         self.campaign_name = campaign_name
         self.character_name = character_name
+        # journals live under the lowercased name, but change records go to
+        # the feed of the directory ``CampaignManager(campaign_name)`` uses
+        self.campaign_path = os.path.join(CAMPAIGNS_DIR, campaign_name)
         self.dir = os.path.join(CAMPAIGNS_DIR, safe_campaign, "players")
         os.makedirs(self.dir, exist_ok=True)
         self.path = os.path.join(self.dir, f"{safe_name}_journal.json")
@@ -34,16 +37,24 @@ class JournalManager:
                     "quests": [],
                     "events": [],
                     "images": [],
-                }
+                },
+                op="add",
             )
 
     def _load(self) -> Dict[str, Any]:
         with open(self.path, "r", encoding="utf-8") as fp:
             return json.load(fp)
 
-    def _save(self, data: Dict[str, Any]) -> None:
+    def _save(self, data: Dict[str, Any], op: str = "update") -> None:
         with open(self.path, "w", encoding="utf-8") as fp:
             json.dump(data, fp, indent=2)
+        # without a campaign folder the journal's own folder takes the record
+        root = self.campaign_path if os.path.isdir(self.campaign_path) else os.path.dirname(self.dir)
+        notify_change(
+            root,
+            os.path.join("players", os.path.basename(self.path)),
+            [(self.character_name, op)],
+        )
 
     # ------------------------------------------------------------------
     # Entry helpers
@@ -113,6 +124,23 @@ class JournalManager:
             quests.append(name)
             self._save(data)
 
+    def record_mentions(self, mentions: Dict[str, Iterable[str]]) -> Dict[str, List[str]]:
+        """Add names to several journal lists (``npcs``, ``quests``, ...) in one write.
+
+        Returns the names that were new, per list.
+        """
+        data = self._load()
+        added: Dict[str, List[str]] = {}
+        for field, names in mentions.items():
+            known: List[str] = data.setdefault(field, [])
+            for name in names:
+                if name not in known:
+                    known.append(name)
+                    added.setdefault(field, []).append(name)
+        if added:
+            self._save(data)
+        return added
+
     def remove_quest(self, name: str) -> None:
         """Remove ``name`` from the quest list if present."""
         data = self._load()
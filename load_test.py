@@ -0,0 +1,234 @@
+"""Concurrent multi-player load test for the storage and prompt pipeline.
+
+Each simulated session runs the same steps as one ``streamlit_app`` turn:
+set up managers, load player and campaign data, build the prompt, call the
+model (a local mock with configurable latency), then record the result via
+``update_player_state``, ``update_world_state`` and ``log_event``. Every
+session of a campaign bumps the same ``turns_played`` counter in
+``world_state.json`` and appends to the same event log, so those writes
+contend. The report lists p50/p95/p99 per stage, overall throughput and how
+many of the contended writes were lost to read-modify-write races.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from .campaign_manager import (
+    CampaignManager,
+    PlayerManager,
+    delete_campaign,
+    list_campaigns,
+    load_campaign_data,
+    load_player_state,
+)
+from .config import Config
+from .model_router import ModelRouter
+from .prompt_builder import build_messages
+from .world_memory import WorldMemoryManager
+
+STAGES = [
+    "initialize_state",
+    "load_player_state",
+    "load_campaign_data",
+    "build_prompt",
+    "response",
+    "update_player_state",
+    "update_world_state",
+    "log_event",
+]
+
+SAMPLE_INPUTS = [
+    "I look around the tavern.",
+    "What is in my inventory?",
+    "I ask the barkeep about the missing caravan.",
+    "ok",
+    "I draw my sword and step into the crypt.",
+]
+
+
+class MockLLM:
+    """Stand-in for the chat API that sleeps for a configurable latency."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, seed: int | None = None) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, model: str, messages: List[Dict[str, str]], timeout: float, **params: Any) -> str:
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        return f"[{model}] The story continues."
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.errors: Dict[str, int] = {stage: 0 for stage in STAGES}
+
+    def timed(self, stage: str, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            with self.lock:
+                self.errors[stage] += 1
+            return None
+        finally:
+            with self.lock:
+                self.samples[stage].append(time.perf_counter() - start)
+
+
+def _run_session(campaign: str, player: str, turns: int, router: ModelRouter, rec: _Recorder) -> None:
+    """Play ``turns`` turns of ``player`` in ``campaign``."""
+    character = {"name": player, "race": "human", "character_class": "fighter", "level": 1}
+    history: List[str] = []
+
+    def initialize_state():
+        cm = CampaignManager(campaign)
+        cm.initialize_player_state(player)
+        PlayerManager().load_character(player)
+        return cm, WorldMemoryManager(campaign)
+
+    def count_turn(cm: CampaignManager) -> None:
+        # shared by every session of the campaign
+        played = cm._load_json("world_state.json").get("turns_played", 0)
+        cm.update_world_state({"turns_played": played + 1})
+
+    managers = rec.timed("initialize_state", initialize_state)
+    if managers is None:
+        return
+    cm, wm = managers
+    for turn in range(turns):
+        user_input = SAMPLE_INPUTS[turn % len(SAMPLE_INPUTS)]
+        history.append(f"Player: {user_input}")
+        state = rec.timed("load_player_state", load_player_state, cm, player) or {}
+        campaign_data = rec.timed("load_campaign_data", load_campaign_data, cm, compact=True) or {}
+        chat_prompt = rec.timed(
+            "build_prompt",
+            lambda: build_messages(
+                player, {**character, **state}, campaign_data,
+                list(wm.entries().values()), history[:-1], user_input,
+                world_digests=wm.digests(),
+            ),
+        )
+        messages = chat_prompt.messages if chat_prompt else [{"role": "user", "content": user_input}]
+        reply = rec.timed("response", router.complete, messages, user_input) or ""
+        history.append(f"Narrator: {reply}")
+        rec.timed("update_player_state", cm.update_player_state, player, {"gold": state.get("gold", 0) + 1})
+        rec.timed("update_world_state", count_turn, cm)
+        rec.timed("log_event", cm.log_event, f"{player} turn {turn}")
+
+
+def run_load_test(
+    players: int = 50,
+    campaigns: int = 10,
+    turns: int = 5,
+    latency: float = 0.05,
+    jitter: float = 0.0,
+    prefix: str = "loadtest",
+    cleanup: bool = True,
+) -> Dict[str, Any]:
+    """Run ``players`` concurrent sessions spread over ``campaigns``.
+
+    Campaigns are named ``<prefix>_<n>`` and deleted afterwards unless
+    ``cleanup`` is False; existing campaigns with those names are never
+    touched. Returns the report as a dictionary.
+    """
+    names = [f"{prefix}_{i}" for i in range(campaigns)]
+    existing = set(list_campaigns()) & set(names)
+    if existing:
+        raise FileExistsError(f"Campaigns already exist: {', '.join(sorted(existing))}")
+    for name in names:
+        CampaignManager(name)
+    config = Config(latency_budget=max(10.0, latency * 10))
+    router = ModelRouter(config, MockLLM(latency, jitter), max_workers=max(8, players))
+    rec = _Recorder()
+    sessions = [(names[i % campaigns], f"player_{i}") for i in range(players)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=players) as executor:
+        futures = [executor.submit(_run_session, c, p, turns, router, rec) for c, p in sessions]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    lost_events = 0
+    lost_turns = 0
+    corrupted: List[str] = []
+    managers = {name: CampaignManager(name) for name in names}
+    for name, cm in managers.items():
+        written = sum(1 for c, _p in sessions if c == name) * turns
+        try:
+            recorded = len(cm._load_json("events_log.json"))
+        except ValueError:
+            # interleaved writes can leave a file that no longer parses
+            corrupted.append(f"{name}/events_log.json")
+            recorded = 0
+        lost_events += max(0, written - recorded)
+        try:
+            counted = cm._load_json("world_state.json").get("turns_played", 0)
+        except ValueError:
+            corrupted.append(f"{name}/world_state.json")
+            counted = 0
+        lost_turns += max(0, written - counted)
+    for name, player in sessions:
+        try:
+            load_player_state(managers[name], player)
+        except ValueError:
+            corrupted.append(f"{name}/players/{player}.json")
+    if cleanup:
+        for name in names:
+            delete_campaign(name)
+
+    stages = {}
+    for stage in STAGES:
+        ordered = sorted(rec.samples[stage])
+        stages[stage] = {
+            "count": len(ordered),
+            "errors": rec.errors[stage],
+            "p50_ms": _percentile(ordered, 0.50) * 1000,
+            "p95_ms": _percentile(ordered, 0.95) * 1000,
+            "p99_ms": _percentile(ordered, 0.99) * 1000,
+        }
+    total_turns = players * turns
+    return {
+        "players": players,
+        "campaigns": campaigns,
+        "turns": total_turns,
+        "seconds": elapsed,
+        "turns_per_second": total_turns / elapsed if elapsed else 0.0,
+        "stages": stages,
+        "lost_updates": {"events": lost_events, "world_state": lost_turns},
+        "corrupted_files": corrupted,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a load test report as a plain text table."""
+    lines = [
+        f"{report['players']} players on {report['campaigns']} campaigns, "
+        f"{report['turns']} turns in {report['seconds']:.2f}s "
+        f"({report['turns_per_second']:.1f} turns/s)",
+        f"{'stage':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}",
+    ]
+    for stage, s in report["stages"].items():
+        lines.append(f"{stage:<22}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['errors']:>8}")
+    lost = report["lost_updates"]
+    lines.append(f"lost updates: {lost['events']} events, {lost['world_state']} world state counter")
+    if report["corrupted_files"]:
+        lines.append(f"corrupted files: {', '.join(report['corrupted_files'])}")
+    return "\n".join(lines)
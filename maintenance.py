@@ -0,0 +1,397 @@
+"""Background index maintenance for campaign data files.
+
+Managers report every write through :func:`campaign_manager.notify_change`.
+:class:`MaintenanceService` listens for those notifications, coalesces them
+in a bounded queue and runs the expensive work (search index rebuilds,
+summaries and index compaction) in a ``ProcessPoolExecutor`` so foreground
+turns never wait for it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .campaign_manager import add_change_listener, remove_change_listener
+from .sharding import read_entities, source_exists, source_mtime
+
+INDEX_DIR = "indexes"
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# index path -> ((mtime_ns, size) of the index file, parsed index)
+_INDEX_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+
+def _index_path(campaign_path: str, filename: str, kind: str) -> str:
+    stem = os.path.splitext(filename)[0].replace(os.sep, "__").replace("/", "__")
+    return os.path.join(campaign_path, INDEX_DIR, f"{stem}.{kind}.json")
+
+
+def _source_dir(campaign_path: str, filename: str) -> str:
+    """Return the folder that holds ``filename`` of ``campaign_path``.
+
+    ``JournalManager`` keeps journals under the lowercased, underscored
+    campaign name but reports their changes for the campaign folder.
+    """
+    if filename.endswith("_journal.json"):
+        parent, name = os.path.split(os.path.normpath(campaign_path))
+        return os.path.join(parent, name.lower().replace(" ", "_"))
+    return campaign_path
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _iter_documents(filename: str, data: Any) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(doc_id, document)`` pairs for a campaign data file."""
+    if not isinstance(data, dict):
+        return
+    for key, value in data.items():
+        if os.path.basename(filename) == "quests.json" and isinstance(value, dict):
+            for quest_id, quest in value.items():
+                yield quest_id, quest
+        elif isinstance(value, list):
+            for idx, item in enumerate(value):
+                yield f"{key}:{idx}", item
+        else:
+            yield key, value
+
+
+def tokenize(text: str) -> List[str]:
+    """Return lowercase search tokens for ``text``."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+# ----------------------------------------------------------------------
+# Tasks (run inside worker processes)
+# ----------------------------------------------------------------------
+
+def rebuild_search_index(campaign_path: str, filename: str) -> Dict[str, Any]:
+    """Build an inverted token index for ``filename`` and store it."""
+    campaign_path = _source_dir(campaign_path, filename)
+    if not source_exists(campaign_path, filename):
+        return {"file": filename, "documents": 0, "skipped": True}
+    # taken before reading, so a write during the rebuild leaves it stale
+    mtime = source_mtime(campaign_path, filename)
+    data = read_entities(campaign_path, filename)
+    tokens: Dict[str, List[str]] = {}
+    order: List[str] = []
+    for doc_id, doc in _iter_documents(filename, data):
+        order.append(doc_id)
+        text = doc if isinstance(doc, str) else json.dumps(doc)
+        for token in set(tokenize(text)):
+            tokens.setdefault(token, []).append(doc_id)
+    _write_json_atomic(
+        _index_path(campaign_path, filename, "search"),
+        {"source": filename, "mtime": mtime, "documents": order, "tokens": tokens},
+    )
+    return {"file": filename, "documents": len(order), "tokens": len(tokens)}
+
+
+def summarize_file(campaign_path: str, filename: str) -> Dict[str, Any]:
+    """Store entry counts per type and the latest timestamp for ``filename``."""
+    campaign_path = _source_dir(campaign_path, filename)
+    if not source_exists(campaign_path, filename):
+        return {"file": filename, "documents": 0, "skipped": True}
+    data = read_entities(campaign_path, filename)
+    counts: Dict[str, int] = {}
+    latest = ""
+    documents = 0
+    for _doc_id, doc in _iter_documents(filename, data):
+        documents += 1
+        if isinstance(doc, dict):
+            kind = str(doc.get("type", "entry"))
+            latest = max(latest, str(doc.get("timestamp", "")))
+        else:
+            kind = "value"
+        counts[kind] = counts.get(kind, 0) + 1
+    summary = {
+        "source": filename,
+        "documents": documents,
+        "types": counts,
+        "latest": latest,
+    }
+    _write_json_atomic(_index_path(campaign_path, filename, "summary"), summary)
+    return summary
+
+
+def compact_indexes(campaign_path: str, filename: str | None = None) -> Dict[str, Any]:
+    """Remove index files whose source data file no longer exists."""
+    index_dir = os.path.join(campaign_path, INDEX_DIR)
+    removed = 0
+    if os.path.isdir(index_dir):
+        for name in os.listdir(index_dir):
+            path = os.path.join(index_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    source = json.load(f).get("source")
+            except (OSError, ValueError, AttributeError):
+                source = None
+            if source and not source_exists(campaign_path, source):
+                os.remove(path)
+                removed += 1
+    return {"removed": removed}
+
+
+TASKS = {
+    "index": rebuild_search_index,
+    "summary": summarize_file,
+    "compact": compact_indexes,
+}
+
+
+def _run_task(task: str, campaign_path: str, filename: str | None) -> Dict[str, Any]:
+    return TASKS[task](campaign_path, filename)
+
+
+def _load_index(campaign_path: str, filename: str) -> Optional[Dict[str, Any]]:
+    """Return the search index of ``filename`` if it is up to date."""
+    path = _index_path(campaign_path, filename, "search")
+    try:
+        mtime = source_mtime(campaign_path, filename)
+        stat = os.stat(path)
+    except OSError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _INDEX_CACHE.get(path)
+    if cached is None or cached[0] != stamp:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        cached = _INDEX_CACHE[path] = (stamp, index)
+    index = cached[1]
+    if index.get("mtime") != mtime:
+        return None  # the data file changed after the index was built
+    return index
+
+
+def query_index(campaign_path: str, filename: str, term: str) -> Optional[List[str]]:
+    """Return document IDs containing every token of ``term``.
+
+    Returns ``None`` when the index is missing or older than the data file.
+    """
+    index = _load_index(_source_dir(campaign_path, filename), filename)
+    if index is None:
+        return None
+    tokens = index.get("tokens", {})
+    result: Optional[set] = None
+    for token in tokenize(term):
+        ids = set(tokens.get(token, []))
+        result = ids if result is None else result & ids
+    return sorted(result or [])
+
+
+def search_candidates(campaign_path: str, filename: str, query: str) -> Optional[List[str]]:
+    """Return IDs of the documents that may contain ``query`` as a substring.
+
+    Every query token is looked up as a substring of the indexed tokens, so
+    words cut off at either end of ``query`` still match; callers check the
+    returned documents themselves, which come in file order. Returns ``None``
+    when the index is missing or stale, or ``query`` has no tokens, and the
+    file has to be scanned.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+    index = _load_index(campaign_path, filename)
+    if index is None or "documents" not in index:
+        return None
+    result: Optional[set] = None
+    for term in terms:
+        ids = set()
+        for token, doc_ids in index.get("tokens", {}).items():
+            if term in token:
+                ids.update(doc_ids)
+        result = ids if result is None else result & ids
+        if not result:
+            return []
+    return [doc_id for doc_id in index["documents"] if doc_id in result]
+
+
+# ----------------------------------------------------------------------
+# Service
+# ----------------------------------------------------------------------
+
+class MaintenanceService:
+    """Run index maintenance in a process pool fed by change notifications.
+
+    ``max_pending`` bounds the number of queued jobs. When the queue is full
+    new notifications are counted as dropped instead of blocking the caller
+    and kept in a dirty set, which is queued again as soon as there is room;
+    identical pending jobs are coalesced.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_pending: int = 256,
+        max_in_flight: int | None = None,
+    ) -> None:
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_pending = max_pending
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Optional[str]]]]" = queue.Queue(max_pending)
+        self._pending: set = set()
+        # jobs rejected by a full queue, in arrival order
+        self._dirty: Dict[Tuple[str, str, Optional[str]], None] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight or self.max_workers * 2)
+        self._executor: ProcessPoolExecutor | None = None
+        self._thread: threading.Thread | None = None
+        self._stats = {"completed": 0, "failed": 0, "dropped": 0, "running": 0}
+        self._last_error = ""
+
+    # --------------------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------------------
+    def start(self) -> "MaintenanceService":
+        """Start the worker pool and subscribe to change notifications."""
+        if self._thread is not None:
+            return self
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._thread = threading.Thread(target=self._dispatch, name="maintenance", daemon=True)
+        self._thread.start()
+        add_change_listener(self.notify)
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop accepting work and shut the pool down."""
+        remove_change_listener(self.notify)
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+        self._thread = None
+        self._executor = None
+
+    # --------------------------------------------------------------
+    # Queueing
+    # --------------------------------------------------------------
+    def notify(self, campaign_path: str, filename: str) -> None:
+        """Change listener: schedule index and summary rebuilds.
+
+        An index rebuild that finds its source gone also schedules a
+        ``compact`` of the campaign's index folder.
+        """
+        if filename.startswith(INDEX_DIR) or not filename.endswith(".json"):
+            return
+        self.submit("index", campaign_path, filename)
+        self.submit("summary", campaign_path, filename)
+
+    def submit(
+        self,
+        task: str,
+        campaign_path: str,
+        filename: str | None = None,
+        block: bool = False,
+        timeout: float | None = None,
+    ) -> bool:
+        """Queue ``task`` and return ``False`` if the queue was full.
+
+        A job that did not fit is queued later by the dispatcher. Jobs
+        identical to one already waiting are accepted without being queued
+        twice. With ``block=True`` the caller waits up to ``timeout``
+        seconds for room in the queue.
+        """
+        if task not in TASKS:
+            raise ValueError(f"Unknown task: {task}")
+        key = (task, str(campaign_path), filename)
+        with self._lock:
+            if key in self._pending:
+                return True
+            self._pending.add(key)
+        try:
+            self._queue.put(key, block=block, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._dirty[key] = None
+                self._stats["dropped"] += 1
+            # the dispatcher may have drained the queue in the meantime
+            self._requeue_dirty()
+            return False
+        return True
+
+    def _requeue_dirty(self) -> None:
+        """Move dropped jobs back into the queue while it has room."""
+        with self._lock:
+            while self._dirty:
+                key = next(iter(self._dirty))
+                try:
+                    self._queue.put_nowait(key)
+                except queue.Full:
+                    break
+                del self._dirty[key]
+
+    def _dispatch(self) -> None:
+        while True:
+            key = self._queue.get()
+            if key is None:
+                break
+            self._requeue_dirty()
+            self._slots.acquire()
+            with self._lock:
+                self._pending.discard(key)
+                self._stats["running"] += 1
+            future = self._executor.submit(_run_task, *key)
+            future.add_done_callback(lambda f, key=key: self._finished(key, f))
+
+    def _finished(self, key: Tuple[str, str, Optional[str]], future: Future) -> None:
+        error = future.exception()
+        if key[0] == "index" and error is None and future.result().get("skipped"):
+            # the source is gone; drop its index files
+            self.submit("compact", _source_dir(key[1], key[2]))
+        with self._lock:
+            self._stats["running"] -= 1
+            if error is None:
+                self._stats["completed"] += 1
+            else:
+                self._stats["failed"] += 1
+                self._last_error = str(error)
+        self._slots.release()
+
+    # --------------------------------------------------------------
+    # Progress
+    # --------------------------------------------------------------
+    @property
+    def backpressure(self) -> float:
+        """Fraction of the pending queue currently in use (0.0 - 1.0)."""
+        return self._queue.qsize() / self.max_pending if self.max_pending else 0.0
+
+    def progress(self) -> Dict[str, Any]:
+        """Return queue and worker statistics."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["last_error"] = self._last_error
+            stats["dirty"] = len(self._dirty)
+        stats["queued"] = self._queue.qsize()
+        stats["backpressure"] = self.backpressure
+        stats["saturated"] = self._queue.full()
+        return stats
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until all queued jobs finished. Return ``False`` on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                idle = not self._pending and self._stats["running"] == 0
+            if idle and self._queue.empty():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
@@ -0,0 +1,250 @@
+"""Versioned schema migrations for campaign data.
+
+Each migration upgrades a campaign from ``version - 1`` to ``version`` and is
+registered with :func:`migration`. ``version.json`` is rewritten after every
+step, so an interrupted run resumes from the last completed step.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Tuple
+
+from . import campaign_manager
+
+# version -> (description, function). A function receives the campaign path
+# and ``dry_run`` flag and returns the files it changed (or would change).
+MIGRATIONS: Dict[int, Tuple[str, Callable[[str, bool], List[str]]]] = {}
+
+
+def migration(version: int, description: str):
+    """Register a migration step producing schema ``version``."""
+
+    def decorator(func: Callable[[str, bool], List[str]]):
+        if version in MIGRATIONS:
+            raise ValueError(f"Duplicate migration for version {version}")
+        MIGRATIONS[version] = (description, func)
+        return func
+
+    return decorator
+
+
+def _load(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(path: str, data: Any) -> None:
+    tmp = f"{path}.migrating"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def read_version(campaign_path: str) -> int:
+    """Return the schema version stored for a campaign (``1`` if unknown)."""
+    path = os.path.join(campaign_path, "version.json")
+    if not os.path.exists(path):
+        return 1
+    return int(_load(path).get("version", 1))
+
+
+def _write_version(campaign_path: str, version: int) -> None:
+    _save(os.path.join(campaign_path, "version.json"), {"version": version})
+
+
+def pending_migrations(campaign_path: str) -> List[int]:
+    """Return the versions still to apply to a campaign, in order."""
+    current = read_version(campaign_path)
+    return sorted(v for v in MIGRATIONS if current < v <= campaign_manager.VERSION)
+
+
+# ----------------------------------------------------------------------
+# Migration steps
+# ----------------------------------------------------------------------
+
+@migration(2, "Fill missing player state fields and repair quests.json")
+def _fill_player_defaults(campaign_path: str, dry_run: bool) -> List[str]:
+    changed: List[str] = []
+    players_dir = os.path.join(campaign_path, "players")
+    if os.path.isdir(players_dir):
+        for filename in sorted(os.listdir(players_dir)):
+            if not filename.endswith(".json") or filename.endswith("_journal.json"):
+                continue
+            path = os.path.join(players_dir, filename)
+            state = _load(path)
+            missing = {k: v for k, v in campaign_manager.DEFAULT_PLAYER_STATE.items() if k not in state}
+            if missing:
+                changed.append(os.path.join("players", filename))
+                if not dry_run:
+                    state.update(copy.deepcopy(missing))
+                    _save(path, state)
+
+    quests_path = os.path.join(campaign_path, "quests.json")
+    if os.path.exists(quests_path):
+        quests = _load(quests_path)
+        if not isinstance(quests, dict):
+            quests = {}
+        sections = ("active", "completed", "missed")
+        if not all(isinstance(quests.get(k), dict) for k in sections):
+            changed.append("quests.json")
+            if not dry_run:
+                for section in sections:
+                    if not isinstance(quests.get(section), dict):
+                        quests[section] = {}
+                _save(quests_path, quests)
+    return changed
+
+
+# Files whose keys become time-ordered IDs in version 3 (quests.json too)
+TIME_ORDERED_FILES = ("npcs.json", "items.json", "events_log.json", "events_dm_log.json")
+# Old key -> new key of every entity renamed by version 3
+ID_MAP_FILE = "id_map_v3.json"
+
+
+def _time_ordered_id(entity: Any) -> str:
+    """Return a new ID dated at the entity's ``timestamp`` when it has one."""
+    from .ids import new_id
+
+    timestamp = entity.get("timestamp") if isinstance(entity, dict) else None
+    try:
+        when = datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else None
+    except ValueError:
+        when = None
+    if when is not None and when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return new_id(when)
+
+
+@migration(3, "Give events, NPCs, items and quests time-ordered IDs")
+def _assign_time_ordered_ids(campaign_path: str, dry_run: bool) -> List[str]:
+    from .changefeed import ChangeFeed
+    from .ids import is_id
+    from .sharding import open_store, read_entities, source_exists
+    from .versioning import FileHistory
+
+    # an interrupted run left its map behind; reuse it so files rewritten
+    # by that run and the ones still pending agree on every new ID
+    map_path = os.path.join(campaign_path, ID_MAP_FILE)
+    id_map: Dict[str, str] = _load(map_path) if os.path.exists(map_path) else {}
+
+    def rekey(entities: Dict[str, Any]) -> Dict[str, Any]:
+        for key, value in entities.items():
+            if not is_id(key) and key not in id_map:
+                id_map[key] = _time_ordered_id(value)
+        return dict(sorted((id_map.get(k, k), v) for k, v in entities.items()))
+
+    rewrites: Dict[str, Tuple[Any, Any]] = {}
+    for filename in TIME_ORDERED_FILES:
+        if source_exists(campaign_path, filename):
+            data = read_entities(campaign_path, filename)
+            new = rekey(data)
+            if list(new) != list(data):
+                rewrites[filename] = (data, new)
+
+    quests_path = os.path.join(campaign_path, "quests.json")
+    if os.path.exists(quests_path):
+        quests = _load(quests_path)
+        new = {section: rekey(entries) for section, entries in quests.items()}
+        for entries in new.values():
+            for quest in entries.values():
+                required = (quest.get("requires") or {}).get("quests")
+                if required:
+                    quest["requires"]["quests"] = {id_map.get(q, q): status for q, status in required.items()}
+        if new != quests:
+            rewrites["quests.json"] = (quests, new)
+
+    players_dir = os.path.join(campaign_path, "players")
+    if id_map and os.path.isdir(players_dir):
+        for filename in sorted(os.listdir(players_dir)):
+            if not filename.endswith(".json") or filename.endswith("_journal.json"):
+                continue
+            state = _load(os.path.join(players_dir, filename))
+            new_state = copy.deepcopy(state)
+            for entry in new_state.get("quests", []):
+                if isinstance(entry, dict) and entry.get("id") in id_map:
+                    entry["id"] = id_map[entry["id"]]
+            if new_state != state:
+                rewrites[os.path.join("players", filename)] = (state, new_state)
+
+    changed = list(rewrites)
+    if dry_run or not rewrites:
+        return changed
+    # the map is written first so references kept elsewhere can be fixed up
+    # and a rerun reuses it; files holding references are rewritten before
+    # the quests they point at
+    _save(map_path, id_map)
+    feed = ChangeFeed(campaign_path)
+    order = sorted(rewrites, key=lambda f: (not f.startswith("players"), f == "quests.json"))
+    for filename in order:
+        old, new = rewrites[filename]
+        if filename in campaign_manager.CampaignManager.VERSIONED_FILES:
+            FileHistory(campaign_path, filename).record(old, new)
+        store = open_store(campaign_path, filename)
+        if store is not None:
+            store.replace_all(new)
+        else:
+            _save(os.path.join(campaign_path, filename), new)
+        feed.record(filename, [(None, "migrate")])
+    return changed + [ID_MAP_FILE]
+
+
+# ----------------------------------------------------------------------
+# Runners
+# ----------------------------------------------------------------------
+
+def migrate_campaign(campaign_path: str, dry_run: bool = False) -> Dict[str, Any]:
+    """Apply pending migrations to the campaign at ``campaign_path``."""
+    start = read_version(campaign_path)
+    steps = []
+    for version in pending_migrations(campaign_path):
+        description, func = MIGRATIONS[version]
+        changed = func(campaign_path, dry_run)
+        steps.append({"version": version, "description": description, "changed": changed})
+        if not dry_run:
+            _write_version(campaign_path, version)
+    return {
+        "campaign": os.path.basename(campaign_path),
+        "from": start,
+        "to": steps[-1]["version"] if steps else start,
+        "steps": steps,
+        "dry_run": dry_run,
+    }
+
+
+def migrate_all(
+    workers: int | None = None,
+    dry_run: bool = False,
+    progress: Callable[[int, int, Dict[str, Any]], None] | None = None,
+) -> List[Dict[str, Any]]:
+    """Migrate every campaign in parallel worker processes.
+
+    Campaigns already at :data:`campaign_manager.VERSION` are skipped, which
+    makes re-running after an interruption resume where it stopped, and so
+    are directories that only hold player journals.
+    ``progress`` is called as ``progress(done, total, result)``.
+    """
+    paths = [
+        os.path.join(campaign_manager.CAMPAIGNS_DIR, name)
+        for name in campaign_manager.list_campaigns()
+        if campaign_manager.is_campaign(name)
+    ]
+    paths = [p for p in paths if pending_migrations(p)]
+    results: List[Dict[str, Any]] = []
+    if not paths:
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(migrate_campaign, p, dry_run): p for p in paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"campaign": os.path.basename(futures[future]), "error": str(e)}
+            results.append(result)
+            if progress:
+                progress(len(results), len(paths), result)
+    return results
@@ -0,0 +1,167 @@
+"""Latency-aware routing of narrator turns between chat models.
+
+Each turn is classified with cheap local heuristics. Short acknowledgements
+and inventory or status checks go to the ``fast`` route, everything else to
+``capable``. Routes are read from :attr:`Config.model_routes`; when a route
+misses its deadline the turn is retried on :attr:`Config.fallback_route`.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Deque, Dict, List, Optional
+
+from .config import Config
+
+# ``call(model, messages, timeout, **params)`` returns the reply text.
+ChatCall = Callable[..., str]
+# Returns a context manager held for the length of one model call
+Slot = Callable[[], ContextManager[Any]]
+
+INTENT_PATTERNS = {
+    "acknowledge": re.compile(r"^(ok(ay)?|yes|no|sure|thanks?( you)?|got it|continue|go on|nods?)\W*$"),
+    "inventory": re.compile(r"\b(inventory|what do i (have|carry)|my (items|bag|pack|gold|coins))\b"),
+    "status": re.compile(r"\b(hp|hit points|health|level|xp|experience|stats)\b"),
+}
+FAST_INTENTS = {"acknowledge", "inventory", "status"}
+
+# Turns longer than this many words always use the capable route.
+FAST_MAX_WORDS = 12
+# Prompts longer than this many characters need the capable route.
+FAST_MAX_PROMPT_CHARS = 6000
+
+# Latency samples kept per route
+LATENCY_WINDOW = 200
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    model: str
+    intent: str
+    timeout: float
+
+
+def detect_intent(user_input: str) -> str:
+    """Return a coarse intent label for ``user_input``."""
+    text = user_input.strip().lower()
+    for intent, pattern in INTENT_PATTERNS.items():
+        if pattern.search(text):
+            return intent
+    return "narrative"
+
+
+def classify_turn(user_input: str, prompt_chars: int = 0) -> tuple[str, str]:
+    """Return ``(intent, route)`` for a player turn."""
+    intent = detect_intent(user_input)
+    if (
+        intent in FAST_INTENTS
+        and len(user_input.split()) <= FAST_MAX_WORDS
+        and prompt_chars <= FAST_MAX_PROMPT_CHARS
+    ):
+        return intent, "fast"
+    return intent, "capable"
+
+
+class ModelRouter:
+    """Send turns to the fast or capable model within a latency budget."""
+
+    def __init__(self, config: Config, call: ChatCall, max_workers: int = 8) -> None:
+        self.config = config
+        self.call = call
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self._latency: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def _route_config(self, route: str) -> Dict[str, Any]:
+        routes = self.config.model_routes
+        return routes.get(route) or routes.get("capable") or {}
+
+    def decide(self, user_input: str, prompt_chars: int = 0) -> RouteDecision:
+        """Pick the route for a turn without calling any model."""
+        intent, route = classify_turn(user_input, prompt_chars)
+        if route not in self.config.model_routes:
+            route = "capable"
+        cfg = self._route_config(route)
+        timeout = min(float(cfg.get("timeout", self.config.latency_budget)), self.config.latency_budget)
+        return RouteDecision(route, cfg.get("model") or self.config.chat_model, intent, timeout)
+
+    def _record(self, route: str, seconds: float, outcome: str) -> None:
+        with self._lock:
+            self._latency.setdefault(route, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+            counts = self._counts.setdefault(route, {"ok": 0, "timeout": 0, "error": 0})
+            counts[outcome] += 1
+
+    def _attempt(
+        self,
+        route: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        timeout: float,
+        slot: Optional[Slot] = None,
+    ) -> str:
+        cfg = self._route_config(route)
+        params = {
+            "temperature": cfg.get("temperature", self.config.temperature),
+            "max_tokens": cfg.get("max_tokens", self.config.max_tokens),
+        }
+        with slot() if slot is not None else nullcontext():
+            start = time.perf_counter()
+            future = self._executor.submit(self.call, model, messages, timeout, **params)
+            try:
+                reply = future.result(timeout=timeout)
+            except FutureTimeout:
+                future.cancel()
+                self._record(route, time.perf_counter() - start, "timeout")
+                raise TimeoutError(f"{route} route exceeded {timeout:.1f}s")
+            except Exception:
+                self._record(route, time.perf_counter() - start, "error")
+                raise
+        self._record(route, time.perf_counter() - start, "ok")
+        return reply
+
+    def complete(self, messages: List[Dict[str, str]], user_input: str, slot: Optional[Slot] = None) -> str:
+        """Answer ``messages`` on the route chosen for ``user_input``.
+
+        If the chosen route times out or fails, the turn is retried once on
+        the fallback route, within what is left of the latency budget, before
+        the error is raised. ``slot`` is entered around every model call, so
+        a rate limiter passed as ``lambda: limiter.slot(...)`` charges the
+        fallback like any other request.
+        """
+        start = time.perf_counter()
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+        decision = self.decide(user_input, prompt_chars)
+        try:
+            return self._attempt(decision.route, decision.model, messages, decision.timeout, slot)
+        except Exception:
+            fallback = self.config.fallback_route
+            if fallback == decision.route or fallback not in self.config.model_routes:
+                raise
+            cfg = self._route_config(fallback)
+            remaining = max(0.0, self.config.latency_budget - (time.perf_counter() - start))
+            timeout = min(float(cfg.get("timeout", self.config.latency_budget)), remaining)
+            if timeout <= 0:
+                raise
+            return self._attempt(fallback, cfg.get("model") or self.config.chat_model, messages, timeout, slot)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return call counts and p50/p95 latency in seconds per route."""
+        with self._lock:
+            result = {}
+            for route, samples in self._latency.items():
+                ordered = sorted(samples)
+                result[route] = {
+                    **self._counts.get(route, {}),
+                    "p50": ordered[len(ordered) // 2],
+                    "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                }
+            return result
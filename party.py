@@ -0,0 +1,250 @@
+"""Batch updates applied to a whole party in one atomic step.
+
+:func:`apply_party_update` reads every affected player file once, validates
+the result, writes all new contents to temporary files in parallel and then
+commits them together. Experience goes to each member's journal, where the
+rest of the app reads it. Every update has its own commit journal
+(``party_commit.<token>.json``) listing its pending renames, so a crash
+during the commit is rolled forward by :func:`recover` the next time a party
+update runs without touching the files of an update still in progress.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from . import campaign_manager
+from .campaign_manager import DEFAULT_PLAYER_STATE, CampaignManager, notify_change
+from .quest_graph import QuestGraph
+
+# Commit journal of one update; ``recover`` also reads the older unnamed form
+COMMIT_JOURNAL = "party_commit.{token}.json"
+CURRENCIES = ("platinum", "gold", "silver", "copper")
+# Temporaries older than this belong to an update that died before committing
+STALE_TMP_SECONDS = 3600
+# Same shape as the journal ``JournalManager`` creates
+DEFAULT_JOURNAL: Dict[str, Any] = {
+    "inventory": [],
+    "gold": 0,
+    "experience": 0,
+    "npcs": [],
+    "quests": [],
+    "events": [],
+    "images": [],
+}
+
+# Commits and recovery in this process never overlap
+_COMMIT_LOCK = threading.Lock()
+
+
+@dataclass
+class PartyUpdate:
+    """Changes applied to every member of a party.
+
+    ``currency`` maps coin names to deltas, ``experience`` is added to each
+    member, ``add_items``/``remove_items`` edit inventories and quests in
+    ``complete_quests`` are completed once and credited to every member.
+    """
+
+    currency: Dict[str, int] = field(default_factory=dict)
+    experience: int = 0
+    add_items: List[str] = field(default_factory=list)
+    remove_items: List[str] = field(default_factory=list)
+    complete_quests: List[str] = field(default_factory=list)
+
+
+def _read(path: str, default: Dict[str, Any]) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return json.loads(json.dumps(default))
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _journal_dir(cm: CampaignManager) -> str:
+    safe_campaign = cm.name.lower().replace(" ", "_")
+    return os.path.join(campaign_manager.CAMPAIGNS_DIR, safe_campaign, "players")
+
+
+def journal_path(cm: CampaignManager, player: str) -> str:
+    """Return the journal file ``JournalManager`` uses for ``player``."""
+    return os.path.join(_journal_dir(cm), f"{player.lower().replace(' ', '_')}_journal.json")
+
+
+def read_experience(cm: CampaignManager, player: str) -> int:
+    """Return the experience recorded in ``player``'s journal."""
+    return _read(journal_path(cm, player), DEFAULT_JOURNAL).get("experience", 0)
+
+
+def _write_tmp(path: str, data: Dict[str, Any], token: str = "") -> str:
+    tmp = f"{path}.{token}.party.tmp" if token else f"{path}.party.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp
+
+
+def _apply_member(state: Dict[str, Any], update: PartyUpdate, timestamp: str) -> None:
+    for coin, delta in update.currency.items():
+        state[coin] = state.get(coin, 0) + int(delta)
+    inventory = state.setdefault("inventory", [])
+    inventory.extend(update.add_items)
+    for item in update.remove_items:
+        if item in inventory:
+            inventory.remove(item)
+    for quest_id in update.complete_quests:
+        state.setdefault("quests", []).append({"id": quest_id, "status": "completed", "timestamp": timestamp})
+
+
+def _record_history(cm: CampaignManager, history: Dict[str, Any] | None) -> None:
+    """Record the revision listed in a commit journal unless it is there already."""
+    if history is None:
+        return
+    file_history = cm.history(history["file"])
+    if file_history.head() == history["head"]:
+        file_history.record(history["old"], history["new"])
+
+
+def _commit(
+    cm: CampaignManager,
+    renames: List[List[str]],
+    token: str,
+    history: Dict[str, Any] | None = None,
+) -> None:
+    """Rename the temporaries into place and record ``history`` with them.
+
+    ``history`` holds ``file``, ``old``, ``new`` and the ``head`` revision
+    before the update, so a recovered commit records the revision once.
+    """
+    journal = os.path.join(cm.path, COMMIT_JOURNAL.format(token=token))
+    with _COMMIT_LOCK:
+        with open(journal + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"renames": renames, "history": history}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        # from here on the update is committed; recover() finishes it
+        os.replace(journal + ".tmp", journal)
+        for tmp, path in renames:
+            os.replace(tmp, path)  # a missing temporary is an error
+        _record_history(cm, history)
+        os.remove(journal)
+
+
+def recover(cm: CampaignManager) -> bool:
+    """Finish interrupted party updates. Return True if one was found.
+
+    Only the renames listed in commit journals are replayed. Temporaries
+    without a journal are left to their update unless they are older than
+    :data:`STALE_TMP_SECONDS`.
+    """
+    found = False
+    with _COMMIT_LOCK:
+        journals = glob.glob(os.path.join(glob.escape(cm.path), "party_commit*.json"))
+        for journal in sorted(journals):
+            with open(journal, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            # journals written before history was recorded are plain lists
+            renames = entry if isinstance(entry, list) else entry["renames"]
+            for tmp, path in renames:
+                if os.path.exists(tmp):
+                    os.replace(tmp, path)
+            if isinstance(entry, dict):
+                _record_history(cm, entry.get("history"))
+            os.remove(journal)
+            found = True
+    cutoff = time.time() - STALE_TMP_SECONDS
+    for folder in {cm.path, os.path.join(cm.path, "players"), _journal_dir(cm)}:
+        if not os.path.isdir(folder):
+            continue
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if name.endswith(".party.tmp") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                found = True
+    return found
+
+
+def apply_party_update(
+    cm: CampaignManager,
+    players: List[str],
+    update: PartyUpdate,
+    max_workers: int = 8,
+) -> Dict[str, Dict[str, Any]]:
+    """Apply ``update`` to every player in ``players`` atomically.
+
+    Raises ``ValueError`` without writing anything if a member would end up
+    with negative currency or a quest is not active or missed. Returns the
+    new state of each player; experience is added to their journals (see
+    :func:`read_experience`).
+    """
+    if not players:
+        raise ValueError("No players given")
+    unknown = [c for c in update.currency if c not in CURRENCIES]
+    if unknown:
+        raise ValueError(f"Unknown currency: {', '.join(unknown)}")
+    recover(cm)
+    timestamp = datetime.now(timezone.utc).isoformat()
+    players = list(dict.fromkeys(players))
+    paths = {p: cm._player_state_file(p) for p in players}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        states = dict(zip(players, executor.map(lambda p: _read(paths[p], DEFAULT_PLAYER_STATE), players)))
+    for player, state in states.items():
+        _apply_member(state, update, timestamp)
+        negative = [c for c in CURRENCIES if state.get(c, 0) < 0]
+        if negative:
+            raise ValueError(f"{player} would have negative {', '.join(negative)}")
+
+    writes: Dict[str, Dict[str, Any]] = {paths[p]: s for p, s in states.items()}
+    journals: Dict[str, str] = {}
+    if update.experience:
+        journals = {p: journal_path(cm, p) for p in players}
+        for player, path in journals.items():
+            journal = _read(path, DEFAULT_JOURNAL)
+            journal["experience"] = journal.get("experience", 0) + int(update.experience)
+            writes[path] = journal
+        os.makedirs(_journal_dir(cm), exist_ok=True)
+    quests_before = graph = None
+    unlocked: List[str] = []
+    if update.complete_quests:
+        quests_before = cm._load_quests()
+        quests = json.loads(json.dumps(quests_before))
+        for quest_id in update.complete_quests:
+            status = next((s for s in ("active", "missed") if quest_id in quests.get(s, {})), None)
+            if status is None:
+                raise ValueError(f"Quest {quest_id} is not active or missed")
+            quests["completed"][quest_id] = quests[status].pop(quest_id)
+        graph = QuestGraph.load(cm.path, quests)
+        unlocked = graph.unlock(quests, cm._load_json("world_state.json"), update.complete_quests)
+        writes[os.path.join(cm.path, "quests.json")] = quests
+
+    history = None
+    if quests_before is not None:
+        history = {
+            "file": "quests.json",
+            "old": quests_before,
+            "new": writes[os.path.join(cm.path, "quests.json")],
+            "head": cm.history("quests.json").head(),
+        }
+
+    token = uuid.uuid4().hex
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tmps = list(executor.map(lambda item: _write_tmp(*item, token), writes.items()))
+    _commit(cm, [[tmp, path] for tmp, path in zip(tmps, writes)], token, history)
+
+    if quests_before is not None:
+        graph.save(cm.path)
+        changes = [(q, "complete") for q in update.complete_quests] + [(q, "unlock") for q in unlocked]
+        notify_change(cm.path, "quests.json", changes)
+    for player, path in list(paths.items()) + list(journals.items()):
+        notify_change(cm.path, os.path.join("players", os.path.basename(path)), [(player, "party")])
+    return states
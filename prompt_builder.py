@@ -1,15 +1,27 @@
 """Utilities to build conversation prompts for the TTRPG chatbot."""
 
+import hashlib
+from dataclasses import dataclass
 from typing import Any, Dict, List
 
 
-def summarize_player(player_data: Dict[str, Any]) -> str:
-    """Return a short summary describing the player."""
+def summarize_character(player_data: Dict[str, Any]) -> str:
+    """Return the sentence describing who the player character is."""
     name = player_data.get("name", "Unknown")
     race = player_data.get("race", "unknown race")
     char_class = player_data.get("character_class", "adventurer")
     level = player_data.get("level", 1)
     background = player_data.get("background", "")
+    parts = [
+        f"{name} is a level {level} {race} {char_class}",
+    ]
+    if background:
+        parts.append(f"from {background}")
+    return " ".join(parts) + "."
+
+
+def summarize_holdings(player_data: Dict[str, Any]) -> str:
+    """Return the currency and inventory part of the player summary."""
     platinum = player_data.get(
         "platinum", player_data.get("state", {}).get("platinum", 0)
     )
@@ -26,12 +38,7 @@ def summarize_player(player_data: Dict[str, Any]) -> str:
     items = ", ".join(str(i) for i in inventory[:3])
     if len(inventory) > 3:
         items += f", and {len(inventory) - 3} more"
-    parts = [
-        f"{name} is a level {level} {race} {char_class}",
-    ]
-    if background:
-        parts.append(f"from {background}")
-    summary = " ".join(parts) + "."
+    summary = ""
     total_gold = gold + silver / 10 + copper / 100 + platinum * 10
     if total_gold or items:
         currency_parts = []
@@ -52,17 +59,27 @@ def summarize_player(player_data: Dict[str, Any]) -> str:
     return summary
 
 
+def summarize_player(player_data: Dict[str, Any]) -> str:
+    """Return a short summary describing the player."""
+    return summarize_character(player_data) + summarize_holdings(player_data)
+
+
 def summarize_campaign(campaign_data: Dict[str, Any]) -> str:
-    """Return a concise summary of the campaign."""
+    """Return a concise summary of the campaign.
+
+    The recent event is ``campaign_data["latest_event"]`` as set by
+    :func:`campaign_manager.load_campaign_data`.
+    """
     quests = campaign_data.get("quests", {})
     active = len(quests.get("active", {}))
     completed = len(quests.get("completed", {}))
     npc_count = len(campaign_data.get("npcs", {}))
-    events = campaign_data.get("events", {})
-    last_event = ""
-    if events:
-        last_key = sorted(events.keys())[-1]
-        last_event = events[last_key].get("description", "")
+    latest = campaign_data.get("latest_event")
+    if latest is None:
+        # plain event logs are appended in order
+        events = campaign_data.get("events")
+        latest = events[next(reversed(events))] if isinstance(events, dict) and events else {}
+    last_event = latest.get("description", "")
     summary = (
         f"The party knows {npc_count} NPCs. "
         f"There are {active} active quests and {completed} completed."
@@ -82,7 +99,51 @@ def summarize_world(world_memory: List[Dict[str, Any]]) -> str:
     return summary
 
 
-def truncate_history(history: List[str], limit: int = 15) -> List[str]:
+def summarize_type(entry_type: str, entries: List[Dict[str, Any]], limit: int = 20) -> str:
+    """Return a digest line listing up to ``limit`` entries of one type."""
+    if not entries:
+        return ""
+    parts = []
+    for entry in entries[:limit]:
+        part = str(entry.get("name", "")).strip()
+        description = str(entry.get("description", "")).strip()
+        if description:
+            short = description if len(description) <= 60 else description[:57].rstrip() + "..."
+            part += f" ({short})"
+        tags = entry.get("tags") or []
+        if tags:
+            part += " [" + ", ".join(str(t) for t in tags[:3]) + "]"
+        parts.append(part)
+    digest = f"{entry_type.title()} ({len(entries)}): " + "; ".join(parts)
+    if len(entries) > limit:
+        digest += f"; and {len(entries) - limit} more"
+    return digest + "."
+
+
+def select_digests(digests: Dict[str, str], budget: int = 2000) -> List[str]:
+    """Return digest lines fitting within ``budget`` characters.
+
+    Smaller digests are taken first so that one large type does not crowd
+    out the others; the line that crosses the budget is cut short.
+    """
+    chosen: Dict[str, str] = {}
+    remaining = budget
+    for entry_type, text in sorted(digests.items(), key=lambda kv: (len(kv[1]), kv[0])):
+        if remaining <= 0:
+            break
+        if len(text) > remaining:
+            text = text[: max(0, remaining - 3)].rstrip() + "..."
+        chosen[entry_type] = text
+        remaining -= len(text) + 1
+    # emit in type order so the text only changes when a digest does
+    return [chosen[t] for t in sorted(chosen)]
+
+
+# Conversation lines kept verbatim in a prompt
+HISTORY_LIMIT = 15
+
+
+def truncate_history(history: List[str], limit: int = HISTORY_LIMIT) -> List[str]:
     """Return only the last ``limit`` lines of conversation history."""
     return history[-limit:]
 
@@ -95,11 +156,19 @@ def build_prompt(
     conversation_history: List[str],
     current_input: str,
     system_prompt: str | None = None,
+    world_digests: Dict[str, str] | None = None,
+    digest_budget: int = 2000,
 ) -> str:
-    """Build a text prompt for the chatbot."""
+    """Build a text prompt for the chatbot.
+
+    When ``world_digests`` (see :meth:`WorldMemoryManager.digests`) are given
+    they replace the short world summary, limited to ``digest_budget``
+    characters.
+    """
     player_summary = summarize_player(player_data)
     campaign_summary = summarize_campaign(campaign_data)
-    world_summary = summarize_world(world_memory)
+    digest_lines = select_digests(world_digests, digest_budget) if world_digests else []
+    world_summary = "\n".join(digest_lines) if digest_lines else summarize_world(world_memory)
     history = truncate_history(conversation_history)
 
     intro = system_prompt or f"You are the narrator guiding {player_name} on their adventures."
@@ -116,3 +185,89 @@ def build_prompt(
         f"Player: {current_input}",
     ]
     return "\n".join(lines)
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class ChatPrompt:
+    """Chat messages plus the size and hash of their stable prefix.
+
+    The first ``prefix_messages`` messages only change when the character
+    card, the world digests or the system prompt do, so providers can serve
+    them from their prompt cache. Equal ``prefix_hash`` values on
+    consecutive turns mean the prefix can be reused.
+    """
+
+    messages: List[Dict[str, str]]
+    prefix_messages: int
+    prefix_tokens: int
+    prefix_hash: str
+
+
+def history_messages(history: List[str]) -> List[Dict[str, str]]:
+    """Turn ``Player:``/``Narrator:`` lines into user and assistant messages."""
+    messages: List[Dict[str, str]] = []
+    for line in history:
+        if line.startswith("Narrator: "):
+            role, content = "assistant", line[len("Narrator: "):]
+        else:
+            role, content = "user", line[len("Player: "):] if line.startswith("Player: ") else line
+        if messages and messages[-1]["role"] == role:
+            messages[-1]["content"] += "\n" + content
+        else:
+            messages.append({"role": role, "content": content})
+    return messages
+
+
+def build_messages(
+    player_name: str,
+    player_data: Dict[str, Any],
+    campaign_data: Dict[str, Any],
+    world_memory: List[Dict[str, Any]],
+    conversation_history: List[str],
+    current_input: str,
+    system_prompt: str | None = None,
+    world_digests: Dict[str, str] | None = None,
+    digest_budget: int = 2000,
+    session_summary: str | None = None,
+) -> ChatPrompt:
+    """Build chat messages with stable content first.
+
+    The system message holds the narrator prompt, the character card and
+    the world digests in a fixed order. History follows as user and
+    assistant turns, and the final user message carries the volatile
+    sections (holdings, campaign status, ``session_summary`` of turns older
+    than the history window) with ``current_input``.
+    """
+    intro = system_prompt or f"You are the narrator guiding {player_name} on their adventures."
+    digest_lines = select_digests(world_digests, digest_budget) if world_digests else []
+    world_summary = "\n".join(digest_lines) if digest_lines else summarize_world(world_memory)
+    stable = "\n".join(
+        [
+            intro,
+            "\n### Player Character",
+            summarize_character(player_data),
+            "\n### World Memory",
+            world_summary,
+        ]
+    )
+    messages = [{"role": "system", "content": stable}]
+    messages.extend(history_messages(truncate_history(conversation_history)))
+    volatile = ["### Campaign", summarize_campaign(campaign_data)]
+    if session_summary:
+        volatile += ["", "### Earlier This Session", session_summary]
+    holdings = summarize_holdings(player_data).strip()
+    if holdings:
+        volatile[:0] = ["### Player State", holdings, ""]
+    volatile += ["", f"Player: {current_input}"]
+    messages.append({"role": "user", "content": "\n".join(volatile)})
+    return ChatPrompt(
+        messages=messages,
+        prefix_messages=1,
+        prefix_tokens=count_tokens(stable),
+        prefix_hash=hashlib.sha1(stable.encode("utf-8")).hexdigest(),
+    )
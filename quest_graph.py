@@ -0,0 +1,188 @@
+"""Quest prerequisites and incremental unlocking.
+
+A quest may declare ``requires``::
+
+    {
+        "quests": {"<quest id>": "completed"},  # status each prerequisite needs
+        "world": {"bridge_open": True},          # required world_state values
+    }
+
+Quests whose requirements are not met wait in the ``locked`` section of
+``quests.json``. :class:`QuestGraph` records which quests depend on each
+quest and each world state key, so a status change or world state update
+only re-evaluates its dependents (and theirs, when an unlock cascades).
+Prerequisite edges form a DAG; adding an edge that would close a cycle
+raises ``ValueError``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+GRAPH_INDEX = os.path.join("indexes", "quests.graph.json")
+QUEST_STATUSES = ("locked", "active", "completed", "missed")
+
+
+def quest_status(quests: Dict[str, Dict[str, Any]], quest_id: str) -> Optional[str]:
+    """Return the section holding ``quest_id``."""
+    for status in QUEST_STATUSES:
+        if quest_id in quests.get(status, {}):
+            return status
+    return None
+
+
+def find_quest(quests: Dict[str, Dict[str, Any]], quest_id: str) -> Optional[Dict[str, Any]]:
+    status = quest_status(quests, quest_id)
+    return None if status is None else quests[status][quest_id]
+
+
+def validate_requires(requires: Dict[str, Any]) -> None:
+    """Raise ``ValueError`` unless ``requires`` has the documented shape."""
+    if not isinstance(requires, dict) or set(requires) - {"quests", "world"}:
+        raise ValueError("requires may only contain 'quests' and 'world'")
+    for status in requires.get("quests", {}).values():
+        if status not in QUEST_STATUSES:
+            raise ValueError(f"Invalid quest status: {status}")
+    if not isinstance(requires.get("world", {}), dict):
+        raise ValueError("requires['world'] must map keys to values")
+
+
+def requirements_met(
+    requires: Dict[str, Any],
+    quests: Dict[str, Dict[str, Any]],
+    world_state: Dict[str, Any],
+) -> bool:
+    if any(quest_status(quests, q) != status for q, status in requires.get("quests", {}).items()):
+        return False
+    return all(world_state.get(key) == value for key, value in requires.get("world", {}).items())
+
+
+class QuestGraph:
+    """Reverse prerequisite edges: quest ID or world key -> dependent quest IDs."""
+
+    def __init__(
+        self,
+        quest_dependents: Optional[Dict[str, List[str]]] = None,
+        world_dependents: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        self.quest_dependents = quest_dependents or {}
+        self.world_dependents = world_dependents or {}
+
+    @classmethod
+    def build(cls, quests: Dict[str, Dict[str, Any]]) -> "QuestGraph":
+        graph = cls()
+        for section in QUEST_STATUSES:
+            for quest_id, quest in quests.get(section, {}).items():
+                graph.add(quest_id, quest.get("requires") or {})
+        return graph
+
+    def add(self, quest_id: str, requires: Dict[str, Any]) -> None:
+        for prerequisite in requires.get("quests", {}):
+            dependents = self.quest_dependents.setdefault(prerequisite, [])
+            if quest_id not in dependents:
+                dependents.append(quest_id)
+        for key in requires.get("world", {}):
+            dependents = self.world_dependents.setdefault(key, [])
+            if quest_id not in dependents:
+                dependents.append(quest_id)
+
+    def remove(self, quest_id: str, requires: Dict[str, Any]) -> None:
+        pairs = ((self.quest_dependents, requires.get("quests", {})), (self.world_dependents, requires.get("world", {})))
+        for mapping, keys in pairs:
+            for key in keys:
+                if quest_id in mapping.get(key, []):
+                    mapping[key].remove(quest_id)
+                    if not mapping[key]:
+                        del mapping[key]
+
+    @staticmethod
+    def check_acyclic(quests: Dict[str, Dict[str, Any]], quest_id: str, requires: Dict[str, Any]) -> None:
+        """Raise ``ValueError`` if ``quest_id`` requiring ``requires`` closes a cycle."""
+        stack = list(requires.get("quests", {}))
+        seen = set()
+        while stack:
+            current = stack.pop()
+            if current == quest_id:
+                raise ValueError(f"Quest {quest_id} would depend on itself")
+            if current in seen:
+                continue
+            seen.add(current)
+            quest = find_quest(quests, current)
+            if quest is None:
+                raise ValueError(f"Unknown prerequisite quest: {current}")
+            stack.extend((quest.get("requires") or {}).get("quests", {}))
+
+    def unlock(
+        self,
+        quests: Dict[str, Dict[str, Any]],
+        world_state: Dict[str, Any],
+        changed_quests: Iterable[str] = (),
+        changed_keys: Iterable[str] = (),
+    ) -> List[str]:
+        """Move locked dependents of the changes whose requirements are now met to ``active``.
+
+        Returns the unlocked quest IDs in unlock order.
+        """
+        pending = [d for q in changed_quests for d in self.quest_dependents.get(q, [])]
+        pending += [d for k in changed_keys for d in self.world_dependents.get(k, [])]
+        locked = quests.get("locked", {})
+        unlocked: List[str] = []
+        while pending:
+            quest_id = pending.pop(0)
+            quest = locked.get(quest_id)
+            if quest is None or not requirements_met(quest.get("requires") or {}, quests, world_state):
+                continue
+            quests["active"][quest_id] = locked.pop(quest_id)
+            unlocked.append(quest_id)
+            # the new status may satisfy quests further down the graph
+            pending.extend(self.quest_dependents.get(quest_id, []))
+        return unlocked
+
+    def affected_by(self, changed_quests: Iterable[str] = (), changed_keys: Iterable[str] = ()) -> bool:
+        return any(q in self.quest_dependents for q in changed_quests) or any(
+            k in self.world_dependents for k in changed_keys
+        )
+
+    # ------------------------------------------------------------------
+    # Index file, valid while quests.json is unchanged
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _stamp(campaign_path: str) -> List[int]:
+        stat = os.stat(os.path.join(campaign_path, "quests.json"))
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @classmethod
+    def load(cls, campaign_path: str, quests: Optional[Dict[str, Dict[str, Any]]] = None) -> "QuestGraph":
+        """Return the stored graph, rebuilding it if ``quests.json`` changed since."""
+        path = os.path.join(campaign_path, GRAPH_INDEX)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except ValueError:
+                index = {}
+            if index.get("source_stamp") == cls._stamp(campaign_path):
+                return cls(index["quests"], index["world"])
+        if quests is None:
+            with open(os.path.join(campaign_path, "quests.json"), "r", encoding="utf-8") as f:
+                quests = json.load(f)
+        graph = cls.build(quests)
+        graph.save(campaign_path)
+        return graph
+
+    def save(self, campaign_path: str) -> None:
+        """Store the graph as matching the current ``quests.json``."""
+        path = os.path.join(campaign_path, GRAPH_INDEX)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        index = {
+            "source": "quests.json",
+            "source_stamp": self._stamp(campaign_path),
+            "quests": self.quest_dependents,
+            "world": self.world_dependents,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, path)
@@ -0,0 +1,199 @@
+"""Process-wide rate limiting and fair queueing for the shared LLM API key.
+
+Requests wait in per-player queues grouped by campaign. Campaigns are served
+round robin, then the players within each campaign, so neither one busy table
+nor a campaign with many players can starve the others. DM requests use a
+priority lane. A request is admitted when it is at the head of the queue,
+a concurrency slot is free, and both the request and token buckets have
+capacity.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, Tuple
+
+from .config import CONFIG
+
+# Wait times kept for statistics
+WAIT_WINDOW = 200
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` per second."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Return seconds until ``amount`` is available (0 if it is now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate else float("inf")
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+@dataclass
+class _Ticket:
+    key: Tuple[str, str]
+    tokens: int
+    dm: bool
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class RateLimiter:
+    """Admit LLM requests fairly within request, token and concurrency limits."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 90000,
+        max_concurrent: int = 4,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute / 60.0, max(1.0, requests_per_minute / 6.0))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, max(1.0, tokens_per_minute / 6.0))
+        self.max_concurrent = max_concurrent
+        self._cond = threading.Condition()
+        # campaign -> player -> waiting tickets, both levels in round-robin order
+        self._queues: "OrderedDict[str, OrderedDict[str, Deque[_Ticket]]]" = OrderedDict()
+        self._dm_queue: Deque[_Ticket] = deque()
+        self._active = 0
+        self._waits: Deque[float] = deque(maxlen=WAIT_WINDOW)
+
+    def _head(self) -> _Ticket | None:
+        if self._dm_queue:
+            return self._dm_queue[0]
+        for players in self._queues.values():
+            for queue in players.values():
+                return queue[0]
+        return None
+
+    def _remove(self, ticket: _Ticket, served: bool) -> None:
+        """Drop ``ticket`` from its queue.
+
+        Only a ``served`` ticket moves its player and campaign to the back of
+        the round robin; one that timed out leaves their turn in place.
+        """
+        if ticket.dm:
+            self._dm_queue.remove(ticket)
+            return
+        campaign, player = ticket.key
+        players = self._queues[campaign]
+        queue = players[player]
+        queue.remove(ticket)
+        if not queue:
+            del players[player]
+        elif served:
+            players.move_to_end(player)
+        if not players:
+            del self._queues[campaign]
+        elif served:
+            self._queues.move_to_end(campaign)
+
+    def acquire(
+        self,
+        campaign: str,
+        player: str,
+        tokens: int = 0,
+        dm: bool = False,
+        timeout: float | None = None,
+    ) -> _Ticket:
+        """Block until the request may run. Raise ``TimeoutError`` on timeout."""
+        ticket = _Ticket((campaign, player), tokens, dm)
+        deadline = None if timeout is None else ticket.enqueued + timeout
+        with self._cond:
+            if dm:
+                self._dm_queue.append(ticket)
+            else:
+                players = self._queues.setdefault(campaign, OrderedDict())
+                players.setdefault(player, deque()).append(ticket)
+            while True:
+                now = time.monotonic()
+                wait = None
+                if self._head() is ticket and self._active < self.max_concurrent:
+                    wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+                    if wait == 0:
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        self._remove(ticket, served=True)
+                        self._active += 1
+                        self._waits.append(now - ticket.enqueued)
+                        self._cond.notify_all()
+                        return ticket
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._remove(ticket, served=False)
+                        self._cond.notify_all()
+                        raise TimeoutError("Timed out waiting for the LLM rate limiter")
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    def release(self, ticket: _Ticket) -> None:
+        """Free the concurrency slot held by ``ticket``."""
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, campaign: str, player: str, tokens: int = 0, dm: bool = False,
+             timeout: float | None = None) -> Iterator[_Ticket]:
+        """Context manager wrapping :meth:`acquire` and :meth:`release`."""
+        ticket = self.acquire(campaign, player, tokens, dm, timeout)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, active requests and recent wait times."""
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "queued": len(self._dm_queue) + sum(
+                    len(q) for players in self._queues.values() for q in players.values()
+                ),
+                "dm_queued": len(self._dm_queue),
+                "tables_waiting": len(self._queues),
+                "players_waiting": sum(len(players) for players in self._queues.values()),
+                "active": self._active,
+                "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+                "p95_wait": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+            }
+
+
+_LIMITER: RateLimiter | None = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    """Return the process-wide limiter configured from :data:`CONFIG`."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            _LIMITER = RateLimiter(
+                CONFIG.requests_per_minute,
+                CONFIG.tokens_per_minute,
+                CONFIG.max_concurrent_requests,
+            )
+        return _LIMITER
+
+
+def estimate_tokens(text: str, max_tokens: int = 0) -> int:
+    """Rough token count for ``text`` plus the reply allowance."""
+    return len(text) // 4 + max_tokens
@@ -0,0 +1,446 @@
+"""Compact in-memory record types for campaign entities.
+
+Entities are stored as JSON objects, and ``json.load`` turns each one into a
+dict with its own copies of every key, type name, tag and ISO timestamp.
+The classes here use ``__slots__`` instead, intern ``type`` and tag strings,
+share identical tag tuples, and keep UUIDs, time-ordered IDs (see
+``ids.py``) and timestamps as integers. ``from_dict``/``to_dict`` convert
+losslessly: values that would not survive the compact form (odd timestamps,
+other ids, unknown keys) are kept as they are.
+
+Run ``python cli.py membench`` to compare resident memory with plain dicts.
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+import uuid
+from array import array
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, Tuple, Type, TypeVar
+
+from .ids import id_from_int, id_to_int, is_id, new_id
+
+_ABSENT = object()
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_TUPLES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+# Set above the 128 ID bits of a packed time-ordered ID, so it never equals
+# a packed UUID
+_TIME_ORDERED = 1 << 128
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+R = TypeVar("R", bound="Record")
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _shared_tuple(values: Iterable[Any]) -> Tuple[Any, ...]:
+    """Return one shared tuple per distinct list of (interned) strings."""
+    key = tuple(_intern(v) for v in values)
+    return _TUPLES.setdefault(key, key)
+
+
+def _pack_ts(value: Any) -> Any:
+    """Return microseconds since the epoch if that round-trips exactly."""
+    if not isinstance(value, str):
+        return value
+    try:
+        ts = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if ts.tzinfo is None or ts.utcoffset().total_seconds() != 0:
+        return value
+    delta = ts - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return micros if _unpack_ts(micros) == value else value
+
+
+def _unpack_ts(value: Any) -> Any:
+    if not isinstance(value, int):
+        return value
+    seconds, micros = divmod(value, 1_000_000)
+    ts = datetime.fromtimestamp(seconds, timezone.utc).replace(microsecond=micros)
+    return ts.isoformat()
+
+
+def _pack_id(value: Any) -> Any:
+    """Return a UUID or time-ordered ID as an int if it converts back exactly."""
+    if is_id(value):
+        return _TIME_ORDERED | id_to_int(value)
+    if not isinstance(value, str) or len(value) != 36:
+        return value
+    try:
+        packed = uuid.UUID(value).int
+    except ValueError:
+        return value
+    return packed if str(uuid.UUID(int=packed)) == value else value
+
+
+def _unpack_id(value: Any) -> Any:
+    if not isinstance(value, int):
+        return value
+    if value & _TIME_ORDERED:
+        return id_from_int(value ^ _TIME_ORDERED)
+    return str(uuid.UUID(int=value))
+
+
+_PACK = {
+    "str": lambda v: v,
+    "intern": _intern,
+    "tags": lambda v: _shared_tuple(v) if isinstance(v, list) else v,
+    "ts": _pack_ts,
+    "id": _pack_id,
+}
+_UNPACK = {
+    "str": lambda v: v,
+    "intern": lambda v: v,
+    "tags": lambda v: list(v) if isinstance(v, tuple) else v,
+    "ts": _unpack_ts,
+    "id": _unpack_id,
+}
+
+
+class Record:
+    """Base class; subclasses list ``FIELDS`` as ``(name, kind)`` pairs."""
+
+    FIELDS: Tuple[Tuple[str, str], ...] = ()
+    __slots__ = ("extra",)
+
+    def __init__(self, **values: Any) -> None:
+        for name, _kind in self.FIELDS:
+            setattr(self, name, values.pop(name, _ABSENT))
+        self.extra = values or None
+
+    @classmethod
+    def from_dict(cls: Type[R], data: Dict[str, Any]) -> R:
+        record = cls.__new__(cls)
+        extra = dict(data)
+        for name, kind in cls.FIELDS:
+            value = extra.pop(name, _ABSENT)
+            setattr(record, name, value if value is _ABSENT else _PACK[kind](value))
+        record.extra = extra or None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for name, kind in self.FIELDS:
+            value = getattr(self, name)
+            if value is not _ABSENT:
+                data[name] = _UNPACK[kind](value)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Dict-style access to a field in its JSON form."""
+        return self.to_dict().get(name, default)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Record) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class WorldEntry(Record):
+    FIELDS = (
+        ("id", "id"),
+        ("type", "intern"),
+        ("name", "str"),
+        ("description", "str"),
+        ("tags", "tags"),
+        ("related_to", "tags"),
+        ("timestamp", "ts"),
+    )
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+class EventRecord(Record):
+    FIELDS = (("description", "str"), ("timestamp", "ts"))
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+class NpcRecord(Record):
+    FIELDS = (("name", "str"), ("race", "intern"), ("timestamp", "ts"))
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+class QuestRecord(Record):
+    FIELDS = (("title", "str"), ("description", "str"), ("timestamp", "ts"))
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+class ItemRecord(Record):
+    FIELDS = (("name", "str"), ("type", "intern"), ("timestamp", "ts"))
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+def load_records(data: Dict[str, Dict[str, Any]], cls: Type[R]) -> Dict[Any, R]:
+    """Convert an ``{id: object}`` file mapping to records keyed by packed id."""
+    result: Dict[Any, R] = {}
+    for key, value in data.items():
+        record = cls.from_dict(value)
+        packed = _pack_id(key)
+        if getattr(record, "id", None) == packed:
+            packed = record.id  # share one int between key and field
+        result[packed] = record
+    return result
+
+
+def dump_records(records: Dict[Any, Record]) -> Dict[str, Dict[str, Any]]:
+    """Inverse of :func:`load_records`."""
+    return {_unpack_id(key): record.to_dict() for key, record in records.items()}
+
+
+# ----------------------------------------------------------------------
+# Column store
+# ----------------------------------------------------------------------
+
+_NO_TS = -(1 << 63)
+
+
+class RecordTable(Mapping):
+    """Array-backed columns for many records of one :class:`Record` type.
+
+    Each row is addressed by its mapping key (usually a UUID or a
+    time-ordered ID). Such keys are kept as two 64-bit integers plus a
+    one-byte kind flag and looked up through an index sorted by key;
+    timestamps live in an ``array('q')`` and interned strings as small
+    integer codes. A ``WorldEntry`` ``id`` equal to its key costs one byte.
+    Values that do not fit a column are kept as is in ``odd``.
+
+    The table is a read-only mapping in insertion order; every lookup
+    returns a new dict in the JSON shape.
+    """
+
+    def __init__(self, cls: Type[Record]) -> None:
+        self.cls = cls
+        self._hi = array("Q")
+        self._lo = array("Q")
+        self._time_ordered = array("B")
+        self._sorted = array("I")
+        self._odd_keys: Dict[Any, int] = {}
+        self._codes: Dict[str, list] = {}
+        self._columns: Dict[str, Any] = {}
+        for name, kind in cls.FIELDS:
+            if kind == "ts":
+                self._columns[name] = array("q")
+            elif kind == "intern":
+                self._columns[name] = array("H")
+                self._codes[name] = [_ABSENT]
+            elif kind == "id":
+                self._columns[name] = array("b")
+            else:
+                self._columns[name] = []
+        self._extra: list = []
+        self.odd: Dict[Tuple[int, str], Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._hi)
+
+    def _key(self, row: int) -> int:
+        return self._time_ordered[row] << 128 | self._hi[row] << 64 | self._lo[row]
+
+    def _find(self, key: Any) -> int:
+        packed = _pack_id(key)
+        if not isinstance(packed, int):
+            return self._odd_keys.get(key, -1)
+        pos = bisect_left(self._sorted, packed, key=self._key)
+        if pos < len(self._sorted) and self._key(self._sorted[pos]) == packed:
+            return self._sorted[pos]
+        return -1
+
+    def append(self, key: Any, data: Dict[str, Any]) -> int:
+        """Add ``data`` under ``key`` and return its row number."""
+        if self._find(key) >= 0:
+            raise ValueError(f"Duplicate key: {key}")
+        return self._append(key, data, index=True)
+
+    def _append(self, key: Any, data: Dict[str, Any], index: bool) -> int:
+        row = len(self)
+        packed = _pack_id(key)
+        if isinstance(packed, int):
+            self._time_ordered.append(packed >> 128)
+            self._hi.append(packed >> 64 & _MASK_64)
+            self._lo.append(packed & _MASK_64)
+            if index:
+                insort(self._sorted, row, key=self._key)
+        else:
+            self._time_ordered.append(0)
+            self._hi.append(0)
+            self._lo.append(0)
+            self._odd_keys[key] = row
+            self.odd[(row, "")] = key
+        extra = dict(data)
+        for name, kind in self.cls.FIELDS:
+            value = extra.pop(name, _ABSENT)
+            column = self._columns[name]
+            if kind == "ts":
+                packed_ts = _pack_ts(value) if value is not _ABSENT else _ABSENT
+                if isinstance(packed_ts, int) and packed_ts != _NO_TS:
+                    column.append(packed_ts)
+                else:
+                    column.append(_NO_TS)
+                    if value is not _ABSENT:
+                        self.odd[(row, name)] = value
+            elif kind == "intern":
+                codes = self._codes[name]
+                if value is not _ABSENT and not isinstance(value, str):
+                    self.odd[(row, name)] = value
+                    value = _ABSENT
+                value = _intern(value)
+                try:
+                    code = codes.index(value)
+                except ValueError:
+                    codes.append(value)
+                    code = len(codes) - 1
+                column.append(code)
+            elif kind == "id":
+                if value is _ABSENT:
+                    column.append(0)
+                elif value == key:
+                    column.append(1)
+                else:
+                    column.append(2)
+                    self.odd[(row, name)] = value
+            else:
+                column.append(value if value is _ABSENT else _PACK[kind](value))
+        self._extra.append(extra or None)
+        return row
+
+    def key(self, row: int) -> Any:
+        if (row, "") in self.odd:
+            return self.odd[(row, "")]
+        return _unpack_id(self._key(row))
+
+    def row(self, row: int) -> Dict[str, Any]:
+        """Return row ``row`` in its JSON form."""
+        data: Dict[str, Any] = {}
+        for name, kind in self.cls.FIELDS:
+            column = self._columns[name]
+            if (row, name) in self.odd:
+                data[name] = self.odd[(row, name)]
+            elif kind == "ts":
+                if column[row] != _NO_TS:
+                    data[name] = _unpack_ts(column[row])
+            elif kind == "intern":
+                value = self._codes[name][column[row]]
+                if value is not _ABSENT:
+                    data[name] = value
+            elif kind == "id":
+                if column[row] == 1:
+                    data[name] = self.key(row)
+            elif column[row] is not _ABSENT:
+                data[name] = _UNPACK[kind](column[row])
+        if self._extra[row]:
+            data.update(self._extra[row])
+        return data
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        row = self._find(key)
+        return self.row(row) if row >= 0 else default
+
+    def __getitem__(self, key: Any) -> Dict[str, Any]:
+        row = self._find(key)
+        if row < 0:
+            raise KeyError(key)
+        return self.row(row)
+
+    def __contains__(self, key: object) -> bool:
+        return self._find(key) >= 0
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self.key(row) for row in range(len(self)))
+
+    def values(self):
+        return (self.row(row) for row in range(len(self)))
+
+    def record(self, key: Any) -> Record | None:
+        data = self.get(key)
+        return None if data is None else self.cls.from_dict(data)
+
+    def items(self):
+        for row in range(len(self)):
+            yield self.key(row), self.row(row)
+
+    @classmethod
+    def from_mapping(cls, data: Dict[Any, Dict[str, Any]], record_cls: Type[Record]) -> "RecordTable":
+        table = cls(record_cls)
+        for key, value in data.items():
+            table._append(key, value, index=False)
+        # keys of a mapping are unique, so the index is sorted once at the end
+        rows = [row for row in range(len(table)) if (row, "") not in table.odd]
+        table._sorted = array("I", sorted(rows, key=table._key))
+        return table
+
+    def to_mapping(self) -> Dict[Any, Dict[str, Any]]:
+        return dict(self.items())
+
+
+def compact_mapping(data: Any, record_cls: Type[Record]) -> Any:
+    """Return an ``{id: object}`` mapping as a :class:`RecordTable`.
+
+    Anything else, such as a malformed file, is returned unchanged.
+    """
+    if isinstance(data, dict) and all(isinstance(v, dict) for v in data.values()):
+        return RecordTable.from_mapping(data, record_cls)
+    return data
+
+
+# ----------------------------------------------------------------------
+# Memory benchmark
+# ----------------------------------------------------------------------
+
+def _sample_entries(count: int) -> Dict[str, Dict[str, Any]]:
+    types = ["city", "faction", "business", "monster", "event"]
+    tags = [["port", "trade"], ["ruined"], ["arc"], [], ["guild", "port"]]
+    entries = {}
+    for i in range(count):
+        created = datetime.fromtimestamp(1_700_000_000 + i * 37.25, timezone.utc)
+        entry_id = new_id(created)
+        entries[entry_id] = {
+            "id": entry_id,
+            "type": types[i % len(types)],
+            "name": f"Place {i}",
+            "description": f"Notable location number {i} in the realm.",
+            "tags": list(tags[i % len(tags)]),
+            "related_to": [],
+            "timestamp": created.isoformat(),
+        }
+    return entries
+
+
+def _measure(build) -> Tuple[int, Any]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def benchmark_memory(count: int = 20000) -> Dict[str, Any]:
+    """Compare resident bytes of ``count`` world entries in each form."""
+    import json
+
+    text = json.dumps(_sample_entries(count))
+    dict_bytes, as_dicts = _measure(lambda: json.loads(text))
+    record_bytes, as_records = _measure(lambda: load_records(json.loads(text), WorldEntry))
+    table_bytes, as_table = _measure(lambda: RecordTable.from_mapping(json.loads(text), WorldEntry))
+    if dump_records(as_records) != as_dicts or as_table.to_mapping() != as_dicts:
+        raise RuntimeError("Compact records did not round-trip the sample entries")
+    return {
+        "entries": count,
+        "dict_bytes": dict_bytes,
+        "record_bytes": record_bytes,
+        "table_bytes": table_bytes,
+        "record_ratio": dict_bytes / record_bytes if record_bytes else 0.0,
+        "table_ratio": dict_bytes / table_bytes if table_bytes else 0.0,
+    }
@@ -0,0 +1,331 @@
+"""Columnar index of numeric NPC relationship attributes.
+
+NPCs keep relationships inside ``npcs.json`` as
+``{"Damian": {"trust": 80, "notes": "..."}}``. :class:`RelationshipMatrix`
+stores every NPC–character edge as one row of parallel arrays: the two
+endpoint numbers plus one float column per numeric attribute (``NaN`` where
+an edge lacks it), with a row index per NPC and per character. Threshold,
+top-k, mean and batched adjustments run vectorized with NumPy when it is
+installed and as plain loops otherwise. :class:`RelationshipStore` keeps a
+matrix in step with a campaign through its change feed and writes
+adjustments back to ``npcs.json``.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ``(npc_id, character, value)``
+Edge = Tuple[str, str, float]
+
+NAN = float("nan")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class RelationshipMatrix:
+    """NPC–character edges with numeric attributes in column arrays."""
+
+    def __init__(self) -> None:
+        # endpoint numbers used in the ``_src``/``_dst`` columns
+        self.npcs: List[str] = []
+        self.characters: List[str] = []
+        self._npc_no: Dict[str, int] = {}
+        self._char_no: Dict[str, int] = {}
+        self._src = array("q")
+        self._dst = array("q")
+        self.columns: Dict[str, array] = {}
+        # endpoint number -> {other endpoint number: row}
+        self._by_npc: Dict[int, Dict[int, int]] = {}
+        self._by_char: Dict[int, Dict[int, int]] = {}
+        # rows of removed edges, reused by later inserts
+        self._free: List[int] = []
+
+    @classmethod
+    def from_npcs(cls, npcs: Dict[str, Any]) -> "RelationshipMatrix":
+        """Build a matrix from the content of ``npcs.json``."""
+        matrix = cls()
+        for npc_id, npc in npcs.items():
+            matrix.load_npc(npc_id, npc.get("relationships") or {})
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self._src) - len(self._free)
+
+    # ------------------------------------------------------------------
+    # Edges
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _number(name: str, names: List[str], numbers: Dict[str, int]) -> int:
+        number = numbers.get(name)
+        if number is None:
+            number = numbers[name] = len(names)
+            names.append(name)
+        return number
+
+    def _row(self, npc_id: str, character: str) -> int:
+        src = self._number(npc_id, self.npcs, self._npc_no)
+        dst = self._number(character, self.characters, self._char_no)
+        row = self._by_npc.get(src, {}).get(dst)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+            self._src[row], self._dst[row] = src, dst
+        else:
+            row = len(self._src)
+            self._src.append(src)
+            self._dst.append(dst)
+            for column in self.columns.values():
+                column.append(NAN)
+        self._by_npc.setdefault(src, {})[dst] = row
+        self._by_char.setdefault(dst, {})[src] = row
+        return row
+
+    def set(self, npc_id: str, character: str, values: Dict[str, Any]) -> None:
+        """Store the numeric entries of ``values`` on the edge; others are ignored."""
+        numeric = {k: float(v) for k, v in values.items() if _is_number(v)}
+        if not numeric:
+            return
+        row = self._row(npc_id, character)
+        for attribute, value in numeric.items():
+            column = self.columns.get(attribute)
+            if column is None:
+                column = self.columns[attribute] = array("d", [NAN]) * len(self._src)
+            column[row] = value
+
+    def get(self, npc_id: str, character: str) -> Dict[str, float]:
+        """Return the numeric attributes of one edge."""
+        src, dst = self._npc_no.get(npc_id), self._char_no.get(character)
+        row = self._by_npc.get(src, {}).get(dst)
+        if row is None:
+            return {}
+        return {k: c[row] for k, c in self.columns.items() if not math.isnan(c[row])}
+
+    def remove_npc(self, npc_id: str) -> None:
+        """Drop every edge of ``npc_id``."""
+        src = self._npc_no.get(npc_id)
+        for dst, row in self._by_npc.pop(src, {}).items():
+            del self._by_char[dst][src]
+            self._src[row] = self._dst[row] = -1
+            for column in self.columns.values():
+                column[row] = NAN
+            self._free.append(row)
+
+    def load_npc(self, npc_id: str, relationships: Dict[str, Any]) -> None:
+        """Replace the edges of ``npc_id`` with its ``relationships`` mapping."""
+        self.remove_npc(npc_id)
+        for character, values in relationships.items():
+            if isinstance(values, dict):
+                self.set(npc_id, character, values)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _rows(self, npcs: Optional[Iterable[str]], characters: Optional[Iterable[str]]) -> Optional[List[int]]:
+        """Return the rows between ``npcs`` and ``characters``; ``None`` means all."""
+        if npcs is None and characters is None:
+            return None
+        wanted_npcs = None if npcs is None else {self._npc_no[n] for n in npcs if n in self._npc_no}
+        wanted_chars = None if characters is None else {self._char_no[c] for c in characters if c in self._char_no}
+        if wanted_npcs is not None and (wanted_chars is None or len(wanted_npcs) <= len(wanted_chars)):
+            return [
+                row
+                for src in wanted_npcs
+                for dst, row in self._by_npc.get(src, {}).items()
+                if wanted_chars is None or dst in wanted_chars
+            ]
+        return [
+            row
+            for dst in wanted_chars
+            for src, row in self._by_char.get(dst, {}).items()
+            if wanted_npcs is None or src in wanted_npcs
+        ]
+
+    def _select(self, attribute: str, rows: Optional[List[int]]):
+        """Return ``(rows, values)`` of the selected edges that have ``attribute``."""
+        column = self.columns.get(attribute)
+        if column is None:
+            return [], []
+        if np is not None:
+            values = np.frombuffer(column, dtype=np.float64)
+            index = np.arange(len(values)) if rows is None else np.asarray(rows, dtype=np.int64)
+            picked = values[index]
+            keep = ~np.isnan(picked)
+            return index[keep], picked[keep]
+        index = range(len(column)) if rows is None else rows
+        pairs = [(row, column[row]) for row in index if not math.isnan(column[row])]
+        return [r for r, _v in pairs], [v for _r, v in pairs]
+
+    def _edges(self, rows, values) -> List[Edge]:
+        return [
+            (self.npcs[self._src[row]], self.characters[self._dst[row]], float(value))
+            for row, value in zip(rows, values)
+        ]
+
+    def above(
+        self,
+        attribute: str,
+        threshold: float,
+        npcs: Optional[Iterable[str]] = None,
+        characters: Optional[Iterable[str]] = None,
+    ) -> List[Edge]:
+        """Return edges whose ``attribute`` exceeds ``threshold``, highest first."""
+        rows, values = self._select(attribute, self._rows(npcs, characters))
+        if np is not None:
+            keep = values > threshold
+            rows, values = rows[keep], values[keep]
+            order = np.argsort(-values, kind="stable")
+            return self._edges(rows[order], values[order])
+        edges = [(r, v) for r, v in zip(rows, values) if v > threshold]
+        edges.sort(key=lambda e: -e[1])
+        return self._edges([r for r, _v in edges], [v for _r, v in edges])
+
+    def top_k(
+        self,
+        attribute: str,
+        k: int,
+        npcs: Optional[Iterable[str]] = None,
+        characters: Optional[Iterable[str]] = None,
+        largest: bool = True,
+    ) -> List[Edge]:
+        """Return the ``k`` edges with the highest (or lowest) ``attribute``."""
+        rows, values = self._select(attribute, self._rows(npcs, characters))
+        if k <= 0 or len(values) == 0:
+            return []
+        sign = -1 if largest else 1
+        if np is not None:
+            keys = sign * values
+            if k < len(keys):
+                part = np.argpartition(keys, k - 1)[:k]
+            else:
+                part = np.arange(len(keys))
+            part = part[np.argsort(keys[part], kind="stable")]
+            return self._edges(rows[part], values[part])
+        best = heapq.nsmallest(k, zip(values, rows), key=lambda e: sign * e[0])
+        return self._edges([r for _v, r in best], [v for v, _r in best])
+
+    def mean(
+        self,
+        attribute: str,
+        npcs: Optional[Iterable[str]] = None,
+        characters: Optional[Iterable[str]] = None,
+    ) -> Optional[float]:
+        """Return the average ``attribute`` over the selected edges, or ``None``."""
+        _rows, values = self._select(attribute, self._rows(npcs, characters))
+        if len(values) == 0:
+            return None
+        return float(np.mean(values)) if np is not None else sum(values) / len(values)
+
+    def adjust(
+        self,
+        attribute: str,
+        delta: float,
+        npcs: Optional[Iterable[str]] = None,
+        characters: Optional[Iterable[str]] = None,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+    ) -> List[Edge]:
+        """Add ``delta`` to ``attribute`` on the selected edges that have it.
+
+        Results are clamped to ``low``/``high`` when given. Returns the
+        changed edges with their new values.
+        """
+        rows, values = self._select(attribute, self._rows(npcs, characters))
+        if len(values) == 0:
+            return []
+        column = self.columns[attribute]
+        if np is not None:
+            updated = values + delta
+            if low is not None or high is not None:
+                updated = np.clip(updated, low, high)
+            np.frombuffer(column, dtype=np.float64)[rows] = updated
+        else:
+            updated = []
+            for row, value in zip(rows, values):
+                value += delta
+                if low is not None:
+                    value = max(low, value)
+                if high is not None:
+                    value = min(high, value)
+                column[row] = value
+                updated.append(value)
+        return self._edges(rows, updated)
+
+
+class RelationshipStore:
+    """A campaign's relationship matrix, refreshed from the change feed."""
+
+    def __init__(self, cm) -> None:
+        self.cm = cm
+        self.revision = 0
+        self._matrix: Optional[RelationshipMatrix] = None
+
+    @property
+    def matrix(self) -> RelationshipMatrix:
+        """The matrix, reloading only NPCs changed since the last access."""
+        feed = self.cm.changes
+        head = feed.revision()
+        changes = None if self._matrix is None else feed.changes_since(self.revision)
+        npc_changes = [c for c in changes or () if c["file"] == "npcs.json"]
+        if changes is None or any(c["id"] is None for c in npc_changes):
+            self._matrix = RelationshipMatrix.from_npcs(self.cm._load_json("npcs.json"))
+        elif npc_changes:
+            ids = {c["id"] for c in npc_changes}
+            npcs = self.cm._get_entities("npcs.json", ids)
+            for npc_id in ids:
+                self._matrix.load_npc(npc_id, npcs.get(npc_id, {}).get("relationships") or {})
+        # files changed after ``head`` are picked up by the next access
+        self.revision = head
+        return self._matrix
+
+    def find_npcs(self, names: Iterable[str]) -> List[str]:
+        """Return the IDs of NPCs given by ID or (case-insensitive) name."""
+        wanted = {n.lower() for n in names}
+        return [
+            npc_id
+            for npc_id, npc in self.cm._iter_entities("npcs.json")
+            if npc_id.lower() in wanted or str(npc.get("name", "")).lower() in wanted
+        ]
+
+    def above(self, attribute: str, threshold: float, npcs=None, characters=None) -> List[Edge]:
+        return self.matrix.above(attribute, threshold, npcs, characters)
+
+    def top_k(self, attribute: str, k: int, npcs=None, characters=None, largest: bool = True) -> List[Edge]:
+        return self.matrix.top_k(attribute, k, npcs, characters, largest)
+
+    def mean(self, attribute: str, npcs=None, characters=None) -> Optional[float]:
+        return self.matrix.mean(attribute, npcs, characters)
+
+    def adjust(
+        self,
+        attribute: str,
+        delta: float,
+        npcs: Optional[Iterable[str]] = None,
+        characters: Optional[Iterable[str]] = None,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+    ) -> List[Edge]:
+        """Adjust the selected edges and save the affected NPCs in one write."""
+        changed = self.matrix.adjust(attribute, delta, npcs, characters, low, high)
+        by_npc: Dict[str, Dict[str, float]] = {}
+        for npc_id, character, value in changed:
+            by_npc.setdefault(npc_id, {})[character] = value
+        if by_npc:
+            npcs_data = self.cm._get_entities("npcs.json", by_npc)
+            for npc_id, values in by_npc.items():
+                relationships = npcs_data[npc_id].setdefault("relationships", {})
+                for character, value in values.items():
+                    relationships[character][attribute] = int(value) if value.is_integer() else value
+            self.cm._put_entities("npcs.json", npcs_data, "relationship")
+        return changed
@@ -0,0 +1,150 @@
+"""Tiered retention for campaign event logs.
+
+Old events are moved out of ``events_log.json`` and ``events_dm_log.json``
+into gzip-compressed archive files under ``archive/``. The hot logs stay
+small, while :meth:`CampaignManager.search_events` can still reach archived
+events on request.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .campaign_manager import CampaignManager
+
+ARCHIVE_DIR = "archive"
+ARCHIVE_INDEX = "index.json"
+EVENT_FILES = ("events_log.json", "events_dm_log.json")
+
+
+@dataclass
+class RetentionPolicy:
+    """Which events stay in the hot log.
+
+    Events older than ``max_age_days`` are archived, and so are the oldest
+    events beyond ``max_events``. ``None`` disables a limit.
+    """
+
+    max_age_days: float | None = 30.0
+    max_events: int | None = 1000
+    digest: bool = True
+
+
+def _parse_ts(value: Any) -> datetime | None:
+    try:
+        ts = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _digest(events: List[Dict[str, Any]], limit: int = 5) -> str:
+    """Return a short text summary of archived events."""
+    lines = [str(ev.get("description", ""))[:80] for ev in events[:limit]]
+    more = len(events) - len(lines)
+    text = "; ".join(line for line in lines if line)
+    if more > 0:
+        text += f"; and {more} more"
+    return text
+
+
+def _archive_dir(campaign_path: str) -> str:
+    return os.path.join(campaign_path, ARCHIVE_DIR)
+
+
+def load_archive_index(campaign_path: str) -> List[Dict[str, Any]]:
+    """Return metadata (file, count, time range, digest) for every archive."""
+    path = os.path.join(_archive_dir(campaign_path), ARCHIVE_INDEX)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_archive_index(campaign_path: str, index: List[Dict[str, Any]]) -> None:
+    path = os.path.join(_archive_dir(campaign_path), ARCHIVE_INDEX)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _split(events: Dict[str, Any], policy: RetentionPolicy, now: datetime) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Return ``(hot, cold)`` event mappings for ``policy``."""
+    oldest_first = sorted(
+        events.items(),
+        key=lambda kv: _parse_ts(kv[1].get("timestamp")) or now,
+    )
+    cutoff = now - timedelta(days=policy.max_age_days) if policy.max_age_days is not None else None
+    overflow = len(oldest_first) - policy.max_events if policy.max_events is not None else 0
+    hot: Dict[str, Any] = {}
+    cold: Dict[str, Any] = {}
+    for position, (event_id, event) in enumerate(oldest_first):
+        ts = _parse_ts(event.get("timestamp"))
+        too_old = cutoff is not None and ts is not None and ts < cutoff
+        if too_old or position < overflow:
+            cold[event_id] = event
+        else:
+            hot[event_id] = event
+    return hot, cold
+
+
+def compact_events(
+    cm: CampaignManager,
+    policy: RetentionPolicy | None = None,
+    now: datetime | None = None,
+) -> Dict[str, int]:
+    """Archive events outside ``policy`` and return counts per log file."""
+    policy = policy or RetentionPolicy()
+    now = now or datetime.now(timezone.utc)
+    moved: Dict[str, int] = {}
+    for filename in EVENT_FILES:
+        events = cm._load_json(filename)
+        hot, cold = _split(events, policy, now)
+        moved[filename] = len(cold)
+        if not cold:
+            continue
+        os.makedirs(_archive_dir(cm.path), exist_ok=True)
+        stem = os.path.splitext(filename)[0]
+        base = f"{stem}.{now.strftime('%Y%m%dT%H%M%S')}"
+        archive_name = f"{base}.json.gz"
+        counter = 1
+        while os.path.exists(os.path.join(_archive_dir(cm.path), archive_name)):
+            archive_name = f"{base}-{counter}.json.gz"
+            counter += 1
+        cold_list = list(cold.values())
+        record = {
+            "file": archive_name,
+            "source": filename,
+            "count": len(cold),
+            "start": cold_list[0].get("timestamp", ""),
+            "end": cold_list[-1].get("timestamp", ""),
+            "digest": _digest(cold_list) if policy.digest else "",
+        }
+        path = os.path.join(_archive_dir(cm.path), archive_name)
+        with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+            json.dump({**record, "events": cold}, f)
+        os.replace(path + ".tmp", path)
+        index = load_archive_index(cm.path)
+        index.append(record)
+        _save_archive_index(cm.path, index)
+        # archive is durable before events leave the hot log
+        cm._save_json(filename, hot)
+    return moved
+
+
+def iter_archived_events(campaign_path: str, filename: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(event_id, event)`` from every archive of ``filename``."""
+    for record in load_archive_index(campaign_path):
+        if record.get("source") != filename:
+            continue
+        path = os.path.join(_archive_dir(campaign_path), record["file"])
+        if not os.path.exists(path):
+            continue
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            yield from json.load(f).get("events", {}).items()
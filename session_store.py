@@ -0,0 +1,199 @@
+"""Durable play sessions that resume without rereading the transcript.
+
+A session is a :class:`ChatStore` transcript plus a small metadata file,
+``sessions/<player>_<session>.meta.json``, rewritten after every turn. It
+holds a rolling summary of the lines that have scrolled out of the prompt's
+history window, token counts and the messages of the last prompt. Resuming
+a session reads the metadata and the last :data:`HISTORY_LIMIT` lines, so
+the cost does not grow with the length of the transcript.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .chat_store import ChatStore, session_dir, session_prefix
+from .ids import is_id, new_id
+from .prompt_builder import HISTORY_LIMIT, ChatPrompt, count_tokens
+
+# Default character budget of the rolling summary
+SUMMARY_CHARS = 1500
+# Characters kept from each line folded into the summary
+SUMMARY_LINE_CHARS = 160
+
+
+def condense(line: str, limit: int = SUMMARY_LINE_CHARS) -> str:
+    """Return the first sentence of ``line``, cut to ``limit`` characters."""
+    text = " ".join(line.split())
+    speaker, sep, body = text.partition(": ")
+    if not sep:
+        speaker, body = "", text
+    for i, ch in enumerate(body):
+        if ch in ".!?" and (i + 1 == len(body) or body[i + 1] == " "):
+            body = body[: i + 1]
+            break
+    text = f"{speaker}: {body}" if speaker else body
+    if len(text) > limit:
+        text = text[: max(0, limit - 3)].rstrip() + "..."
+    return text
+
+
+def _empty_meta() -> Dict[str, Any]:
+    return {
+        "lines": 0,
+        "summary": [],
+        "summarized": 0,
+        "tokens": {"turns": 0, "prompt": 0, "reply": 0, "last_prompt": 0},
+        "prompt": None,
+        "exported": 0,
+        "updated": None,
+    }
+
+
+class SessionStore:
+    """Transcript and cached prompt state of one player's session."""
+
+    def __init__(
+        self,
+        campaign_name: str,
+        player_name: str,
+        session_id: Optional[str] = None,
+        summary_chars: int = SUMMARY_CHARS,
+    ) -> None:
+        self.session_id = session_id or new_id()
+        self.summary_chars = summary_chars
+        self.chat = ChatStore(campaign_name, player_name, self.session_id)
+        self.meta_path = self.chat.path[: -len(".jsonl")] + ".meta.json"
+        self.meta = _empty_meta()
+        if os.path.exists(self.meta_path):
+            try:
+                with open(self.meta_path, "r", encoding="utf-8") as f:
+                    self.meta.update(json.load(f))
+            except ValueError:
+                pass  # rebuilt from the transcript below
+        if self.meta["lines"] != len(self.chat):
+            self._catch_up()
+
+    @classmethod
+    def resume(
+        cls,
+        campaign_name: str,
+        player_name: str,
+        summary_chars: int = SUMMARY_CHARS,
+    ) -> "SessionStore":
+        """Reopen the player's most recent session, or start a new one."""
+        latest = latest_session(campaign_name, player_name)
+        return cls(campaign_name, player_name, latest, summary_chars)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.chat)
+
+    def history(self, limit: int = HISTORY_LIMIT) -> List[str]:
+        """Return the lines the next prompt keeps verbatim."""
+        return self.chat.tail(limit)
+
+    @property
+    def summary(self) -> str:
+        """Condensed lines older than the history window, oldest first."""
+        return "\n".join(self.meta["summary"])
+
+    @property
+    def tokens(self) -> Dict[str, int]:
+        return dict(self.meta["tokens"])
+
+    @property
+    def last_prompt(self) -> Optional[Dict[str, Any]]:
+        """``messages``, ``prefix_hash`` and ``prefix_tokens`` of the last turn."""
+        return self.meta["prompt"]
+
+    def context(self) -> Dict[str, Any]:
+        """Return everything needed to build the next prompt."""
+        return {
+            "history": self.history(),
+            "summary": self.summary,
+            "prompt": self.last_prompt,
+            "tokens": self.tokens,
+        }
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def record_turn(self, user_input: str, reply: str, prompt: Optional[ChatPrompt] = None) -> None:
+        """Append one exchange and update the cached metadata."""
+        self.chat.append(f"Player: {user_input}")
+        self.chat.append(f"Narrator: {reply}")
+        tokens = self.meta["tokens"]
+        tokens["turns"] += 1
+        tokens["reply"] += count_tokens(reply)
+        if prompt is not None:
+            prompt_tokens = sum(count_tokens(m["content"]) for m in prompt.messages)
+            tokens["prompt"] += prompt_tokens
+            tokens["last_prompt"] = prompt_tokens
+            self.meta["prompt"] = {
+                "messages": prompt.messages,
+                "prefix_hash": prompt.prefix_hash,
+                "prefix_tokens": prompt.prefix_tokens,
+            }
+        self._roll_summary()
+        self._save()
+
+    def export_new(self, dest: str) -> int:
+        """Append lines not exported yet to the log at ``dest``; return the line count."""
+        self.meta["exported"] = self.chat.export_new(dest, self.meta["exported"])
+        self._save()
+        return self.meta["exported"]
+
+    def _roll_summary(self) -> None:
+        """Fold lines that left the history window into the summary."""
+        start = min(self.meta["summarized"], len(self.chat))
+        stop = max(len(self.chat) - HISTORY_LIMIT, start)
+        summary: List[str] = self.meta["summary"]
+        summary.extend(condense(line) for line in self.chat.page(start, stop))
+        # drop the oldest lines once over budget
+        total = sum(len(line) + 1 for line in summary)
+        while summary and total > self.summary_chars:
+            total -= len(summary.pop(0)) + 1
+        self.meta["summarized"] = stop
+        self.meta["lines"] = len(self.chat)
+
+    def _catch_up(self) -> None:
+        """Bring the metadata in line with a transcript written without it."""
+        if self.meta["summarized"] > len(self.chat):
+            # the transcript lost a torn tail; the summary is still usable
+            self.meta["summarized"] = len(self.chat)
+        self._roll_summary()
+        self._save()
+
+    def _save(self) -> None:
+        self.meta["updated"] = datetime.now(timezone.utc).isoformat()
+        tmp = f"{self.meta_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_path)
+
+
+def list_sessions(campaign_name: str, player_name: str) -> List[str]:
+    """Return the player's resumable session IDs, oldest first."""
+    directory = session_dir(campaign_name)
+    if not os.path.isdir(directory):
+        return []
+    prefix = session_prefix(player_name)
+    found = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(".meta.json"):
+            session_id = name[len(prefix) : -len(".meta.json")]
+            if is_id(session_id):
+                found.append(session_id)
+    return sorted(found)
+
+
+def latest_session(campaign_name: str, player_name: str) -> Optional[str]:
+    """Return the player's most recent session ID, if any."""
+    sessions = list_sessions(campaign_name, player_name)
+    return sessions[-1] if sessions else None
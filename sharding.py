@@ -0,0 +1,259 @@
+"""Optional sharded layout for large entity files.
+
+A sharded file such as ``npcs.json`` lives in ``npcs.shards/`` as several
+JSON shard files plus ``manifest.json``. Entities are assigned to shards by
+the low bits of a CRC32 of their ID, so updating one entity rewrites one
+shard and the small manifest. A shard that grows beyond
+``max_shard_bytes`` is split in two by taking one more hash bit.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+SHARD_SUFFIX = ".shards"
+MANIFEST = "manifest.json"
+DEFAULT_SHARDS = 8
+DEFAULT_MAX_SHARD_BYTES = 256 * 1024
+# Splits stop at this many hash bits
+MAX_DEPTH = 20
+
+# Entity files that may use the sharded layout
+SHARDABLE_FILES = ("npcs.json", "items.json", "world_memory.json", "world_memory_dm.json")
+
+
+def shard_dir(campaign_path: str, filename: str) -> str:
+    return os.path.join(campaign_path, os.path.splitext(filename)[0] + SHARD_SUFFIX)
+
+
+def is_sharded(campaign_path: str, filename: str) -> bool:
+    return os.path.exists(os.path.join(shard_dir(campaign_path, filename), MANIFEST))
+
+
+def _hash(key: str) -> int:
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def _suffix(h: int, depth: int) -> str:
+    if depth == 0:
+        return ""
+    return format(h & ((1 << depth) - 1), f"0{depth}b")
+
+
+def _write_json(path: str, data: Any) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class ShardedStore:
+    """Entities of one file spread over hash-partitioned shard files."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST), "r", encoding="utf-8") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+
+    @classmethod
+    def create(
+        cls,
+        directory: str,
+        data: Dict[str, Any],
+        shards: int = DEFAULT_SHARDS,
+        max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES,
+    ) -> "ShardedStore":
+        """Write ``data`` as a new sharded layout. ``shards`` is rounded up to a power of two."""
+        depth = max(0, (shards - 1).bit_length())
+        os.makedirs(directory, exist_ok=True)
+        buckets: Dict[str, Dict[str, Any]] = {_suffix(i, depth): {} for i in range(1 << depth)}
+        for key, value in data.items():
+            buckets[_suffix(_hash(key), depth)][key] = value
+        manifest = {
+            "revision": 0,
+            "max_shard_bytes": max_shard_bytes,
+            "shards": {suffix: f"shard_{suffix or 'all'}.json" for suffix in buckets},
+        }
+        for suffix, bucket in buckets.items():
+            _write_json(os.path.join(directory, manifest["shards"][suffix]), bucket)
+        _write_json(os.path.join(directory, MANIFEST), manifest)
+        store = cls(directory)
+        for suffix in list(store.manifest["shards"]):
+            store._split_if_large(suffix)
+        return store
+
+    # ------------------------------------------------------------------
+    # Shard files
+    # ------------------------------------------------------------------
+    def _shard_for(self, key: str) -> str:
+        h = _hash(key)
+        shards = self.manifest["shards"]
+        for depth in range(MAX_DEPTH + 1):
+            suffix = _suffix(h, depth)
+            if suffix in shards:
+                return suffix
+        raise KeyError(f"No shard for {key}")
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.directory, self.manifest["shards"][suffix])
+
+    def _read(self, suffix: str) -> Dict[str, Any]:
+        with open(self._path(suffix), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, suffix: str, data: Dict[str, Any]) -> None:
+        _write_json(self._path(suffix), data)
+
+    def _commit(self) -> None:
+        self.manifest["revision"] += 1
+        _write_json(os.path.join(self.directory, MANIFEST), self.manifest)
+
+    def _split_if_large(self, suffix: str) -> None:
+        path = self._path(suffix)
+        if os.path.getsize(path) <= self.manifest["max_shard_bytes"] or len(suffix) >= MAX_DEPTH:
+            return
+        data = self._read(suffix)
+        if len(data) < 2:
+            return
+        depth = len(suffix) + 1
+        halves: Dict[str, Dict[str, Any]] = {"0" + suffix: {}, "1" + suffix: {}}
+        for key, value in data.items():
+            halves[_suffix(_hash(key), depth)][key] = value
+        shards = self.manifest["shards"]
+        for half, bucket in halves.items():
+            shards[half] = f"shard_{half}.json"
+            self._write(half, bucket)
+        del shards[suffix]
+        self._commit()
+        os.remove(path)
+        for half in halves:
+            self._split_if_large(half)
+
+    # ------------------------------------------------------------------
+    # Entity access
+    # ------------------------------------------------------------------
+    def stamp(self) -> Tuple[int, int]:
+        """Return ``(mtime_ns, size)`` of the manifest, which changes on every write."""
+        stat = os.stat(os.path.join(self.directory, MANIFEST))
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._read(self._shard_for(key)).get(key, default)
+
+    def get_many(self, keys) -> Dict[str, Any]:
+        """Return the stored entities among ``keys``, reading each shard once."""
+        by_shard: Dict[str, list] = {}
+        for key in keys:
+            by_shard.setdefault(self._shard_for(key), []).append(key)
+        found: Dict[str, Any] = {}
+        for suffix, shard_keys in by_shard.items():
+            data = self._read(suffix)
+            found.update((k, data[k]) for k in shard_keys if k in data)
+        return found
+
+    def update_many(self, changes: Dict[str, Optional[Any]]) -> None:
+        """Set entities to new values (``None`` deletes), rewriting only their shards."""
+        by_shard: Dict[str, Dict[str, Optional[Any]]] = {}
+        for key, value in changes.items():
+            by_shard.setdefault(self._shard_for(key), {})[key] = value
+        for suffix, shard_changes in by_shard.items():
+            data = self._read(suffix)
+            for key, value in shard_changes.items():
+                if value is None:
+                    data.pop(key, None)
+                else:
+                    data[key] = value
+            self._write(suffix, data)
+        self._commit()
+        for suffix in by_shard:
+            if suffix in self.manifest["shards"]:
+                self._split_if_large(suffix)
+
+    def put(self, key: str, value: Any) -> None:
+        self.update_many({key: value})
+
+    def delete(self, key: str) -> None:
+        self.update_many({key: None})
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Yield every entity, reading one shard at a time."""
+        for suffix in sorted(self.manifest["shards"], key=lambda s: (len(s), s)):
+            yield from self._read(suffix).items()
+
+    def load_all(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def replace_all(self, data: Dict[str, Any]) -> None:
+        """Make the store hold exactly ``data``, rewriting only changed shards."""
+        wanted: Dict[str, Dict[str, Any]] = {suffix: {} for suffix in self.manifest["shards"]}
+        for key, value in data.items():
+            wanted[self._shard_for(key)][key] = value
+        changed = [suffix for suffix, bucket in wanted.items() if self._read(suffix) != bucket]
+        for suffix in changed:
+            self._write(suffix, wanted[suffix])
+        self._commit()
+        for suffix in changed:
+            if suffix in self.manifest["shards"]:
+                self._split_if_large(suffix)
+
+    def size_bytes(self) -> int:
+        return sum(os.path.getsize(os.path.join(self.directory, n)) for n in os.listdir(self.directory))
+
+
+def open_store(campaign_path: str, filename: str) -> ShardedStore | None:
+    """Return the store of a sharded file, or ``None`` for a plain file."""
+    if not is_sharded(campaign_path, filename):
+        return None
+    return ShardedStore(shard_dir(campaign_path, filename))
+
+
+def read_entities(campaign_path: str, filename: str) -> Dict[str, Any]:
+    """Return the content of ``filename`` in either layout."""
+    store = open_store(campaign_path, filename)
+    if store is not None:
+        return store.load_all()
+    with open(os.path.join(campaign_path, filename), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def source_exists(campaign_path: str, filename: str) -> bool:
+    return os.path.exists(os.path.join(campaign_path, filename)) or is_sharded(campaign_path, filename)
+
+
+def source_mtime(campaign_path: str, filename: str) -> float:
+    if is_sharded(campaign_path, filename):
+        return os.path.getmtime(os.path.join(shard_dir(campaign_path, filename), MANIFEST))
+    return os.path.getmtime(os.path.join(campaign_path, filename))
+
+
+def shard_file(
+    campaign_path: str,
+    filename: str,
+    shards: int = DEFAULT_SHARDS,
+    max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES,
+) -> ShardedStore:
+    """Convert ``filename`` to the sharded layout and remove the plain file."""
+    if filename not in SHARDABLE_FILES:
+        raise ValueError(f"{filename} cannot be sharded")
+    if is_sharded(campaign_path, filename):
+        raise ValueError(f"{filename} is already sharded")
+    path = os.path.join(campaign_path, filename)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    store = ShardedStore.create(shard_dir(campaign_path, filename), data, shards, max_shard_bytes)
+    os.remove(path)
+    return store
+
+
+def unshard_file(campaign_path: str, filename: str) -> None:
+    """Convert a sharded file back to a single JSON file."""
+    store = open_store(campaign_path, filename)
+    if store is None:
+        raise ValueError(f"{filename} is not sharded")
+    _write_json(os.path.join(campaign_path, filename), store.load_all())
+    for name in os.listdir(store.directory):
+        os.remove(os.path.join(store.directory, name))
+    os.rmdir(store.directory)
@@ -5,13 +5,22 @@ import streamlit as st
 from config import CONFIG
 
 from campaign_manager import (
+    CampaignDataCache,
     CampaignManager,
     PlayerManager,
     PlayerCharacter,
+    load_player_state,
 )
 from world_memory import WorldMemoryManager
-from prompt_builder import build_prompt
+from session_store import SessionStore
+from entity_spotter import EntitySpotter
+from journal_manager import JournalManager
+from maintenance import MaintenanceService
+from model_router import ModelRouter
+from rate_limiter import estimate_tokens, get_limiter
+from prompt_builder import build_messages
 from ui.campaign_panel import campaign_management_panel
+from ui.party_panel import party_panel
 from ui.player_stats_panel import player_stats_panel
 from ui.world_memory_panel import world_memory_panel
 
@@ -24,37 +33,66 @@ has_api_key = (
 st.write("\U0001F512 OpenAI key loaded:", "\u2705" if has_api_key else "\u274C")
 
 
-def get_response(prompt: str) -> str:
-    """Return a response from OpenAI's chat API with graceful errors."""
+def _api_key() -> str | None:
+    return (
+        st.secrets.get("openai_api_key")
+        or st.secrets.get("general", {}).get("openai_api_key")
+        or os.getenv("OPENAI_API_KEY")
+    )
+
+
+def _openai_call(model: str, messages: list, timeout: float, **params) -> str:
+    import openai
+
+    openai.api_key = _api_key()
+    resp = openai.ChatCompletion.create(
+        model=model,
+        messages=messages,
+        request_timeout=timeout,
+        **params,
+    )
+    return resp.choices[0].message["content"].strip()
+
+
+@st.cache_resource
+def get_router() -> ModelRouter:
+    """Share one model router (and its latency stats) per server process."""
+    return ModelRouter(CONFIG, _openai_call)
+
+
+def get_response(messages: list, user_input: str = "", dm: bool = False) -> str:
+    """Return a response from OpenAI's chat API with graceful errors.
+
+    Every model call, a fallback included, takes a slot of the process-wide
+    rate limiter, queued fairly per campaign, then per player; ``dm``
+    requests are served first.
+    """
     try:
-        api_key = (
-            st.secrets.get("openai_api_key")
-            or st.secrets.get("general", {}).get("openai_api_key")
-            or os.getenv("OPENAI_API_KEY")
-        )
-        if not api_key:
+        if not _api_key():
             st.error("Missing OpenAI API key.")
             return "\u26A0\ufe0f Missing API key."
 
-        import openai
-
-        openai.api_key = api_key
-        messages = []
-        if CONFIG.system_prompt:
-            messages.append({"role": "system", "content": CONFIG.system_prompt})
-        messages.append({"role": "user", "content": prompt})
-        resp = openai.ChatCompletion.create(
-            model=CONFIG.chat_model,
-            messages=messages,
-            temperature=CONFIG.temperature,
-            max_tokens=CONFIG.max_tokens,
+        prompt = "".join(m["content"] for m in messages)
+        tokens = estimate_tokens(prompt, CONFIG.max_tokens)
+        campaign = st.session_state.get("campaign_name", "")
+        player = st.session_state.get("player_name", "")
+        limiter = get_limiter()
+        return get_router().complete(
+            messages,
+            user_input or prompt,
+            slot=lambda: limiter.slot(campaign, player, tokens, dm, timeout=CONFIG.latency_budget * 3),
         )
-        return resp.choices[0].message["content"].strip()
     except Exception as e:  # pragma: no cover - depends on external API
         st.error(f"API Error: {e}")
         return f"\u274c API Error: {e}"
 
 
+@st.cache_resource
+def get_maintenance_service() -> MaintenanceService:
+    """Start one background index maintenance service per server process."""
+    return MaintenanceService().start()
+
+
 def initialize_state(campaign_name: str, player_name: str):
     """Load managers and ensure player state exists."""
     cm = CampaignManager(campaign_name)
@@ -63,6 +101,7 @@ def initialize_state(campaign_name: str, player_name: str):
     character = pm.load_character(player_name)
     wm = WorldMemoryManager(campaign_name)
     st.session_state.campaign_manager = cm
+    st.session_state.campaign_data = CampaignDataCache(cm)
     st.session_state.player_manager = pm
     st.session_state.world_memory = wm
     if character is None:
@@ -100,45 +139,32 @@ def character_creation_form(default_name: str):
             st.experimental_rerun()
 
 
-def load_player_state(cm: CampaignManager, player_name: str) -> dict:
-    path = cm._player_state_file(player_name)
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        # Backwards compatibility for older saves with only gold
-        if "platinum" not in data:
-            data.setdefault("platinum", 0)
-        if "silver" not in data:
-            data.setdefault("silver", 0)
-        if "copper" not in data:
-            data.setdefault("copper", 0)
-        if "gold" not in data:
-            data.setdefault("gold", 0)
-        if "inventory" not in data:
-            data["inventory"] = []
-        if "quests" not in data:
-            data["quests"] = []
-        return data
-    return {
-        "platinum": 0,
-        "gold": 0,
-        "silver": 0,
-        "copper": 0,
-        "inventory": [],
-        "quests": [],
-    }
-
-
-def load_campaign_data(cm: CampaignManager) -> dict:
-    return {
-        "npcs": cm._load_json("npcs.json"),
-        "quests": cm._load_json("quests.json"),
-        "items": cm._load_json("items.json"),
-        "events": cm._load_json("events_log.json"),
-    }
+st.title("TTRPG Chatbot")
 
+maintenance = get_maintenance_service().progress()
+st.sidebar.caption(
+    f"Index maintenance: {maintenance['queued']} queued, "
+    f"{maintenance['running']} running, {maintenance['completed']} done, "
+    f"{maintenance['dropped']} dropped, backpressure {maintenance['backpressure']:.0%}"
+)
+st.sidebar.checkbox("DM mode (priority requests)", key="dm_mode")
+queue = get_limiter().stats()
+st.sidebar.caption(
+    f"LLM queue: {queue['queued']} waiting, {queue['active']} running, "
+    f"avg wait {queue['avg_wait']:.1f}s (p95 {queue['p95_wait']:.1f}s)"
+)
+for route, route_stats in get_router().stats().items():
+    st.sidebar.caption(
+        f"{route} model: p50 {route_stats['p50']:.1f}s, p95 {route_stats['p95']:.1f}s, "
+        f"{route_stats['timeout']} timeouts"
+    )
 
-st.title("TTRPG Chatbot")
+if st.session_state.get("prefix_stats", {}).get("turns"):
+    prefix = st.session_state.prefix_stats
+    st.sidebar.caption(
+        f"Stable prompt prefix: {prefix['tokens']} tokens, "
+        f"unchanged on {prefix['reused']}/{prefix['turns']} turns"
+    )
 
 campaign_management_panel(initialize_state)
 
@@ -158,15 +184,32 @@ if st.session_state.get("character_missing"):
     character_creation_form(player_name)
     st.stop()
 
-if "history" not in st.session_state:
-    st.session_state.history = []
+# Number of chat lines rendered per page
+HISTORY_PAGE_SIZE = 50
+
+if "session" not in st.session_state:
+    # reopening picks up the player's latest session where it left off
+    st.session_state.session = SessionStore.resume(campaign_name, player_name, CONFIG.session_summary_chars)
+    st.session_state.history_window = HISTORY_PAGE_SIZE
+session: SessionStore = st.session_state.session
+chat_store = session.chat
+if st.sidebar.button("New session"):
+    session = st.session_state.session = SessionStore(
+        campaign_name, player_name, summary_chars=CONFIG.session_summary_chars
+    )
+    chat_store = session.chat
+    st.session_state.history_window = HISTORY_PAGE_SIZE
+session_tokens = session.tokens
+st.sidebar.caption(
+    f"Session: {session_tokens['turns']} turns, {session_tokens['prompt']} prompt "
+    f"and {session_tokens['reply']} reply tokens"
+)
 if "user_message" not in st.session_state:
     st.session_state.user_message = ""
 
 user_message = st.text_input("Message", st.session_state.user_message, key="msg_input")
 if st.button("Send") and st.session_state.user_message:
     msg_to_send = st.session_state.user_message
-    st.session_state.history.append(f"Player: {msg_to_send}")
     cm = st.session_state.campaign_manager
     wm = st.session_state.world_memory
 
@@ -174,23 +217,40 @@ if st.button("Send") and st.session_state.user_message:
     character = st.session_state.character.to_dict() if hasattr(st.session_state.character, 'to_dict') else st.session_state.character
     player_data = {**character, **player_state}
 
-    campaign_data = load_campaign_data(cm)
-    world_mem = list(wm._load().values())
+    # only files another session changed since the last turn are reread
+    campaign_data = st.session_state.campaign_data.get()
+    world_mem = list(wm.entries().values())
 
-    prompt = build_prompt(
+    chat_prompt = build_messages(
         player_name,
         player_data,
         campaign_data,
         world_mem,
-        st.session_state.history,
+        session.history(),
         msg_to_send,
         CONFIG.system_prompt,
+        world_digests=wm.digests(),
+        digest_budget=CONFIG.world_digest_chars,
+        session_summary=session.summary,
     )
-    response = get_response(prompt)
-    st.session_state.history.append(f"Narrator: {response}")
+    last_hash = (session.last_prompt or {}).get("prefix_hash", "")
+    prefix = st.session_state.setdefault("prefix_stats", {"turns": 0, "reused": 0, "hash": last_hash, "tokens": 0})
+    prefix["turns"] += 1
+    prefix["reused"] += chat_prompt.prefix_hash == prefix["hash"]
+    prefix.update(hash=chat_prompt.prefix_hash, tokens=chat_prompt.prefix_tokens)
+    response = get_response(chat_prompt.messages, msg_to_send, st.session_state.get("dm_mode", False))
+    session.record_turn(msg_to_send, response, chat_prompt)
+    spotter = st.session_state.setdefault("entity_spotter", EntitySpotter(cm, wm))
+    noted = spotter.update_journal(JournalManager(campaign_name, player_name), response)
+    if noted:
+        st.caption("Journal: " + ", ".join(name for names in noted.values() for name in names))
     st.session_state.user_message = ""
 
-for line in st.session_state.history:
+if len(chat_store) > st.session_state.history_window:
+    if st.button("Load older messages"):
+        st.session_state.history_window += HISTORY_PAGE_SIZE
+
+for line in chat_store.tail(st.session_state.history_window):
     if line.startswith("Player: "):
         msg = line.split(": ", 1)[1]
         st.markdown(f"\U0001F9D1 **{msg}**")
@@ -202,12 +262,11 @@ for line in st.session_state.history:
 
 
 if st.button("Save Chat Log"):
-    os.makedirs("logs", exist_ok=True)
-    log_name = f"{campaign_name}_{player_name}.json".replace(" ", "_")
-    with open(os.path.join("logs", log_name), "w", encoding="utf-8") as f:
-        json.dump(st.session_state.history, f, indent=2)
+    log_name = f"{campaign_name}_{player_name}.jsonl".replace(" ", "_")
+    session.export_new(os.path.join("logs", log_name))
     st.success(f"Chat log saved to {log_name}")
 
 player_stats_panel(player_name, load_player_state)
+party_panel()
 world_memory_panel()
 
@@ -40,3 +40,17 @@ def test_progress_villain_logs_event(tmp_path, monkeypatch):
     assert "steals the gem" in villain["description"]
     events = json.loads((Path(tmp_path) / "ArcTest" / "events_dm_log.json").read_text())
     assert any("steals the gem" in e["description"] for e in events.values())
+
+
+def test_get_villain_skips_data_file(tmp_path, monkeypatch):
+    am = _setup(tmp_path, monkeypatch)
+    am.progress_villain("raises an army")
+
+    def no_load(self):
+        raise AssertionError("data file read")
+
+    monkeypatch.setattr(world_memory.WorldMemoryManager, "_load", no_load)
+    villain = am.get_villain()
+    assert villain["type"] == "villain" and villain["description"] == "raises an army"
+    villain["description"] = "changed by the caller"
+    assert am.get_villain()["description"] == "raises an army"
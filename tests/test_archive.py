@@ -0,0 +1,117 @@
+import io
+import json
+import tarfile
+from pathlib import Path
+import sys
+import pytest
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.arc_manager as arc_manager
+sys.modules.setdefault("arc_manager", arc_manager)
+import BlackFeather.journal_manager as journal_manager
+sys.modules.setdefault("journal_manager", journal_manager)
+import BlackFeather.archive as archive
+
+
+def _setup_campaign(tmp_path, monkeypatch):
+    campaigns = tmp_path / "campaigns"
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(campaigns))
+    monkeypatch.setattr(journal_manager, "CAMPAIGNS_DIR", str(campaigns))
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    cm = campaign_manager.CampaignManager("Summer Campaign")
+    cm.add_npc({"name": "Ari"})
+    cm.update_player_state("Lia", {"gold": 5})
+    journal_manager.JournalManager("Summer Campaign", "Lia").add_gold(7)
+    return campaigns
+
+
+def test_export_import_roundtrip_with_rename(tmp_path, monkeypatch):
+    campaigns = _setup_campaign(tmp_path, monkeypatch)
+    path = archive.export_campaign("Summer Campaign", str(tmp_path / "out.tar.gz"))
+    with tarfile.open(path, "r:gz") as tar:
+        names = tar.getnames()
+    assert names[-1] == archive.MANIFEST_NAME
+    assert "journals/lia_journal.json" in names
+
+    name = archive.import_campaign(path, new_name="Winter")
+    assert name == "Winter"
+    npcs = json.loads((campaigns / "Winter" / "npcs.json").read_text())
+    assert [n["name"] for n in npcs.values()] == ["Ari"]
+    assert json.loads((campaigns / "Winter" / "players" / "lia.json").read_text())["gold"] == 5
+    journal = json.loads((campaigns / "winter" / "players" / "lia_journal.json").read_text())
+    assert journal["gold"] == 7
+    with pytest.raises(FileExistsError):
+        archive.import_campaign(path, new_name="Winter")
+
+
+def test_import_rejects_bad_checksum(tmp_path, monkeypatch):
+    campaigns = _setup_campaign(tmp_path, monkeypatch)
+    good = archive.export_campaign("Summer Campaign", str(tmp_path / "good.tar.gz"))
+    bad = tmp_path / "bad.tar.gz"
+    with tarfile.open(good, "r:gz") as src, tarfile.open(bad, "w:gz") as dst:
+        for member in src:
+            data = src.extractfile(member).read()
+            if member.name == "campaign/npcs.json":
+                data = data.replace(b"Ari", b"Bob")
+            dst.addfile(member, io.BytesIO(data))
+    with pytest.raises(ValueError):
+        archive.import_campaign(str(bad), new_name="Broken")
+    assert not (campaigns / "Broken").exists()
+    assert not [p for p in campaigns.iterdir() if p.name.startswith(".import-")]
+
+
+def _repack(src_path, dst_path, campaign):
+    """Copy an archive, replacing the campaign name in its manifest."""
+    with tarfile.open(src_path, "r:gz") as src, tarfile.open(dst_path, "w:gz") as dst:
+        for member in src:
+            data = src.extractfile(member).read()
+            if member.name == archive.MANIFEST_NAME:
+                data = json.dumps({**json.loads(data), "campaign": campaign}).encode("utf-8")
+                member.size = len(data)
+            dst.addfile(member, io.BytesIO(data))
+    return str(dst_path)
+
+
+def test_import_rejects_unsafe_names(tmp_path, monkeypatch):
+    campaigns = _setup_campaign(tmp_path, monkeypatch)
+    good = archive.export_campaign("Summer Campaign", str(tmp_path / "good.tar.gz"))
+    evil = _repack(good, tmp_path / "evil.tar.gz", "../evil")
+    with pytest.raises(ValueError):
+        archive.import_campaign(evil)
+    for name in ("../evil", "a/b", str(tmp_path / "abs"), "..", ""):
+        with pytest.raises(ValueError):
+            archive.import_campaign(good, new_name=name)
+    assert not (tmp_path / "evil").exists() and not (tmp_path / "abs").exists()
+    assert sorted(p.name for p in campaigns.iterdir()) == ["Summer Campaign", "summer_campaign"]
+
+
+def test_journals_follow_the_import_name(tmp_path, monkeypatch):
+    campaigns = _setup_campaign(tmp_path, monkeypatch)
+    campaign_manager.CampaignManager("winter")
+    journal_manager.JournalManager("winter", "Bo").add_gold(3)
+    path = archive.export_campaign("winter", str(tmp_path / "winter.tar.gz"))
+
+    archive.import_campaign(path, new_name="Spring Time")
+    assert not (campaigns / "Spring Time" / "players" / "bo_journal.json").exists()
+    assert journal_manager.JournalManager("Spring Time", "Bo").get_journal()["gold"] == 3
+
+    path = archive.export_campaign("Summer Campaign", str(tmp_path / "summer.tar.gz"))
+    archive.import_campaign(path, new_name="autumn")
+    assert json.loads((campaigns / "autumn" / "players" / "lia_journal.json").read_text())["gold"] == 7
+
+
+def test_failed_import_leaves_no_journals(tmp_path, monkeypatch):
+    campaigns = _setup_campaign(tmp_path, monkeypatch)
+    path = archive.export_campaign("Summer Campaign", str(tmp_path / "out.tar.gz"))
+    real_replace = archive.os.replace
+
+    def failing_replace(src, dst):
+        if dst == str(campaigns / "Winter Camp"):
+            raise OSError("disk full")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(archive.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        archive.import_campaign(path, new_name="Winter Camp")
+    assert not (campaigns / "Winter Camp").exists()
+    assert not (campaigns / "winter_camp").exists()
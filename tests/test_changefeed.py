@@ -0,0 +1,122 @@
+import json
+import multiprocessing
+import sys
+import pytest
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.world_memory as world_memory
+sys.modules.setdefault("world_memory", world_memory)
+import BlackFeather.arc_manager as arc_manager
+from BlackFeather import changefeed
+from BlackFeather.campaign_manager import CampaignDataCache, CampaignManager
+from BlackFeather.prompt_builder import summarize_campaign
+from BlackFeather.records import RecordTable
+from BlackFeather.world_memory import WorldMemoryManager
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    return CampaignManager("Feed")
+
+
+def test_mutations_are_recorded_in_order(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    start = cm.changes.revision()
+    npc_id = cm.add_npc({"name": "Ari"})
+    cm.update_npc(npc_id, {"mood": "wary"})
+    quest_id = cm.add_quest({"title": "Find the map"})
+    cm.complete_quest(quest_id, "Lia")
+    entry_id = WorldMemoryManager("Feed").add_memory_entry({"type": "city", "name": "Haven"})
+
+    changes = cm.changes_since(start)
+    assert [c["rev"] for c in changes] == list(range(start + 1, start + len(changes) + 1))
+    assert [(c["file"], c["id"], c["op"]) for c in changes] == [
+        ("npcs.json", npc_id, "add"),
+        ("npcs.json", npc_id, "update"),
+        ("quests.json", quest_id, "add"),
+        ("quests.json", quest_id, "complete"),
+        ("players/lia.json", "Lia", "add"),
+        ("players/lia.json", "Lia", "update"),
+        ("world_memory.json", entry_id, "add"),
+    ]
+    assert cm.changes_since(cm.changes.revision()) == []
+
+
+def test_changes_since_outside_window(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    monkeypatch.setattr(changefeed, "FEED_WINDOW", 3)
+    changefeed._STATE.clear()
+    for i in range(10):
+        cm.log_event(f"event {i}")
+    head = cm.changes.revision()
+    assert len(cm.changes_since(head - 2)) == 2
+    assert cm.changes_since(0) is None
+
+
+def test_campaign_data_cache_rereads_changed_files(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    cache = CampaignDataCache(cm)
+    assert cache.get()["npcs"] == {}
+    reads = []
+    original = cm._load_json
+    monkeypatch.setattr(cm, "_load_json", lambda f: reads.append(f) or original(f))
+    CampaignManager("Feed").add_npc({"name": "Ari"})
+    data = cache.get()
+    assert reads == ["npcs.json"]
+    assert [n["name"] for n in data["npcs"].values()] == ["Ari"]
+    # the cache holds compact columns, not parsed JSON
+    assert isinstance(data["npcs"], RecordTable)
+
+
+def test_campaign_data_cache_tracks_latest_event(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    cache = CampaignDataCache(cm)
+    assert cache.get()["latest_event"] == {}
+    cm.log_event("gate opened")
+    cm.log_event("dragon woke")
+    assert cache.get()["latest_event"]["description"] == "dragon woke"
+    summary = summarize_campaign(cache.get())
+    assert "Recent event: dragon woke." in summary
+
+
+def test_journal_writes_reach_the_campaign_feed(tmp_path, monkeypatch):
+    import BlackFeather.journal_manager as journal_manager
+
+    sys.modules.setdefault("journal_manager", journal_manager)
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(journal_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    cm = CampaignManager("Summer Campaign")
+    start = cm.changes.revision()
+    journal = journal_manager.JournalManager("Summer Campaign", "Lia")
+    journal.add_gold(5)
+    journal.record_mentions({"npcs": ["Mira"]})
+    changes = cm.changes_since(start)
+    assert [(c["file"], c["id"], c["op"]) for c in changes] == [
+        ("players/lia_journal.json", "Lia", "add"),
+        ("players/lia_journal.json", "Lia", "update"),
+        ("players/lia_journal.json", "Lia", "update"),
+    ]
+
+
+def _record_many(path, count):
+    feed = changefeed.ChangeFeed(path)
+    for i in range(count):
+        feed.record("npcs.json", [(f"n{i}", "update")])
+
+
+@pytest.mark.skipif(changefeed.fcntl is None, reason="needs fcntl")
+def test_processes_share_one_revision_sequence(tmp_path, monkeypatch):
+    monkeypatch.setattr(changefeed, "FEED_WINDOW", 10)  # forces trims
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_record_many, args=(str(tmp_path), 40)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+    lines = (tmp_path / changefeed.FEED_FILE).read_text().splitlines()
+    revs = [json.loads(line)["rev"] for line in lines]
+    assert revs == list(range(121 - len(revs), 121))
@@ -0,0 +1,51 @@
+import sys
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+from BlackFeather.chat_store import ChatStore
+
+
+def test_append_and_page(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    store = ChatStore("Chat Test", "Lia", "s1")
+    for i in range(10):
+        store.append(f"Player: line {i} ✨")
+    assert len(store) == 10
+    assert store.tail(3) == [f"Player: line {i} ✨" for i in (7, 8, 9)]
+    assert store.page(2, 4) == ["Player: line 2 ✨", "Player: line 3 ✨"]
+
+    # a torn final write is ignored and overwritten on reopen
+    with open(store.path, "ab") as f:
+        f.write(b'"Player: torn')
+    reopened = ChatStore("Chat Test", "Lia", "s1")
+    assert len(reopened) == 10
+    reopened.append("Narrator: ok")
+    assert reopened.tail(2) == ["Player: line 9 ✨", "Narrator: ok"]
+
+
+def test_export_new_appends_only_new_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    store = ChatStore("Chat Test", "Lia")
+    log = tmp_path / "logs" / "chat.jsonl"
+    store.append("Player: hi")
+    saved = store.export_new(str(log), 0)
+    store.append("Narrator: hello")
+    saved = store.export_new(str(log), saved)
+    assert saved == 2
+    assert log.read_text(encoding="utf-8").splitlines() == ['"Player: hi"', '"Narrator: hello"']
+
+
+def test_reopen_uses_offset_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    store = ChatStore("Chat Test", "Lia", "s2")
+    for i in range(5):
+        store.append(f"Player: line {i}")
+    # a line written after a crash before its index entry is still found
+    with open(store.path, "ab") as f:
+        f.write(b'"Player: unindexed"\n')
+    scanned = []
+    original = ChatStore._scan
+    monkeypatch.setattr(ChatStore, "_scan", lambda self, offset=0: scanned.append(offset) or original(self, offset))
+    reopened = ChatStore("Chat Test", "Lia", "s2")
+    assert len(reopened) == 6 and reopened.tail(2) == ["Player: line 4", "Player: unindexed"]
+    assert scanned == [store._offsets[-1]]
+    assert ChatStore("Chat Test", "Lia", "s2").page(0, 6) == reopened.page(0, 6)
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import BlackFeather
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(BlackFeather.__file__))
+
+
+def _run(args, cwd, **kwargs):
+    result = subprocess.run(
+        [sys.executable, *args], cwd=cwd, capture_output=True, text=True, timeout=60, **kwargs
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_cli_runs_as_script(tmp_path):
+    cli = os.path.join(PACKAGE_DIR, "cli.py")
+    assert _run([cli, "create", "Smoke Test"], tmp_path) == "Created campaign Smoke Test\n"
+    assert _run([cli, "list"], tmp_path) == "Smoke Test\n"
+    assert "up to date" in _run([cli, "migrate", "--dry-run"], tmp_path)
+
+
+def test_cli_runs_as_module(tmp_path):
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(PACKAGE_DIR)}
+    _run(["-m", "BlackFeather.cli", "create", "Smoke Test"], tmp_path, env=env)
+    assert _run(["-m", "BlackFeather.cli", "list"], tmp_path, env=env) == "Smoke Test\n"
+
+
+def test_cli_compact_skips_journal_directories(tmp_path):
+    cli = os.path.join(PACKAGE_DIR, "cli.py")
+    _run([cli, "create", "Smoke Test"], tmp_path)
+    players = tmp_path / "campaigns" / "smoke_test" / "players"
+    players.mkdir(parents=True)
+    (players / "Lia_journal.json").write_text("[]")
+    assert _run([cli, "compact"], tmp_path) == "Smoke Test: archived 0 events\n"
+    assert sorted(os.listdir(players.parent)) == ["players"]
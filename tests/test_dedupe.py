@@ -0,0 +1,45 @@
+import json
+from pathlib import Path
+import sys
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.world_memory as world_memory
+sys.modules.setdefault("world_memory", world_memory)
+from BlackFeather import dedupe
+from BlackFeather.world_memory import WorldMemoryManager
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    return WorldMemoryManager("Dedupe")
+
+
+def test_insert_flags_near_duplicates(tmp_path, monkeypatch):
+    wm = _setup(tmp_path, monkeypatch)
+    haven = wm.add_memory_entry({"type": "city", "name": "Haven", "description": "A busy harbor"})
+    wm.add_memory_entry({"type": "faction", "name": "Haven", "description": "Not a city"})
+    wm.add_memory_entry({"type": "city", "name": "Blackmoor"})
+    dup = wm.add_memory_entry({"type": "city", "name": "the port of Haven", "description": "A busy harbor"})
+    data = wm._load()
+    assert data[dup]["possible_duplicates"] == [haven]
+    assert "possible_duplicates" not in data[haven]
+
+
+def test_dedupe_merges_and_rewrites_links(tmp_path, monkeypatch):
+    wm = _setup(tmp_path, monkeypatch)
+    a = wm.add_memory_entry({"type": "city", "name": "Haven", "tags": ["port"]})
+    b = wm.add_memory_entry({"type": "city", "name": "Haven City", "tags": ["trade"]})
+    guild = wm.add_memory_entry({"type": "faction", "name": "Dock Union"})
+    wm.link_entities(guild, b, bidirectional=True)
+
+    report = dedupe.dedupe_memory(wm)
+    assert report["clusters"] == [[a, b]]
+    assert report["removed"] == 1 and report["bytes_reclaimed"] > 0
+    data = json.loads(Path(wm.file_path).read_text())
+    assert set(data) == {a, guild}
+    assert data[a]["aliases"] == ["Haven City"]
+    assert data[a]["tags"] == ["port", "trade"]
+    assert data[a]["related_to"] == [guild]
+    assert data[guild]["related_to"] == [a]
+    assert wm.find_ids(tags=["trade"]) == [a]
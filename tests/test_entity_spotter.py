@@ -0,0 +1,77 @@
+import sys
+import BlackFeather.campaign_manager as campaign_manager
+import BlackFeather.arc_manager as arc_manager
+import BlackFeather.world_memory as world_memory
+import BlackFeather.journal_manager as journal_manager
+
+sys.modules.setdefault("campaign_manager", campaign_manager)
+sys.modules.setdefault("arc_manager", arc_manager)
+sys.modules.setdefault("world_memory", world_memory)
+sys.modules.setdefault("journal_manager", journal_manager)
+from BlackFeather.entity_spotter import AhoCorasick, EntitySpotter
+from BlackFeather.journal_manager import JournalManager
+from BlackFeather.world_memory import WorldMemoryManager
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(campaign_manager, "PLAYERS_DIR", tmp_path / "players")
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(journal_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    return campaign_manager.CampaignManager("Spot"), WorldMemoryManager("Spot")
+
+
+def test_automaton_finds_overlapping_patterns():
+    ac = AhoCorasick()
+    for pattern in ("he", "she", "his", "hers"):
+        ac.add(pattern)
+    assert sorted(ac.find("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    ac.discard("she")
+    ac.add("us")
+    assert sorted(ac.find("ushers")) == [(0, 2, "us"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_spotter_matches_whole_names_and_follows_changes(tmp_path, monkeypatch):
+    cm, wm = _setup(tmp_path, monkeypatch)
+    mira = cm.add_npc({"name": "Mira"})
+    cm.add_npc({"name": "Al"})  # too short to spot
+    cm.add_item({"name": "Sunblade"})
+    haven = wm.add_memory_entry({"type": "city", "name": "Haven"})
+    wm.add_memory_entry({"type": "business", "name": "Haven Docks"})
+    wm.add_memory_entry({"type": "villain", "name": "Zara"})
+    locked_gate = cm.add_quest({"title": "Open the gate"})
+    cm.add_quest({"title": "Secret door", "requires": {"world": {"map_found": True}}})
+    spotter = EntitySpotter(cm, wm)
+
+    text = "Mira hands you the Sunblade at the Haven Docks. Zara watches; Miranda and Al do not. Secret door?"
+    found = {(m.kind, m.name) for m in spotter.spot(text)}
+    assert found == {("npc", "Mira"), ("item", "Sunblade"), ("business", "Haven Docks")}
+
+    cm.update_npc(mira, {"name": "Mira Stone"})
+    wm.update_memory_entry(haven, {"name": "New Haven"})
+    cm.update_world_state({"map_found": True})
+    text = "Mira Stone reaches New Haven and finds the secret door, then tries to open the gate."
+    assert spotter.journal_mentions(text) == {
+        "npcs": ["Mira Stone"],
+        "places": ["New Haven"],
+        "quests": ["Secret door", "Open the gate"],
+    }
+    assert locked_gate
+
+
+def test_update_journal_writes_once(tmp_path, monkeypatch):
+    cm, wm = _setup(tmp_path, monkeypatch)
+    cm.add_npc({"name": "Mira"})
+    cm.add_quest({"title": "Find the map"})
+    journal = JournalManager("Spot", "Lia")
+    journal.add_npc("Mira")
+    saves = []
+    original = journal._save
+    monkeypatch.setattr(journal, "_save", lambda *a, **k: saves.append(1) or original(*a, **k))
+    spotter = EntitySpotter(cm, wm)
+    added = spotter.update_journal(journal, "Mira says you must find the map.")
+    assert added == {"quests": ["Find the map"]}
+    assert len(saves) == 1
+    assert spotter.update_journal(journal, "Mira waves.") == {} and len(saves) == 1
+    assert journal.get_journal()["quests"] == ["Find the map"]
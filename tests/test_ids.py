@@ -0,0 +1,64 @@
+import sys
+from datetime import datetime, timedelta, timezone
+import BlackFeather.campaign_manager as campaign_manager
+import BlackFeather.arc_manager as arc_manager
+
+sys.modules.setdefault("campaign_manager", campaign_manager)
+sys.modules.setdefault("arc_manager", arc_manager)
+from BlackFeather import ids
+
+
+def _setup_campaign(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(campaign_manager, "PLAYERS_DIR", tmp_path / "players")
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    return campaign_manager.CampaignManager("Timeline")
+
+
+def test_new_ids_sort_by_creation_time():
+    made = [ids.new_id() for _ in range(1000)]
+    assert made == sorted(made) and len(set(made)) == 1000
+    assert all(ids.is_id(i) for i in made)
+    assert not ids.is_id("3f1c3e9a-1111-4222-8333-444455556666")
+    when = datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+    assert ids.id_time(ids.new_id(when)) == when
+    assert ids.new_id(when) < ids.new_id(when + timedelta(milliseconds=1))
+
+
+def test_ordered_index_queries():
+    start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    keys = [ids.new_id(start + timedelta(hours=h)) for h in range(10)]
+    index = ids.OrderedIndex(reversed(keys + ["legacy-key"]))
+    assert len(index) == 10
+    assert index.latest(3) == keys[:-4:-1]
+    assert index.between(start + timedelta(hours=2), start + timedelta(hours=4)) == keys[2:5]
+    assert index.between(start + timedelta(hours=8)) == keys[8:]
+
+    page, cursor = index.page(limit=4)
+    assert page == keys[:-5:-1]
+    page, cursor = index.page(cursor, limit=4)
+    assert page == keys[5:1:-1]
+    page, cursor = index.page(cursor, limit=4)
+    assert page == keys[1::-1] and cursor is None
+    assert index.page(keys[4], limit=3, descending=False) == (keys[5:8], keys[7])
+
+    index.discard(keys[9])
+    index.add(keys[9])
+    index.add(keys[9])
+    assert len(index) == 10
+
+
+def test_timeline_follows_campaign(tmp_path, monkeypatch):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    timeline = cm.timeline("events_log.json")
+    first = cm.log_event("The gates open")
+    assert [i for i, _e in timeline.latest(5)] == [first]
+    second = cm.log_event("A storm rolls in")
+    third = cm.log_event("The storm passes")
+    assert [e["description"] for _i, e in timeline.latest(2)] == ["The storm passes", "A storm rolls in"]
+    assert [i for i, _e in timeline.between(ids.id_time(second))][-2:] == [second, third]
+
+    npc = cm.add_npc({"name": "Mira"})
+    assert [i for i, _e in cm.timeline("npcs.json").latest(1)] == [npc]
+    quest = cm.add_quest({"title": "Find the map"})
+    assert cm.timeline("quests.json").latest(1)[0] == (quest, cm._load_quests()["active"][quest])
@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+import sys
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.world_memory as world_memory
+sys.modules.setdefault("world_memory", world_memory)
+import BlackFeather.arc_manager as arc_manager
+sys.modules.setdefault("arc_manager", arc_manager)
+import BlackFeather.ingest as ingest
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", str(tmp_path))
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    return Path(tmp_path) / "Module"
+
+
+def test_ingest_jsonl_validates_and_writes(tmp_path, monkeypatch):
+    campaign = _setup(tmp_path, monkeypatch)
+    source = tmp_path / "module.jsonl"
+    lines = [
+        {"kind": "npc", "name": "Ari"},
+        {"kind": "item", "name": "Lantern"},
+        {"kind": "memory", "type": "city", "name": "Haven", "tags": ["port"]},
+        {"kind": "memory", "type": "planet", "name": "Nope"},
+        {"kind": "npc"},
+    ]
+    source.write_text("\n".join(json.dumps(l) for l in lines) + "\n{broken\n")
+    report = ingest.ingest_file("Module", str(source))
+    assert report["counts"] == {"npc": 1, "item": 1, "memory": 1, "dm_memory": 0}
+    assert report["rejected"] == 3
+    assert any("Invalid type" in e for e in report["errors"])
+    memory = json.loads((campaign / "world_memory.json").read_text())
+    assert [e["name"] for e in memory.values()] == ["Haven"]
+    assert (campaign / "indexes" / "world_memory.search.json").exists()
+
+
+def test_ingest_csv_lists(tmp_path, monkeypatch):
+    campaign = _setup(tmp_path, monkeypatch)
+    source = tmp_path / "module.csv"
+    source.write_text("kind,type,name,tags\nmemory,faction,Harbor Guild,port; trade\nnpc,,Bram,\n")
+    report = ingest.ingest_file("Module", str(source))
+    assert report["ingested"] == 2
+    memory = json.loads((campaign / "world_memory.json").read_text())
+    assert next(iter(memory.values()))["tags"] == ["port", "trade"]
+    npcs = json.loads((campaign / "npcs.json").read_text())
+    assert [n["name"] for n in npcs.values()] == ["Bram"]
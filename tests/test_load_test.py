@@ -0,0 +1,33 @@
+import sys
+import pytest
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.world_memory as world_memory
+sys.modules.setdefault("world_memory", world_memory)
+from BlackFeather.load_test import STAGES, format_report, run_load_test
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    monkeypatch.setattr(campaign_manager, "PLAYERS_DIR", str(tmp_path / "players"))
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", str(tmp_path))
+
+
+def test_load_test_report(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    report = run_load_test(players=4, campaigns=2, turns=3, latency=0.001)
+    assert report["turns"] == 12
+    assert report["stages"]["response"]["count"] == 12
+    assert set(report["stages"]) == set(STAGES)
+    assert report["stages"]["update_world_state"]["count"] == 12
+    assert 0 <= report["lost_updates"]["world_state"] <= 12
+    assert report["lost_updates"]["events"] >= 0
+    assert "p95 ms" in format_report(report)
+    assert campaign_manager.list_campaigns() == []
+
+
+def test_load_test_refuses_existing_campaigns(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    (tmp_path / "loadtest_0").mkdir()
+    with pytest.raises(FileExistsError):
+        run_load_test(players=1, campaigns=1, turns=1)
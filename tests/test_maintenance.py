@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+import sys
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.world_memory as world_memory
+sys.modules.setdefault("world_memory", world_memory)
+import BlackFeather.maintenance as maintenance
+from BlackFeather.world_memory import WorldMemoryManager
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    return WorldMemoryManager("Index Test")
+
+
+def test_rebuild_search_index(tmp_path, monkeypatch):
+    wm = _setup(tmp_path, monkeypatch)
+    entry_id = wm.add_memory_entry({"type": "city", "name": "Haven", "description": "Port city"})
+    stats = maintenance.rebuild_search_index(wm.path, "world_memory.json")
+    assert stats["documents"] == 1
+    assert maintenance.query_index(wm.path, "world_memory.json", "port haven") == [entry_id]
+    assert maintenance.query_index(wm.path, "world_memory.json", "castle") == []
+    assert maintenance.query_index(wm.path, "world_memory_dm.json", "port") is None
+
+
+def test_search_reads_only_indexed_candidates(tmp_path, monkeypatch):
+    wm = _setup(tmp_path, monkeypatch)
+    wm.add_memory_entry({"type": "city", "name": "Haven", "description": "Port city"})
+    guild = wm.add_memory_entry({"type": "faction", "name": "Harbor Guild"})
+    maintenance.rebuild_search_index(wm.path, "world_memory.json")
+    assert maintenance.search_candidates(wm.path, "world_memory.json", "bor gu") == [guild]
+
+    def no_load(self):
+        raise AssertionError("data file read")
+
+    with monkeypatch.context() as m:
+        m.setattr(WorldMemoryManager, "_load", no_load)
+        assert wm.search_memory("castle") == []
+
+    wm.add_memory_entry({"type": "faction", "name": "Castle Watch"})
+    # the index is stale now, so the file is scanned
+    assert maintenance.search_candidates(wm.path, "world_memory.json", "castle") is None
+    assert [e["name"] for e in wm.search_memory("castle")] == ["Castle Watch"]
+
+
+def test_campaign_search_uses_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    import BlackFeather.arc_manager as arc_manager
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    cm = campaign_manager.CampaignManager("Search")
+    cm.add_npc({"name": "Mira", "role": "blacksmith"})
+    cm.add_npc({"name": "Oren", "role": "guard"})
+    maintenance.rebuild_search_index(cm.path, "npcs.json")
+
+    def no_scan(self, filename):
+        raise AssertionError("file scanned")
+
+    monkeypatch.setattr(campaign_manager.CampaignManager, "_iter_entities", no_scan)
+    assert [n["name"] for n in cm.search_npcs("smith")] == ["Mira"]
+    assert cm.search_npcs("wizard") == []
+
+
+def test_compact_runs_after_source_removed(tmp_path, monkeypatch):
+    wm = _setup(tmp_path, monkeypatch)
+    wm.add_memory_entry({"type": "city", "name": "Haven"})
+    campaign = Path(wm.path)
+    (campaign / "npcs.json").write_text(json.dumps({"n1": {"name": "Mira"}}))
+    maintenance.rebuild_search_index(wm.path, "npcs.json")
+    (campaign / "npcs.json").unlink()
+    service = maintenance.MaintenanceService(max_workers=1).start()
+    try:
+        service.notify(wm.path, "npcs.json")
+        assert service.wait_idle(timeout=30)
+    finally:
+        service.stop()
+    assert not (campaign / "indexes" / "npcs.search.json").exists()
+    assert (campaign / "indexes" / "world_memory.browse.json").exists()
+
+
+def test_service_rebuilds_on_change(tmp_path, monkeypatch):
+    wm = _setup(tmp_path, monkeypatch)
+    service = maintenance.MaintenanceService(max_workers=1).start()
+    try:
+        wm.add_memory_entry({"type": "faction", "name": "Harbor Guild"})
+        assert service.wait_idle(timeout=30)
+    finally:
+        service.stop()
+    progress = service.progress()
+    assert progress["failed"] == 0
+    summary = json.loads((Path(wm.path) / "indexes" / "world_memory.summary.json").read_text())
+    assert summary["types"] == {"faction": 1}
+
+
+def test_submit_reports_backpressure(tmp_path):
+    service = maintenance.MaintenanceService(max_workers=1, max_pending=1)
+    assert service.submit("index", str(tmp_path), "npcs.json")
+    # identical jobs are coalesced rather than rejected
+    assert service.submit("index", str(tmp_path), "npcs.json")
+    assert not service.submit("index", str(tmp_path), "items.json")
+    progress = service.progress()
+    assert progress["saturated"] and progress["dropped"] == 1 and progress["dirty"] == 1
+
+
+def test_dropped_jobs_run_once_there_is_room(tmp_path):
+    service = maintenance.MaintenanceService(max_workers=1, max_pending=1)
+    service.submit("summary", str(tmp_path), "npcs.json")
+    assert not service.submit("summary", str(tmp_path), "items.json")
+    service.start()
+    try:
+        assert service.wait_idle(timeout=30)
+    finally:
+        service.stop()
+    progress = service.progress()
+    assert progress["completed"] == 2 and progress["dirty"] == 0
+
+
+def test_journals_are_indexed_where_they_live(tmp_path, monkeypatch):
+    import BlackFeather.journal_manager as journal_manager
+    sys.modules.setdefault("journal_manager", journal_manager)
+    import BlackFeather.arc_manager as arc_manager
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(journal_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    cm = campaign_manager.CampaignManager("Summer Campaign")
+    seen = []
+
+    def listener(path, filename):
+        seen.append((path, filename))
+
+    campaign_manager.add_change_listener(listener)
+    try:
+        journal = journal_manager.JournalManager("Summer Campaign", "Lia")
+        journal.record_mentions({"npcs": ["Mira"]})
+        journal_manager.JournalManager("Winter", "Bram")
+    finally:
+        campaign_manager.remove_change_listener(listener)
+    filename = "players/lia_journal.json"
+    assert (cm.path, filename) in seen
+    assert (str(tmp_path / "winter"), "players/bram_journal.json") in seen
+
+    assert maintenance.rebuild_search_index(cm.path, filename)["documents"] > 0
+    assert (tmp_path / "summer_campaign" / "indexes" / "players__lia_journal.search.json").exists()
+    assert maintenance.query_index(cm.path, filename, "mira") == ["npcs:0"]
@@ -0,0 +1,115 @@
+import json
+import os
+from pathlib import Path
+import sys
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.arc_manager as arc_manager
+sys.modules.setdefault("arc_manager", arc_manager)
+import BlackFeather.migrations as migrations
+
+
+def _old_campaign(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    path = Path(tmp_path) / "Old"
+    (path / "players").mkdir(parents=True)
+    (path / "version.json").write_text(json.dumps({"version": 1}))
+    (path / "quests.json").write_text(json.dumps({"active": {"q1": {"title": "Keep"}}}))
+    (path / "players" / "lia.json").write_text(json.dumps({"gold": 3}))
+    (path / "players" / "lia_journal.json").write_text(json.dumps({"gold": 1}))
+    return path
+
+
+def test_dry_run_reports_without_writing(tmp_path, monkeypatch):
+    path = _old_campaign(tmp_path, monkeypatch)
+    result = migrations.migrate_campaign(str(path), dry_run=True)
+    assert result["steps"][0]["changed"] == [str(Path("players") / "lia.json"), "quests.json"]
+    assert migrations.read_version(str(path)) == 1
+    assert json.loads((path / "players" / "lia.json").read_text()) == {"gold": 3}
+
+
+def test_migrate_all_upgrades_and_resumes(tmp_path, monkeypatch):
+    path = _old_campaign(tmp_path, monkeypatch)
+    results = migrations.migrate_all(workers=1)
+    assert [r["to"] for r in results] == [campaign_manager.VERSION]
+    state = json.loads((path / "players" / "lia.json").read_text())
+    assert state["gold"] == 3 and state["platinum"] == 0 and state["inventory"] == []
+    assert json.loads((path / "players" / "lia_journal.json").read_text()) == {"gold": 1}
+    quests = json.loads((path / "quests.json").read_text())
+    id_map = json.loads((path / migrations.ID_MAP_FILE).read_text())
+    assert quests["active"] == {id_map["q1"]: {"title": "Keep"}} and quests["missed"] == {}
+    # already current campaigns are skipped on a second run
+    assert migrations.migrate_all(workers=1) == []
+
+
+def test_migrate_all_skips_journal_directories(tmp_path, monkeypatch):
+    _old_campaign(tmp_path, monkeypatch)
+    players = tmp_path / "old" / "players"
+    players.mkdir(parents=True)
+    (players / "Lia_journal.json").write_text("[]")
+    results = migrations.migrate_all(workers=1)
+    assert [r["campaign"] for r in results] == ["Old"]
+    assert sorted(os.listdir(players.parent)) == ["players"]
+
+
+def test_campaign_manager_upgrades_on_open(tmp_path, monkeypatch):
+    path = _old_campaign(tmp_path, monkeypatch)
+    cm = campaign_manager.CampaignManager("Old")
+    assert migrations.read_version(str(path)) == campaign_manager.VERSION
+    assert "completed" in cm._load_quests()
+
+
+def test_time_ordered_ids_remap_references(tmp_path, monkeypatch):
+    path = _old_campaign(tmp_path, monkeypatch)
+    (path / "version.json").write_text(json.dumps({"version": 2}))
+    (path / "quests.json").write_text(json.dumps({
+        "active": {"q2": {"title": "Next", "requires": {"quests": {"q1": "completed"}}}},
+        "completed": {"q1": {"title": "First", "timestamp": "2024-05-01T10:00:00+00:00"}},
+        "missed": {},
+    }))
+    (path / "players" / "lia.json").write_text(json.dumps({"gold": 3, "quests": [{"id": "q1", "status": "completed"}]}))
+    (path / "events_log.json").write_text(json.dumps({
+        "b": {"description": "later", "timestamp": "2024-05-02T10:00:00+00:00"},
+        "a": {"description": "earlier", "timestamp": "2024-05-01T10:00:00+00:00"},
+    }))
+    cm = campaign_manager.CampaignManager("Old")
+    id_map = json.loads((path / migrations.ID_MAP_FILE).read_text())
+    quests = cm._load_quests()
+    assert set(quests["completed"]) == {id_map["q1"]}
+    assert quests["active"][id_map["q2"]]["requires"] == {"quests": {id_map["q1"]: "completed"}}
+    assert json.loads((path / "players" / "lia.json").read_text())["quests"][0]["id"] == id_map["q1"]
+    events = cm._load_json("events_log.json")
+    assert [e["description"] for e in events.values()] == ["earlier", "later"]
+    latest = cm.timeline("events_log.json").latest(1)
+    assert latest[0][1]["description"] == "later"
+
+
+def test_interrupted_id_migration_resumes_with_same_map(tmp_path, monkeypatch):
+    path = _old_campaign(tmp_path, monkeypatch)
+    (path / "version.json").write_text(json.dumps({"version": 2}))
+    (path / "quests.json").write_text(json.dumps({"active": {}, "completed": {"q1": {"title": "First"}}, "missed": {}}))
+    (path / "players" / "lia.json").write_text(json.dumps({"quests": [{"id": "q1", "status": "completed"}]}))
+    (path / "npcs.json").write_text(json.dumps({"n1": {"name": "Ari"}}))
+
+    real_save = migrations._save
+
+    def crash_on_npcs(target, data):
+        if target.endswith("npcs.json"):
+            raise OSError("interrupted")
+        real_save(target, data)
+
+    monkeypatch.setattr(migrations, "_save", crash_on_npcs)
+    try:
+        migrations.migrate_campaign(str(path))
+    except OSError:
+        pass
+    first_map = json.loads((path / migrations.ID_MAP_FILE).read_text())
+    monkeypatch.setattr(migrations, "_save", real_save)
+
+    migrations.migrate_campaign(str(path))
+    id_map = json.loads((path / migrations.ID_MAP_FILE).read_text())
+    assert id_map == first_map and set(id_map) == {"q1", "n1"}
+    assert set(json.loads((path / "quests.json").read_text())["completed"]) == {id_map["q1"]}
+    assert json.loads((path / "players" / "lia.json").read_text())["quests"][0]["id"] == id_map["q1"]
+    assert set(json.loads((path / "npcs.json").read_text())) == {id_map["n1"]}
@@ -0,0 +1,84 @@
+import time
+import pytest
+from BlackFeather.config import Config
+from BlackFeather import model_router as mr
+
+
+def _config():
+    cfg = Config(chat_model="big-model", latency_budget=1.0)
+    cfg.model_routes = {
+        "fast": {"model": "small-model", "timeout": 0.5},
+        "capable": {"model": "", "timeout": 0.2},
+    }
+    return cfg
+
+
+def test_classify_turn():
+    assert mr.classify_turn("ok") == ("acknowledge", "fast")
+    assert mr.classify_turn("What is in my inventory?") == ("inventory", "fast")
+    assert mr.classify_turn("I sneak into the castle and search the vault for the crown") == ("narrative", "capable")
+    assert mr.classify_turn("ok", prompt_chars=mr.FAST_MAX_PROMPT_CHARS + 1)[1] == "capable"
+
+
+def test_router_falls_back_when_budget_exceeded():
+    calls = []
+
+    def call(model, messages, timeout, **params):
+        calls.append(model)
+        if model == "big-model":
+            time.sleep(0.5)
+        return f"reply from {model}"
+
+    router = mr.ModelRouter(_config(), call)
+    messages = [{"role": "user", "content": "x"}]
+    assert router.decide("Tell me the history of the kingdom in detail please, narrator").model == "big-model"
+    reply = router.complete(messages, "Tell me the history of the kingdom in detail please, narrator")
+    assert reply == "reply from small-model"
+    assert calls == ["big-model", "small-model"]
+    stats = router.stats()
+    assert stats["capable"]["timeout"] == 1
+    assert stats["fast"]["ok"] == 1
+
+
+def test_fallback_only_gets_the_rest_of_the_budget():
+    cfg = _config()
+    cfg.model_routes = {"fast": {"model": "small-model", "timeout": 5.0}, "capable": {"model": "", "timeout": 0.9}}
+    timeouts = []
+
+    def call(model, messages, timeout, **params):
+        timeouts.append(timeout)
+        if model == "big-model":
+            time.sleep(0.7)
+            raise RuntimeError("upstream error")
+        time.sleep(2)
+        return "too late"
+
+    router = mr.ModelRouter(cfg, call)
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        router.complete([{"role": "user", "content": "x"}], "Tell me the history of the kingdom in detail please")
+    assert time.perf_counter() - start < cfg.latency_budget + 0.2
+    assert timeouts[0] == 0.9 and 0 < timeouts[1] <= 0.3 + 0.05
+    assert router.stats()["fast"]["timeout"] == 1
+
+
+def test_every_attempt_takes_a_slot():
+    from BlackFeather.rate_limiter import RateLimiter
+
+    def call(model, messages, timeout, **params):
+        if model == "big-model":
+            raise RuntimeError("upstream error")
+        return "ok"
+
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+    router = mr.ModelRouter(_config(), call)
+    reply = router.complete(
+        [{"role": "user", "content": "x"}],
+        "Tell me the history of the kingdom in detail please",
+        slot=lambda: limiter.slot("c", "p", tokens=100),
+    )
+    assert reply == "ok"
+    # both the failed attempt and the fallback were charged
+    assert limiter.requests.level == pytest.approx(8, abs=0.1)
+    assert limiter.tokens.level == pytest.approx(800, abs=1)
+    assert limiter.stats()["active"] == 0
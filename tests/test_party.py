@@ -0,0 +1,110 @@
+import glob
+import json
+import os
+import sys
+import time
+import pytest
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.arc_manager as arc_manager
+from BlackFeather import party
+from BlackFeather.campaign_manager import CampaignManager, load_player_state
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    cm = CampaignManager("Party")
+    for name in ("Lia", "Bram", "Cole"):
+        cm.initialize_player_state(name)
+    return cm
+
+
+def test_party_update_applies_to_everyone(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    quest_id = cm.add_quest({"title": "Clear the crypt"})
+    update = party.PartyUpdate(
+        currency={"gold": 25}, experience=100, add_items=["Potion"], complete_quests=[quest_id]
+    )
+    party.apply_party_update(cm, ["Lia", "Bram", "Cole"], update)
+
+    for name in ("Lia", "Bram", "Cole"):
+        state = load_player_state(cm, name)
+        assert state["gold"] == 25 and "experience" not in state
+        assert party.read_experience(cm, name) == 100
+        assert state["inventory"] == ["Potion"]
+        assert state["quests"][0]["id"] == quest_id
+    assert quest_id in cm._load_quests()["completed"]
+    assert cm.list_players() == ["bram", "cole", "lia"]
+    assert not glob.glob(os.path.join(cm.path, "party_commit*.json"))
+
+
+def test_party_xp_lands_in_existing_journal(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    import BlackFeather.journal_manager as journal_manager
+    monkeypatch.setattr(journal_manager, "CAMPAIGNS_DIR", tmp_path)
+    journal = journal_manager.JournalManager("Party", "Lia")
+    journal.add_experience(40)
+    party.apply_party_update(cm, ["Lia"], party.PartyUpdate(experience=60))
+    assert journal_manager.JournalManager("Party", "Lia")._load()["experience"] == 100
+
+
+def test_party_update_is_all_or_nothing(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    cm.update_player_state("Lia", {"gold": 10})
+    with pytest.raises(ValueError):
+        party.apply_party_update(cm, ["Lia", "Bram"], party.PartyUpdate(currency={"gold": -5}))
+    assert load_player_state(cm, "Lia")["gold"] == 10
+    assert load_player_state(cm, "Bram")["gold"] == 0
+
+
+def test_recover_rolls_forward_committed_update(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    path = cm._player_state_file("Lia")
+    tmp = party._write_tmp(path, {**load_player_state(cm, "Lia"), "gold": 7})
+    with open(os.path.join(cm.path, party.COMMIT_JOURNAL.format(token="t1")), "w") as f:
+        json.dump([[tmp, path]], f)
+    in_flight = party._write_tmp(cm._player_state_file("Bram"), {"gold": 99}, "t2")
+    stale = party._write_tmp(cm._player_state_file("Cole"), {"gold": 99}, "t3")
+    old = time.time() - party.STALE_TMP_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    assert party.recover(cm)
+    assert load_player_state(cm, "Lia")["gold"] == 7
+    assert os.path.exists(in_flight)
+    assert not os.path.exists(stale)
+    assert load_player_state(cm, "Bram")["gold"] == 0
+    assert not glob.glob(os.path.join(cm.path, "party_commit*.json"))
+
+
+def test_commit_fails_on_missing_temporary(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    path = cm._player_state_file("Lia")
+    with pytest.raises(FileNotFoundError):
+        party._commit(cm, [[path + ".gone.party.tmp", path]], "t1")
+
+
+def test_opening_the_campaign_finishes_a_crashed_update(tmp_path, monkeypatch):
+    cm = _setup(tmp_path, monkeypatch)
+    quest_id = cm.add_quest({"title": "Clear the crypt"})
+    head = cm.history("quests.json").head()
+    real_replace = os.replace
+
+    def crash_on_rename(src, dst):
+        if str(src).endswith(".party.tmp"):
+            raise OSError("power cut")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(party.os, "replace", crash_on_rename)
+    with pytest.raises(OSError):
+        party.apply_party_update(cm, ["Lia", "Bram"], party.PartyUpdate(currency={"gold": 5}, complete_quests=[quest_id]))
+    monkeypatch.setattr(party.os, "replace", real_replace)
+    assert load_player_state(cm, "Lia")["gold"] == 0
+
+    reopened = CampaignManager("Party")
+    assert [load_player_state(reopened, p)["gold"] for p in ("Lia", "Bram")] == [5, 5]
+    assert quest_id in reopened._load_quests()["completed"]
+    assert reopened.history("quests.json").head() == head + 1
+    CampaignManager("Party")
+    assert reopened.history("quests.json").head() == head + 1
+    assert not glob.glob(os.path.join(cm.path, "party_commit*.json"))
@@ -18,3 +18,48 @@ def test_build_prompt_sections():
     assert "### Player Info" in prompt
     assert "### Campaign" in prompt
     assert "Player: What now?" in prompt
+
+
+def test_summarize_campaign_uses_latest_event():
+    events = {"1": {"description": "Rain"}, "2": {"description": "Storm"}}
+    assert "Recent event: Storm." in pb.summarize_campaign({"events": events})
+    data = {"events": events, "latest_event": {"description": "Fog"}}
+    assert "Recent event: Fog." in pb.summarize_campaign(data)
+
+
+def test_build_prompt_uses_digests_within_budget():
+    digests = {"city": "City (2): Haven; Blackmoor.", "monster": "Monster (1): " + "x" * 200}
+    prompt = pb.build_prompt(
+        "Lia",
+        {"name": "Lia"},
+        {},
+        [{"name": "Haven"}],
+        [],
+        "Hi",
+        world_digests=digests,
+        digest_budget=60,
+    )
+    assert "City (2): Haven; Blackmoor." in prompt
+    assert "Notable entries include" not in prompt
+    world = prompt.split("### World Memory\n")[1].split("\n\n###")[0]
+    assert len(world) <= 60
+
+
+def test_build_messages_keeps_stable_prefix():
+    character = {"name": "Lia", "race": "elf", "character_class": "wizard", "level": 3}
+    digests = {"faction": "Faction (1): Dock Union.", "city": "City (1): Haven."}
+    first = pb.build_messages(
+        "Lia", {**character, "gold": 5}, {"events": {"1": {"description": "Rain"}}}, [],
+        ["Player: Hello", "Narrator: Welcome."], "Look around", world_digests=digests,
+    )
+    second = pb.build_messages(
+        "Lia", {**character, "gold": 9}, {"events": {"2": {"description": "Storm"}}}, [],
+        ["Player: Hello", "Narrator: Welcome.", "Player: Look around", "Narrator: A tavern."],
+        "Order ale", world_digests=dict(reversed(list(digests.items()))),
+    )
+    assert first.messages[0] == second.messages[0]
+    assert first.prefix_hash == second.prefix_hash and first.prefix_tokens > 0
+    assert first.messages[0]["content"].index("City") < first.messages[0]["content"].index("Faction")
+    assert [m["role"] for m in second.messages] == ["system", "user", "assistant", "user", "assistant", "user"]
+    assert "9 gold" in second.messages[-1]["content"]
+    assert second.messages[-1]["content"].endswith("Player: Order ale")
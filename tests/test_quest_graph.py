@@ -0,0 +1,91 @@
+import json
+import sys
+import pytest
+import BlackFeather.campaign_manager as campaign_manager
+import BlackFeather.arc_manager as arc_manager
+
+sys.modules.setdefault("campaign_manager", campaign_manager)
+sys.modules.setdefault("arc_manager", arc_manager)
+from BlackFeather import quest_graph
+from BlackFeather.party import PartyUpdate, apply_party_update
+
+
+def _setup_campaign(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(campaign_manager, "PLAYERS_DIR", tmp_path / "players")
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    return campaign_manager.CampaignManager("Quests")
+
+
+def test_quests_unlock_when_prerequisites_complete(tmp_path, monkeypatch):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    rescue = cm.add_quest({"title": "Rescue the smith"})
+    forge = cm.add_quest({"title": "Relight the forge", "requires": {"quests": {rescue: "completed"}}})
+    siege = cm.add_quest(
+        {"title": "Break the siege", "requires": {"quests": {forge: "active"}, "world": {"bridge_open": True}}}
+    )
+    quests = cm._load_quests()
+    assert set(quests["active"]) == {rescue} and set(quests["locked"]) == {forge, siege}
+
+    assert cm.complete_quest(rescue)
+    quests = cm._load_quests()
+    assert set(quests["active"]) == {forge} and set(quests["locked"]) == {siege}
+
+    cm.update_world_state({"weather": "rain"})
+    assert siege in cm._load_quests()["locked"]
+    cm.update_world_state({"bridge_open": True})
+    assert siege in cm._load_quests()["active"]
+    ops = [(c["id"], c["op"]) for c in cm.changes_since(0) if c["file"] == "quests.json"]
+    assert ops[-3:] == [(rescue, "complete"), (forge, "unlock"), (siege, "unlock")]
+
+
+def test_unlock_only_evaluates_dependents(tmp_path, monkeypatch):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    first = cm.add_quest({"title": "First"})
+    cm.add_quest({"title": "Other", "requires": {"world": {"moon": "full"}}})
+    cm.add_quest({"title": "Second", "requires": {"quests": {first: "completed"}}})
+    checked = []
+    original = quest_graph.requirements_met
+    monkeypatch.setattr(
+        quest_graph, "requirements_met", lambda req, *a: checked.append(req) or original(req, *a)
+    )
+    cm.complete_quest(first)
+    assert checked == [{"quests": {first: "completed"}}]
+
+
+def test_cycles_and_unknown_prerequisites_rejected(tmp_path, monkeypatch):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    a = cm.add_quest({"title": "A"})
+    b = cm.add_quest({"title": "B", "requires": {"quests": {a: "completed"}}})
+    c = cm.add_quest({"title": "C", "requires": {"quests": {b: "completed"}}})
+    with pytest.raises(ValueError):
+        cm.set_quest_requirements(a, {"quests": {c: "completed"}})
+    with pytest.raises(ValueError):
+        cm.add_quest({"title": "D", "requires": {"quests": {"nope": "completed"}}})
+    with pytest.raises(ValueError):
+        cm.add_quest({"title": "E", "requires": {"quests": {a: "finished"}}})
+
+    # dropping the prerequisite unlocks the quest right away
+    assert cm.set_quest_requirements(b, None)
+    assert b in cm._load_quests()["active"]
+    assert cm.set_quest_requirements(b, {"world": {"gate": "open"}})
+    assert b in cm._load_quests()["locked"]
+
+
+def test_graph_index_rebuilds_after_external_write(tmp_path, monkeypatch):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    a = cm.add_quest({"title": "A"})
+    path = tmp_path / "Quests" / "quests.json"
+    quests = json.loads(path.read_text())
+    quests.setdefault("locked", {})["x"] = {"title": "X", "requires": {"quests": {a: "completed"}}}
+    path.write_text(json.dumps(quests))
+    cm.complete_quest(a)
+    assert "x" in cm._load_quests()["active"]
+
+
+def test_party_completion_unlocks(tmp_path, monkeypatch):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    a = cm.add_quest({"title": "A"})
+    b = cm.add_quest({"title": "B", "requires": {"quests": {a: "completed"}}})
+    apply_party_update(cm, ["Ann", "Bo"], PartyUpdate(complete_quests=[a]))
+    assert b in cm._load_quests()["active"]
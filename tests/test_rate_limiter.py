@@ -0,0 +1,95 @@
+import threading
+import time
+import pytest
+from BlackFeather.rate_limiter import RateLimiter, TokenBucket
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(rate=10, capacity=5)
+    now = bucket.updated
+    assert bucket.wait_time(5, now) == 0
+    bucket.take(5)
+    assert bucket.wait_time(1, now) == pytest.approx(0.1)
+
+
+def test_round_robin_and_dm_priority():
+    limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=10**9, max_concurrent=1)
+    blocker = limiter.acquire("c", "busy")
+    order = []
+
+    def worker(player, dm=False):
+        with limiter.slot("c", player, dm=dm):
+            order.append(player)
+
+    threads = []
+    for player in ("busy", "busy", "busy", "quiet", "dm"):
+        t = threading.Thread(target=worker, args=(player, player == "dm"))
+        t.start()
+        threads.append(t)
+        time.sleep(0.02)
+    assert limiter.stats()["queued"] == 5
+    limiter.release(blocker)
+    for t in threads:
+        t.join(2)
+    assert order[0] == "dm"
+    # the quiet table is served before the busy one drains its queue
+    assert order.index("quiet") < 3
+
+
+def test_campaigns_share_turns_before_players():
+    limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=10**9, max_concurrent=1)
+    blocker = limiter.acquire("solo", "x")
+    order = []
+
+    def worker(campaign, player):
+        with limiter.slot(campaign, player):
+            order.append((campaign, player))
+
+    threads = []
+    for key in [("big", "a"), ("big", "b"), ("big", "c"), ("solo", "x"), ("solo", "x")]:
+        t = threading.Thread(target=worker, args=key)
+        t.start()
+        threads.append(t)
+        time.sleep(0.02)
+    assert limiter.stats()["tables_waiting"] == 2
+    assert limiter.stats()["players_waiting"] == 4
+    limiter.release(blocker)
+    for t in threads:
+        t.join(2)
+    # campaigns alternate even though "big" has three waiting players
+    assert [c for c, _ in order] == ["big", "solo", "big", "solo", "big"]
+    assert [p for c, p in order if c == "big"] == ["a", "b", "c"]
+
+
+def test_acquire_timeout():
+    limiter = RateLimiter(max_concurrent=1)
+    held = limiter.acquire("c", "a")
+    with pytest.raises(TimeoutError):
+        limiter.acquire("c", "b", timeout=0.05)
+    limiter.release(held)
+    assert limiter.stats()["queued"] == 0
+
+
+def test_timed_out_ticket_keeps_its_campaign_turn():
+    limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=10**9, max_concurrent=1)
+    blocker = limiter.acquire("x", "x")
+    order = []
+
+    def worker(campaign, player, timeout=None):
+        try:
+            with limiter.slot(campaign, player, timeout=timeout):
+                order.append((campaign, player))
+        except TimeoutError:
+            pass
+
+    threads = []
+    for args in [("a", "a1", 0.1), ("a", "a2"), ("b", "b1")]:
+        t = threading.Thread(target=worker, args=args)
+        t.start()
+        threads.append(t)
+        time.sleep(0.02)
+    threads[0].join(2)
+    limiter.release(blocker)
+    for t in threads:
+        t.join(2)
+    assert order == [("a", "a2"), ("b", "b1")]
@@ -0,0 +1,70 @@
+import pytest
+from BlackFeather import records
+from BlackFeather.ids import new_id
+
+ENTRY_ID = "0b8f4e0e-5a7c-4c3e-9a51-2f0d7b3c1e42"
+ENTRY = {
+    "id": ENTRY_ID,
+    "type": "city",
+    "name": "Haven",
+    "description": "Port city",
+    "tags": ["port", "trade"],
+    "related_to": [],
+    "timestamp": "2024-05-01T12:30:00.250000+00:00",
+}
+
+
+def test_record_roundtrip_is_lossless():
+    odd = {**ENTRY, "id": "custom-id", "timestamp": "yesterday", "possible_duplicates": ["x"]}
+    for data in (ENTRY, odd, {"name": "Bare"}):
+        record = records.WorldEntry.from_dict(data)
+        assert record.to_dict() == data
+    record = records.WorldEntry.from_dict(ENTRY)
+    assert isinstance(record.timestamp, int) and isinstance(record.id, int)
+    assert record.tags is records.WorldEntry.from_dict(dict(ENTRY)).tags
+    assert records.EventRecord.from_dict({"description": "Rain", "timestamp": "2024-05-01T00:00:00+00:00"}).get("timestamp") == "2024-05-01T00:00:00+00:00"
+
+
+def test_record_table_lookup_and_roundtrip():
+    data = {ENTRY_ID: ENTRY, "legacy": {"id": "legacy", "type": "plot", "name": "Old"}}
+    table = records.RecordTable.from_mapping(data, records.WorldEntry)
+    assert table.to_mapping() == data
+    assert table.get(ENTRY_ID) == ENTRY and table.get("legacy")["name"] == "Old"
+    other = "ffffffff-0000-4000-8000-000000000000"
+    table.append(other, {"id": other, "type": "city", "name": "Blackmoor"})
+    assert table.get(other)["name"] == "Blackmoor" and table.get("missing") is None
+
+
+def test_time_ordered_ids_are_packed():
+    entry_id = new_id()
+    entry = {**ENTRY, "id": entry_id}
+    record = records.WorldEntry.from_dict(entry)
+    assert isinstance(record.id, int) and record.to_dict() == entry
+    assert records.dump_records(records.load_records({entry_id: entry}, records.WorldEntry)) == {entry_id: entry}
+
+    data = {ENTRY_ID: ENTRY, entry_id: entry}
+    table = records.RecordTable.from_mapping(data, records.WorldEntry)
+    assert not table.odd and table.to_mapping() == data
+    assert table.get(entry_id) == entry and table.get(ENTRY_ID) == ENTRY
+    later = new_id()
+    table.append(later, {"id": later, "name": "Later"})
+    assert table.key(2) == later and table.get(later)["name"] == "Later"
+
+
+def test_benchmark_shows_at_least_3x_saving():
+    result = records.benchmark_memory(2000)
+    assert result["table_ratio"] >= 3
+    assert result["record_ratio"] > 1.5
+
+
+def test_record_table_is_a_read_only_mapping():
+    data = {ENTRY_ID: ENTRY, "legacy": {"name": "Old"}}
+    table = records.compact_mapping(data, records.WorldEntry)
+    assert isinstance(table, records.RecordTable)
+    assert list(table) == [ENTRY_ID, "legacy"] and ENTRY_ID in table and "missing" not in table
+    assert table[ENTRY_ID] == ENTRY and list(table.values()) == list(data.values())
+    assert dict(table) == data and len(table) == 2
+    with pytest.raises(KeyError):
+        table["missing"]
+    assert records.compact_mapping({"a": "not an object"}, records.WorldEntry) == {"a": "not an object"}
+
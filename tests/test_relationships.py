@@ -0,0 +1,73 @@
+import json
+import sys
+import pytest
+import BlackFeather.campaign_manager as campaign_manager
+import BlackFeather.arc_manager as arc_manager
+
+sys.modules.setdefault("campaign_manager", campaign_manager)
+sys.modules.setdefault("arc_manager", arc_manager)
+from BlackFeather import relationships
+from BlackFeather.relationships import RelationshipMatrix, RelationshipStore
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(relationships, "np", None)
+    elif relationships.np is None:
+        pytest.skip("NumPy not installed")
+
+
+def _setup_campaign(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(campaign_manager, "PLAYERS_DIR", tmp_path / "players")
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    return campaign_manager.CampaignManager("Relations")
+
+
+def test_matrix_queries(backend):
+    matrix = RelationshipMatrix.from_npcs(
+        {
+            "ari": {"relationships": {"Damian": {"trust": 80, "notes": "x"}, "Lyra": {"trust": 40, "fear": 5}}},
+            "bran": {"relationships": {"Damian": {"trust": 75}, "Lyra": {"trust": 90}}},
+            "cole": {"relationships": {"Damian": {"trust": 20}}},
+            "dara": {},
+        }
+    )
+    assert len(matrix) == 5
+    assert matrix.get("ari", "Lyra") == {"trust": 40.0, "fear": 5.0}
+    assert matrix.above("trust", 70, characters=["Damian"]) == [("ari", "Damian", 80.0), ("bran", "Damian", 75.0)]
+    assert matrix.mean("trust", npcs=["ari"], characters=["Damian", "Lyra"]) == 60.0
+    assert matrix.mean("fear", npcs=["cole"]) is None
+    assert matrix.top_k("trust", 2) == [("bran", "Lyra", 90.0), ("ari", "Damian", 80.0)]
+    assert matrix.top_k("trust", 1, largest=False) == [("cole", "Damian", 20.0)]
+
+    matrix.load_npc("ari", {"Damian": {"trust": 10}})
+    assert len(matrix) == 4 and matrix.get("ari", "Lyra") == {}
+    matrix.set("dara", "Lyra", {"trust": 55})
+    assert len(matrix) == 5 and matrix.above("trust", 50, characters=["Lyra"])[-1] == ("dara", "Lyra", 55.0)
+
+    changed = matrix.adjust("trust", -30, npcs=["bran", "cole", "ari"], characters=["Damian"], low=0)
+    assert sorted(changed) == [("ari", "Damian", 0.0), ("bran", "Damian", 45.0), ("cole", "Damian", 0.0)]
+    assert matrix.get("bran", "Lyra") == {"trust": 90.0}
+
+
+def test_store_tracks_campaign_and_saves_adjustments(tmp_path, monkeypatch, backend):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    ari = cm.add_npc({"name": "Ari", "guild": "smiths", "relationships": {"Damian": {"trust": 80, "notes": "ally"}}})
+    bran = cm.add_npc({"name": "Bran", "guild": "smiths", "relationships": {"Damian": {"trust": 60}}})
+    store = RelationshipStore(cm)
+    assert [e[0] for e in store.above("trust", 70, characters=["Damian"])] == [ari]
+
+    cm.update_npc(bran, {"relationships": {"Damian": {"trust": 95}}})
+    assert [e[0] for e in store.above("trust", 70, characters=["Damian"])] == [bran, ari]
+
+    guild = store.find_npcs(["ari", "BRAN"])
+    assert sorted(guild) == sorted([ari, bran])
+    changed = store.adjust("trust", -10, npcs=guild, characters=["Damian"])
+    assert len(changed) == 2
+    npcs = json.loads((tmp_path / "Relations" / "npcs.json").read_text())
+    assert npcs[ari]["relationships"]["Damian"] == {"trust": 70, "notes": "ally"}
+    assert npcs[bran]["relationships"]["Damian"]["trust"] == 85
+    assert [c["op"] for c in cm.changes_since(0)][-2:] == ["relationship", "relationship"]
+    assert store.mean("trust", characters=["Damian"]) == 77.5
@@ -0,0 +1,41 @@
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.arc_manager as arc_manager
+sys.modules.setdefault("arc_manager", arc_manager)
+from BlackFeather.retention import RetentionPolicy, compact_events, load_archive_index
+
+
+def _setup_campaign(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    cm = campaign_manager.CampaignManager("Retention")
+    now = datetime.now(timezone.utc)
+    events = {
+        f"e{i}": {"description": f"event {i}", "timestamp": (now - timedelta(days=50 - i)).isoformat()}
+        for i in range(50)
+    }
+    cm._save_json("events_log.json", events)
+    return cm
+
+
+def test_compact_by_age_and_count(tmp_path, monkeypatch):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    moved = compact_events(cm, RetentionPolicy(max_age_days=30, max_events=10))
+    assert moved["events_log.json"] == 40
+    hot = cm._load_json("events_log.json")
+    assert sorted(hot) == sorted(f"e{i}" for i in range(40, 50))
+    index = load_archive_index(cm.path)
+    assert index[0]["count"] == 40 and index[0]["digest"].startswith("event 0")
+    assert (Path(cm.path) / "archive" / index[0]["file"]).exists()
+
+
+def test_search_events_reaches_archive(tmp_path, monkeypatch):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    compact_events(cm, RetentionPolicy(max_age_days=None, max_events=5, digest=False))
+    assert cm.search_events("event 7") == []
+    found = cm.search_events("event 7", include_archived=True)
+    assert [ev["description"] for ev in found] == ["event 7"]
@@ -0,0 +1,83 @@
+import json
+import sys
+import BlackFeather.campaign_manager as campaign_manager
+
+sys.modules.setdefault("campaign_manager", campaign_manager)
+from BlackFeather import session_store
+from BlackFeather.chat_store import ChatStore
+from BlackFeather.prompt_builder import HISTORY_LIMIT, build_messages
+from BlackFeather.session_store import SessionStore, condense
+
+
+def _turn(session, n):
+    prompt = build_messages("Lia", {"name": "Lia"}, {}, [], session.history(), f"go {n}", session_summary=session.summary)
+    session.record_turn(f"go {n}", f"You walk on. Step {n} is quiet.", prompt)
+    return prompt
+
+
+def test_condense_keeps_first_sentence():
+    assert condense("Narrator: The  door opens. A draft follows.") == "Narrator: The door opens."
+    assert condense("Player: " + "a" * 300, limit=20) == "Player: aaaaaaaaa..."
+
+
+def test_resume_restores_context_without_reading_transcript(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    session = SessionStore("Saga", "Lia", summary_chars=200)
+    for n in range(20):
+        last = _turn(session, n)
+    assert len(session) == 40
+    assert session.history() == session.chat.tail(HISTORY_LIMIT)
+    summary = session.summary.splitlines()
+    assert summary[-2:] == ["Narrator: You walk on.", "Player: go 12"] and len(session.summary) <= 200
+    assert session.meta["summarized"] == 40 - HISTORY_LIMIT
+    assert session.tokens["turns"] == 20
+    assert session.last_prompt["messages"] == last.messages
+
+    # reopening reads the metadata and the history tail only
+    expected = session.context()
+    pages = []
+    original = ChatStore.page
+    monkeypatch.setattr(ChatStore, "page", lambda self, a, b: pages.append((a, b)) or original(self, a, b))
+    resumed = SessionStore.resume("Saga", "Lia", summary_chars=200)
+    assert resumed.session_id == session.session_id
+    assert resumed.context() == expected
+    assert pages == [(40 - HISTORY_LIMIT, 40)]
+
+    # the next prompt carries the rolling summary
+    prompt = _turn(resumed, 20)
+    assert "### Earlier This Session" in prompt.messages[-1]["content"]
+    assert resumed.meta["summarized"] == 42 - HISTORY_LIMIT
+
+
+def test_metadata_catches_up_after_crash(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    session = SessionStore("Saga", "Lia")
+    for n in range(10):
+        _turn(session, n)
+    meta = json.loads(open(session.meta_path, encoding="utf-8").read())
+    # lines written after the last metadata save
+    session.chat.append("Player: lost turn")
+    session.chat.append("Narrator: Still here.")
+    with open(session.meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    resumed = SessionStore("Saga", "Lia", session.session_id)
+    assert resumed.meta["lines"] == 22 and resumed.meta["summarized"] == 22 - HISTORY_LIMIT
+    assert resumed.history()[-1] == "Narrator: Still here."
+
+    newer = SessionStore("Saga", "Lia")
+    assert session_store.latest_session("Saga", "Lia") == session.session_id
+    _turn(newer, 0)
+    assert session_store.list_sessions("Saga", "Lia") == [session.session_id, newer.session_id]
+    assert session_store.list_sessions("Saga", "Bo") == []
+
+
+def test_export_resumes_from_saved_position(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", str(tmp_path))
+    log = tmp_path / "logs" / "saga.jsonl"
+    session = SessionStore("Saga", "Lia")
+    _turn(session, 0)
+    assert session.export_new(str(log)) == 2
+    resumed = SessionStore.resume("Saga", "Lia")
+    _turn(resumed, 1)
+    assert resumed.export_new(str(log)) == 4
+    assert len(log.read_text(encoding="utf-8").splitlines()) == 4
@@ -0,0 +1,124 @@
+import json
+import os
+import sys
+import pytest
+import BlackFeather.campaign_manager as campaign_manager
+import BlackFeather.arc_manager as arc_manager
+import BlackFeather.world_memory as world_memory
+
+sys.modules.setdefault("campaign_manager", campaign_manager)
+sys.modules.setdefault("arc_manager", arc_manager)
+sys.modules.setdefault("world_memory", world_memory)
+from BlackFeather import sharding
+from BlackFeather.world_memory import WorldMemoryManager
+
+
+def _setup_campaign(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(campaign_manager, "PLAYERS_DIR", tmp_path / "players")
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    return campaign_manager.CampaignManager("Sharded")
+
+
+def _mtimes(directory):
+    return {n: os.stat(os.path.join(directory, n)).st_mtime_ns for n in os.listdir(directory)}
+
+
+def test_update_rewrites_only_one_shard(tmp_path):
+    data = {f"npc{i}": {"name": f"NPC {i}"} for i in range(200)}
+    store = sharding.ShardedStore.create(str(tmp_path / "npcs.shards"), data, shards=8)
+    assert len(store.manifest["shards"]) == 8
+    before = _mtimes(store.directory)
+    for path in os.listdir(store.directory):
+        os.utime(os.path.join(store.directory, path), ns=(0, 0))
+    store.put("npc7", {"name": "Renamed"})
+    touched = [n for n, t in _mtimes(store.directory).items() if t != 0]
+    assert sorted(touched) == sorted([sharding.MANIFEST, store.manifest["shards"][store._shard_for("npc7")]])
+    assert store.get("npc7") == {"name": "Renamed"}
+    assert store.load_all() == {**data, "npc7": {"name": "Renamed"}}
+    assert set(before) == set(_mtimes(store.directory))
+
+
+def test_large_shard_splits(tmp_path):
+    store = sharding.ShardedStore.create(str(tmp_path / "items.shards"), {}, shards=1, max_shard_bytes=2000)
+    assert list(store.manifest["shards"]) == [""]
+    for i in range(100):
+        store.put(f"item{i}", {"name": f"Item {i}", "description": "x" * 40})
+    assert len(store.manifest["shards"]) > 2
+    for name in store.manifest["shards"].values():
+        assert os.path.getsize(os.path.join(store.directory, name)) <= 2000
+    assert len(store.load_all()) == 100
+    store.delete("item3")
+    assert store.get("item3") is None and len(store.load_all()) == 99
+
+
+def test_items_reads_lazily(tmp_path, monkeypatch):
+    data = {f"k{i}": i for i in range(50)}
+    store = sharding.ShardedStore.create(str(tmp_path / "s.shards"), data, shards=4)
+    reads = []
+    original = store._read
+    monkeypatch.setattr(store, "_read", lambda suffix: reads.append(suffix) or original(suffix))
+    iterator = store.items()
+    next(iterator)
+    assert len(reads) == 1
+    assert len(list(iterator)) == 49
+    assert len(reads) == 4
+
+
+def test_campaign_manager_on_sharded_npcs(tmp_path, monkeypatch):
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    first = cm.add_npc({"name": "Mira", "role": "smith"})
+    sharding.shard_file(cm.path, "npcs.json", shards=4)
+    assert not os.path.exists(os.path.join(cm.path, "npcs.json"))
+
+    second = cm.add_npc({"name": "Tolan", "role": "guard"})
+    assert cm.update_npc(first, {"role": "master smith"})
+    assert [n["name"] for n in cm.search_npcs("smith")] == ["Mira"]
+    assert set(cm._load_json("npcs.json")) == {first, second}
+    assert cm.history("npcs.json").state_at(cm.history("npcs.json").head())[first]["role"] == "master smith"
+    assert [c["id"] for c in cm.changes_since(0)][-2:] == [second, first]
+
+    # reopening the campaign keeps the sharded layout
+    campaign_manager.CampaignManager("Sharded")
+    assert not os.path.exists(os.path.join(cm.path, "npcs.json"))
+
+    sharding.unshard_file(cm.path, "npcs.json")
+    with open(os.path.join(cm.path, "npcs.json"), encoding="utf-8") as f:
+        assert set(json.load(f)) == {first, second}
+    with pytest.raises(ValueError):
+        sharding.shard_file(cm.path, "quests.json")
+
+
+def test_sharded_history_checkpoints_hold_whole_file(tmp_path, monkeypatch):
+    from BlackFeather.versioning import CHECKPOINT_EVERY
+
+    cm = _setup_campaign(tmp_path, monkeypatch)
+    first = cm.add_npc({"name": "Mira", "level": 0})
+    second = cm.add_npc({"name": "Tolan"})
+    sharding.shard_file(cm.path, "npcs.json", shards=4)
+    for level in range(1, CHECKPOINT_EVERY + 5):
+        cm.update_npc(first, {"level": level})
+    history = cm.history("npcs.json")
+    assert set(history.state_at(history.head())) == {first, second}
+    assert history.state_at(history.head())[first]["level"] == CHECKPOINT_EVERY + 4
+
+    cm.rollback("npcs.json", history.head() - 3)
+    npcs = cm._load_json("npcs.json")
+    assert set(npcs) == {first, second} and npcs[first]["level"] == CHECKPOINT_EVERY + 1
+
+
+def test_world_memory_on_sharded_file(tmp_path, monkeypatch):
+    _setup_campaign(tmp_path, monkeypatch)
+    wm = WorldMemoryManager("Sharded")
+    haven = wm.add_memory_entry({"type": "city", "name": "Haven", "tags": ["port"]})
+    sharding.shard_file(wm.path, "world_memory.json", shards=4)
+
+    wm = WorldMemoryManager("Sharded")
+    guild = wm.add_memory_entry({"type": "faction", "name": "Dock Union", "tags": ["port"]})
+    wm.update_memory_entry(haven, {"description": "A busy harbor"})
+    assert wm.get_entry(haven)["description"] == "A busy harbor"
+    assert [e["id"] for e in wm.get_entries([guild, haven])] == [guild, haven]
+    assert set(wm.find_ids(tags=["port"])) == {haven, guild}
+    assert wm.storage_bytes() > 0
+    assert not os.path.exists(wm.file_path)
@@ -0,0 +1,58 @@
+import json
+import sys
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.arc_manager as arc_manager
+from BlackFeather import versioning
+from BlackFeather.campaign_manager import CampaignManager
+
+
+def test_diff_roundtrip():
+    old = {"weather": "rain", "city": {"mood": "calm", "guards": 4}, "gone": 1}
+    new = {"weather": "rain", "city": {"mood": "riot", "guards": 4}, "tags": ["x"]}
+    ops = versioning.diff(old, new)
+    assert ["set", ["city", "mood"], "riot"] in ops and len(ops) == 3
+    assert versioning.apply_diff(json.loads(json.dumps(old)), ops) == new
+
+
+def test_revisions_checkpoints_and_rollback(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    cm = CampaignManager("Versions")
+    for day in range(1, 46):
+        cm.update_world_state({"day": day})
+    history = cm.history("world_state.json")
+    assert history.head() == 45
+    assert cm.state_at("world_state.json", 0) == {}
+    assert cm.state_at("world_state.json", 30) == {"day": 30}
+    # one checkpoint per 20 revisions, diffs in between
+    assert sorted(p.name for p in history_dir(tmp_path).glob("checkpoint_*")) == [
+        "checkpoint_0.json", "checkpoint_20.json", "checkpoint_40.json",
+    ]
+    segment = (history_dir(tmp_path) / "segment_20.jsonl").read_text().splitlines()
+    assert len(segment) == 20 and json.loads(segment[0])["ops"] == [["set", ["day"], 21]]
+
+    cm.update_world_state({"day": 45})  # unchanged saves add no revision
+    assert history.head() == 45
+    assert cm.rollback("world_state.json", 12) == 46
+    assert cm._load_json("world_state.json") == {"day": 12}
+    assert cm.state_at("world_state.json", 45) == {"day": 45}
+
+
+def test_record_after_torn_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(arc_manager, "ArcManager", lambda *a, **k: None)
+    cm = CampaignManager("Versions")
+    cm.update_world_state({"day": 1})
+    with open(history_dir(tmp_path) / "segment_0.jsonl", "a") as f:
+        f.write('{"rev": 2, "ops": [["set"')  # interrupted append
+    cm.update_world_state({"day": 2})
+    history = cm.history("world_state.json")
+    assert history.head() == 2
+    assert cm.state_at("world_state.json", 2) == {"day": 2}
+    cm.update_world_state({"day": 3})
+    assert cm.state_at("world_state.json", 3) == {"day": 3}
+
+
+def history_dir(tmp_path):
+    return tmp_path / "Versions" / "history" / "world_state"
@@ -0,0 +1,79 @@
+import sys
+import time
+import types
+import BlackFeather.campaign_manager as campaign_manager
+sys.modules.setdefault("campaign_manager", campaign_manager)
+import BlackFeather.world_memory as world_memory
+sys.modules.setdefault("world_memory", world_memory)
+from BlackFeather import web_lookup
+from BlackFeather.world_memory import WorldMemoryManager
+
+LORE = {
+    "owlbear": [{"title": "Owlbear", "body": "A bear with an owl's head.", "href": "https://example.org/owlbear"}],
+    "lich": [{"title": "Lich", "body": "An undead spellcaster.", "href": "https://example.org/lich"}],
+}
+
+
+def test_cache_persists_and_expires(tmp_path):
+    cache = tmp_path / "cache.json"
+    backend = web_lookup.StubBackend(LORE)
+    lookup = web_lookup.WebLookup(backend, str(cache), ttl=60)
+    assert lookup.search("Owlbear ") == [] and lookup.search("owlbear")[0]["title"] == "Owlbear"
+    lookup.search("OWLBEAR")
+
+    again = web_lookup.WebLookup(backend, str(cache), ttl=60)
+    assert again.search("owlbear")[0]["title"] == "Owlbear"
+    assert backend.calls == ["Owlbear ", "owlbear"]
+
+    expired = web_lookup.WebLookup(backend, str(cache), ttl=0)
+    expired.search("owlbear")
+    assert backend.calls[-1] == "owlbear" and len(backend.calls) == 3
+
+
+def test_fan_out_respects_deadline(tmp_path):
+    backend = web_lookup.StubBackend(LORE, delay=0.3)
+    lookup = web_lookup.WebLookup(backend, str(tmp_path / "cache.json"), deadline=0.05, max_workers=2)
+    start = time.perf_counter()
+    assert lookup.search_many(["owlbear", "lich"]) == {"owlbear": [], "lich": []}
+    assert time.perf_counter() - start < 0.25
+
+    lookup = web_lookup.WebLookup(backend, str(tmp_path / "cache.json"), deadline=2.0, max_workers=2)
+    start = time.perf_counter()
+    results = lookup.search_many(["owlbear", "lich"])
+    assert time.perf_counter() - start < 0.55  # both queries ran in parallel
+    assert results["lich"][0]["title"] == "Lich"
+
+
+def test_save_result_to_world_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    wm = WorldMemoryManager("Lore")
+    lookup = web_lookup.WebLookup(web_lookup.StubBackend(LORE), str(tmp_path / "cache.json"))
+    entry_id = lookup.save_to_memory(wm, lookup.search("lich")[0], "monster", ["lore"])
+    entry = wm.get_entry(entry_id)
+    assert entry["name"] == "Lich" and entry["type"] == "monster"
+    assert "https://example.org/lich" in entry["description"]
+
+
+def test_search_web_joins_top_results(tmp_path, monkeypatch):
+    many = {"dragons": [{"title": f"Dragon {i}", "body": f"Fact {i}.", "href": ""} for i in range(5)]}
+    lookup = web_lookup.WebLookup(web_lookup.StubBackend(many), str(tmp_path / "cache.json"))
+    monkeypatch.setattr(web_lookup, "get_lookup", lambda: lookup)
+    assert campaign_manager.search_web("dragons") == "Dragon 0: Fact 0.\nDragon 1: Fact 1.\nDragon 2: Fact 2."
+    assert campaign_manager.search_web("unknown").startswith("Web search is unavailable")
+
+
+def test_ddgs_clients_get_the_deadline_as_timeout(tmp_path, monkeypatch):
+    made = []
+
+    class FakeDDGS:
+        def __init__(self, timeout=10):
+            made.append(timeout)
+
+        def text(self, query, max_results):
+            return [{"title": "T", "body": "B", "href": "h"}]
+
+    monkeypatch.setitem(sys.modules, "duckduckgo_search", types.SimpleNamespace(DDGS=FakeDDGS))
+    lookup = web_lookup.WebLookup(cache_path=str(tmp_path / "cache.json"), deadline=2.5)
+    assert lookup.search("anything")[0]["body"] == "B"
+    assert made == [3]
@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
 import sys
+import pytest
 import BlackFeather.campaign_manager as campaign_manager
 sys.modules.setdefault("campaign_manager", campaign_manager)
 import BlackFeather.world_memory as world_memory
@@ -77,3 +78,107 @@ def test_link_entities(tmp_path, monkeypatch):
     data = json.loads(file_path.read_text())
     assert id_b in data[id_a]["related_to"]
     assert id_a in data[id_b]["related_to"]
+
+
+def test_facet_queries_follow_updates(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    wm = WorldMemoryManager("Arc Test")
+
+    id_guild = wm.add_memory_entry({"type": "faction", "name": "Harbor Guild", "tags": ["port"]})
+    id_crown = wm.add_memory_entry({"type": "faction", "name": "Crown", "tags": ["capital"]})
+    id_city = wm.add_memory_entry({"type": "city", "name": "Haven", "tags": ["port"]})
+
+    assert [e["id"] for e in wm.facet_query("type=faction AND tag=port")] == [id_guild]
+    assert [e["id"] for e in wm.facet_query("tag=port OR tag=capital AND type=faction")] == [id_guild, id_city, id_crown]
+    assert wm.facet_counts()["types"] == {"faction": 2, "city": 1}
+
+    wm.update_memory_entry(id_crown, {"tags": ["port"]})
+    assert wm.find_ids(type="faction", tags=["port"]) == [id_guild, id_crown]
+    assert "capital" not in wm.facet_counts()["tags"]
+
+
+def test_facet_index_rebuilds_after_external_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    wm = WorldMemoryManager("Arc Test", hidden=True)
+    wm.add_memory_entry({"type": "villain", "name": "Zara"})
+    file_path = Path(tmp_path) / "Arc Test" / "world_memory_dm.json"
+    data = json.loads(file_path.read_text())
+    data["x"] = {"id": "x", "type": "villain", "name": "Vex", "tags": []}
+    file_path.write_text(json.dumps(data))
+    assert len(WorldMemoryManager("Arc Test", hidden=True).find_ids(type="villain")) == 2
+
+
+def test_digests_regenerate_only_changed_types(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    wm = WorldMemoryManager("Digest")
+    wm.add_memory_entry({"type": "city", "name": "Haven", "description": "Port city"})
+    wm.add_memory_entry({"type": "faction", "name": "Dock Union"})
+    digests = wm.digests()
+    assert digests["city"] == "City (1): Haven (Port city)."
+
+    calls = []
+    original = world_memory.summarize_type
+    monkeypatch.setattr(world_memory, "summarize_type", lambda t, e, n: calls.append(t) or original(t, e, n))
+    wm.add_memory_entry({"type": "city", "name": "Blackmoor"})
+    digests = wm.digests()
+    assert calls == ["city"]
+    assert "Blackmoor" in digests["city"]
+    assert digests["faction"] == "Faction (1): Dock Union."
+
+
+def test_browse_pages_with_cursor(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    wm = WorldMemoryManager("Browse")
+    names = [f"Town {i:02d}" for i in range(12)]
+    ids = {}
+    for i, name in enumerate(names):
+        ids[name] = wm.add_memory_entry(
+            {"type": "city" if i % 2 else "faction", "name": name, "tags": ["port"] if i % 3 == 0 else []}
+        )
+    wm.update_memory_entry(ids["Town 05"], {"name": "Aardvark Hold", "description": "x" * 500})
+
+    # pages come from the browse index without reading world_memory.json
+    wm = WorldMemoryManager("Browse")
+    wm.browse()
+    monkeypatch.setattr(wm, "_load", lambda: (_ for _ in ()).throw(AssertionError("full load")))
+    seen, cursor = [], None
+    while True:
+        page = wm.browse(sort="name", limit=5, cursor=cursor)
+        assert page["total"] == 12
+        seen += [row["name"] for row in page["entries"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["Aardvark Hold", *names[:5], *names[6:]]
+
+    page = wm.browse(type="city", tags=["port"], sort="timestamp", descending=True)
+    assert [row["name"] for row in page["entries"]] == ["Town 09", "Town 03"]
+    assert page["total"] == 2 and page["next_cursor"] is None
+    row = wm.browse(sort="name", limit=1)["entries"][0]
+    assert row["name"] == "Aardvark Hold" and len(row["summary"]) == world_memory.BROWSE_SUMMARY_CHARS
+
+    first = wm.browse(sort="timestamp", descending=True, limit=4)
+    second = wm.browse(sort="timestamp", descending=True, limit=4, cursor=first["next_cursor"])
+    assert [r["name"] for r in first["entries"] + second["entries"]] == [
+        "Town 11", "Town 10", "Town 09", "Town 08", "Town 07", "Town 06", "Aardvark Hold", "Town 04"
+    ]
+    with pytest.raises(ValueError):
+        wm.browse(cursor="not a cursor")
+    with pytest.raises(ValueError):
+        wm.browse(sort="size")
+
+
+def test_entries_are_cached_until_the_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(campaign_manager, "CAMPAIGNS_DIR", tmp_path)
+    monkeypatch.setattr(world_memory, "CAMPAIGNS_DIR", tmp_path)
+    wm = WorldMemoryManager("Cache")
+    wm.add_memory_entry({"type": "city", "name": "Haven"})
+    table = wm.entries()
+    assert wm.entries() is table
+    assert [e["name"] for e in table.values()] == ["Haven"]
+    wm.add_memory_entry({"type": "city", "name": "Blackmoor"})
+    assert [e["name"] for e in wm.entries().values()] == ["Haven", "Blackmoor"]
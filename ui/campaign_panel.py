@@ -12,9 +12,10 @@ def campaign_management_panel(initialize_state):
             with col1:
                 if st.button("Load", key="load_campaign_btn"):
                     st.session_state.campaign_name = selected
-                    for key in ("campaign_manager", "player_manager", "world_memory"):
+                    for key in ("campaign_manager", "campaign_data", "player_manager", "world_memory"):
+                        st.session_state.pop(key, None)
+                    for key in ("session", "entity_spotter"):
                         st.session_state.pop(key, None)
-                    st.session_state.history = []
                     if st.session_state.get("player_name"):
                         initialize_state(selected, st.session_state["player_name"])
                     st.experimental_rerun()
@@ -24,6 +25,7 @@ def campaign_management_panel(initialize_state):
                     if st.session_state.get("campaign_name") == selected:
                         for key in (
                             "campaign_manager",
+                            "campaign_data",
                             "player_manager",
                             "world_memory",
                             "campaign_name",
@@ -0,0 +1,38 @@
+import streamlit as st
+from party import CURRENCIES, PartyUpdate, apply_party_update
+
+
+def party_panel():
+    """Render a form that updates several players at once."""
+    if "campaign_manager" not in st.session_state:
+        return
+    cm = st.session_state.campaign_manager
+    active = cm._load_quests().get("active", {})
+    with st.expander("Party Update"):
+        with st.form("party_update"):
+            players = st.multiselect("Players", cm.list_players())
+            cols = st.columns(len(CURRENCIES))
+            deltas = {
+                coin: cols[i].number_input(coin.title(), value=0, step=1, key=f"party_{coin}")
+                for i, coin in enumerate(CURRENCIES)
+            }
+            xp = st.number_input("Experience", value=0, step=1)
+            items = st.text_input("Give items (comma separated)")
+            quests = st.multiselect(
+                "Complete quests",
+                list(active),
+                format_func=lambda qid: active[qid].get("title", qid),
+            )
+            submitted = st.form_submit_button("Apply to party")
+            if submitted:
+                update = PartyUpdate(
+                    currency={c: int(v) for c, v in deltas.items() if v},
+                    experience=int(xp),
+                    add_items=[i.strip() for i in items.split(",") if i.strip()],
+                    complete_quests=quests,
+                )
+                try:
+                    apply_party_update(cm, players, update)
+                    st.experimental_rerun()
+                except ValueError as e:
+                    st.error(str(e))
@@ -1,13 +1,67 @@
 import streamlit as st
-from world_memory import ALLOWED_TYPES
+from world_memory import ALLOWED_TYPES, BROWSE_SORTS
+
+PAGE_SIZES = [10, 25, 50]
+
+
+def _browse_controls():
+    """Render filters and return ``(filters, page_size)``."""
+    cols = st.columns(4)
+    entry_type = cols[0].selectbox("Type", ["All"] + ALLOWED_TYPES, key="wm_type")
+    tags = cols[1].text_input("Tags (comma separated)", key="wm_tags")
+    sort = cols[2].selectbox("Sort by", BROWSE_SORTS, key="wm_sort")
+    page_size = cols[3].selectbox("Per page", PAGE_SIZES, key="wm_page_size")
+    filters = {
+        "type": None if entry_type == "All" else entry_type,
+        "tags": [t.strip() for t in tags.split(",") if t.strip()],
+        "sort": sort,
+        # newest first when sorting by time
+        "descending": sort == "timestamp",
+    }
+    return filters, page_size
 
 
 def world_memory_panel():
-    """Render world memory preview and add-entry form."""
-    st.header("World Memory Preview")
+    """Render the paginated world memory browser and add-entry form."""
+    st.header("World Memory")
     if "world_memory" in st.session_state:
-        wm_data = list(st.session_state.world_memory._load().values())[:5]
-        st.json(wm_data)
+        wm = st.session_state.world_memory
+        filters, page_size = _browse_controls()
+        # cursors of the pages before the current one; reset when filters change
+        state_key = (repr(filters), page_size)
+        if st.session_state.get("wm_browse_key") != state_key:
+            st.session_state.wm_browse_key = state_key
+            st.session_state.wm_cursors = [None]
+        cursors = st.session_state.wm_cursors
+        page = wm.browse(limit=page_size, cursor=cursors[-1], **filters)
+
+        st.caption(f"{page['total']} entries, page {len(cursors)}")
+        if page["entries"]:
+            st.dataframe(
+                [
+                    {
+                        "Name": row["name"],
+                        "Type": row["type"],
+                        "Tags": ", ".join(row["tags"]),
+                        "Added": row["timestamp"][:10],
+                        "Summary": row["summary"],
+                    }
+                    for row in page["entries"]
+                ],
+                use_container_width=True,
+            )
+            labels = {row["id"]: f"{row['name']} ({row['type']})" for row in page["entries"]}
+            selected = st.selectbox("Show entry", [None] + list(labels), format_func=lambda i: labels.get(i, "-"))
+            if selected:
+                st.json(wm.get_entry(selected))
+
+        prev_col, next_col = st.columns(2)
+        if prev_col.button("Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.experimental_rerun()
+        if next_col.button("Next", disabled=page["next_cursor"] is None):
+            cursors.append(page["next_cursor"])
+            st.experimental_rerun()
 
         with st.expander("Add World Memory Entry"):
             with st.form("add_memory"):
@@ -17,7 +71,6 @@ def world_memory_panel():
                 tags = st.text_input("Tags (comma separated)")
                 submitted = st.form_submit_button("Add")
                 if submitted:
-                    wm = st.session_state.world_memory
                     try:
                         wm.add_memory_entry(
                             {
@@ -0,0 +1,175 @@
+"""Revision history for campaign files as a chain of structural diffs.
+
+Every save of a versioned file appends one diff against the previous
+content to ``history/<file>/segment_<n>.jsonl``. Every ``checkpoint_every``
+revisions the full state is written to ``checkpoint_<n>.json`` and a new
+segment starts, so reading any revision loads one checkpoint and applies at
+most ``checkpoint_every`` diffs.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+HISTORY_DIR = "history"
+CHECKPOINT_EVERY = 20
+
+# ``["set", [key, ...], value]`` or ``["del", [key, ...]]``
+Op = List[Any]
+
+_MISSING = object()
+_CHECKPOINT_RE = re.compile(r"^checkpoint_(\d+)\.json$")
+
+
+def diff(old: Any, new: Any, path: List[str] | None = None) -> List[Op]:
+    """Return the operations turning ``old`` into ``new``.
+
+    Dictionaries are compared key by key; any other changed value (lists
+    included) is replaced as a whole.
+    """
+    path = path or []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[Op] = []
+        for key in old:
+            if key not in new:
+                ops.append(["del", path + [key]])
+        for key, value in new.items():
+            before = old.get(key, _MISSING)
+            if before is _MISSING:
+                ops.append(["set", path + [key], value])
+            elif before != value:
+                ops.extend(diff(before, value, path + [key]))
+        return ops
+    if old != new:
+        return [["set", path, new]]
+    return []
+
+
+def apply_diff(state: Any, ops: List[Op]) -> Any:
+    """Apply ``ops`` to ``state`` in place and return the result."""
+    for op in ops:
+        kind, path = op[0], op[1]
+        if not path:
+            state = copy.deepcopy(op[2]) if kind == "set" else {}
+            continue
+        target = state
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        if kind == "set":
+            target[path[-1]] = copy.deepcopy(op[2])
+        else:
+            target.pop(path[-1], None)
+    return state
+
+
+class FileHistory:
+    """Revision history of one JSON file inside a campaign."""
+
+    def __init__(self, campaign_path: str, filename: str, checkpoint_every: int = CHECKPOINT_EVERY) -> None:
+        self.filename = filename
+        self.checkpoint_every = checkpoint_every
+        stem = os.path.splitext(filename)[0].replace(os.sep, "_")
+        self.path = os.path.join(campaign_path, HISTORY_DIR, stem)
+
+    def _checkpoints(self) -> List[int]:
+        if not os.path.isdir(self.path):
+            return []
+        revs = []
+        for name in os.listdir(self.path):
+            match = _CHECKPOINT_RE.match(name)
+            if match:
+                revs.append(int(match.group(1)))
+        return sorted(revs)
+
+    def _segment(self, base: int) -> str:
+        return os.path.join(self.path, f"segment_{base}.jsonl")
+
+    def _read_segment(self, base: int) -> List[Dict[str, Any]]:
+        return self._scan_segment(base)[0]
+
+    def _scan_segment(self, base: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Return the complete records of a segment and the offset after them."""
+        records: List[Dict[str, Any]] = []
+        end = 0
+        path = self._segment(base)
+        if not os.path.exists(path):
+            return records, end
+        with open(path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn final line from an interrupted write
+                try:
+                    records.append(json.loads(raw))
+                except ValueError:
+                    break
+                end += len(raw)
+        return records, end
+
+    def _write_checkpoint(self, rev: int, state: Any) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, f"checkpoint_{rev}.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+
+    def head(self) -> int:
+        """Return the latest revision number, or -1 without history."""
+        checkpoints = self._checkpoints()
+        if not checkpoints:
+            return -1
+        return checkpoints[-1] + len(self._read_segment(checkpoints[-1]))
+
+    def record(self, old: Any, new: Any, checkpoint: Optional[Callable[[], Any]] = None) -> int:
+        """Store the change from ``old`` to ``new`` and return its revision.
+
+        The first call also stores ``old`` as revision 0. Unchanged content
+        does not create a revision. When ``old`` and ``new`` only hold the
+        changed part of the file, ``checkpoint`` must return the whole new
+        content; it is only called when a checkpoint is due.
+        """
+        checkpoints = self._checkpoints()
+        if not checkpoints:
+            self._write_checkpoint(0, old)
+            checkpoints = [0]
+        base = checkpoints[-1]
+        records, end = self._scan_segment(base)
+        head = base + len(records)
+        ops = diff(old, new)
+        if not ops:
+            return head
+        rev = head + 1
+        record = {"rev": rev, "timestamp": datetime.now(timezone.utc).isoformat(), "ops": ops}
+        with open(self._segment(base), "ab") as f:
+            if f.tell() != end:
+                f.truncate(end)  # drop a torn line so the record stays readable
+            f.write((json.dumps(record) + "\n").encode("utf-8"))
+        if rev - base >= self.checkpoint_every:
+            self._write_checkpoint(rev, new if checkpoint is None else checkpoint())
+        return rev
+
+    def state_at(self, rev: int) -> Any:
+        """Return the file content as of revision ``rev``."""
+        checkpoints = [c for c in self._checkpoints() if c <= rev]
+        if not checkpoints or rev > self.head():
+            raise ValueError(f"Unknown revision {rev} of {self.filename}")
+        base = checkpoints[-1]
+        with open(os.path.join(self.path, f"checkpoint_{base}.json"), "r", encoding="utf-8") as f:
+            state = json.load(f)
+        for record in self._read_segment(base):
+            if record["rev"] > rev:
+                break
+            state = apply_diff(state, record["ops"])
+        return state
+
+    def revisions(self) -> List[Dict[str, Any]]:
+        """Return ``rev``, ``timestamp`` and change count of every revision."""
+        result = [{"rev": 0, "timestamp": "", "changes": 0}] if self._checkpoints() else []
+        for base in self._checkpoints():
+            for record in self._read_segment(base):
+                result.append({"rev": record["rev"], "timestamp": record["timestamp"], "changes": len(record["ops"])})
+        return result
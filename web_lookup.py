@@ -0,0 +1,205 @@
+"""Cached, time-bounded web lookups for lore questions.
+
+:class:`WebLookup` answers queries from a persistent TTL cache and only
+calls the backend for misses. Backend calls run on a shared thread pool and
+are abandoned when the per-call deadline passes; a stale cached answer is
+returned instead when one exists. :class:`StubBackend` answers offline for
+tests and air-gapped servers.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List
+
+from .campaign_manager import CAMPAIGNS_DIR
+from .config import CONFIG
+
+# ``backend(query, max_results)`` returns dicts with title, body and href.
+Backend = Callable[[str, int], List[Dict[str, str]]]
+
+CACHE_FILE = os.path.join(".cache", "web_lookup.json")
+
+
+class DDGSBackend:
+    """``duckduckgo_search`` backend reusing up to ``pool_size`` clients.
+
+    Clients get a request ``timeout``: a call that already runs cannot be
+    cancelled, so without one a hung search would hold its worker and slot.
+    """
+
+    def __init__(self, pool_size: int = 4, timeout: float = 5.0) -> None:
+        from duckduckgo_search import DDGS
+
+        self._factory = lambda: DDGS(timeout=max(1, math.ceil(timeout)))
+        self._pool: "queue.Queue[Any]" = queue.Queue(maxsize=pool_size)
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def __call__(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        with self._slots:
+            try:
+                client = self._pool.get_nowait()
+            except queue.Empty:
+                client = self._factory()
+            try:
+                results = client.text(query, max_results=max_results) or []
+            finally:
+                self._pool.put_nowait(client)
+        return [
+            {"title": r.get("title", ""), "body": r.get("body", ""), "href": r.get("href", "")}
+            for r in results
+        ]
+
+
+class StubBackend:
+    """Offline backend answering only from the canned ``results``."""
+
+    def __init__(self, results: Dict[str, List[Dict[str, str]]] | None = None, delay: float = 0.0) -> None:
+        self.results = results or {}
+        self.delay = delay
+        self.calls: List[str] = []
+
+    def __call__(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        self.calls.append(query)
+        if self.delay:
+            time.sleep(self.delay)
+        return self.results.get(query, [])[:max_results]
+
+
+def _key(query: str, max_results: int) -> str:
+    return f"{max_results}:{' '.join(query.lower().split())}"
+
+
+class WebLookup:
+    """Web search with a persistent TTL cache, deadlines and fan-out."""
+
+    def __init__(
+        self,
+        backend: Backend | None = None,
+        cache_path: str | None = None,
+        ttl: float = 86400.0,
+        deadline: float = 5.0,
+        max_workers: int = 4,
+    ) -> None:
+        if backend is None:
+            try:
+                backend = DDGSBackend(pool_size=max_workers, timeout=deadline)
+            except ImportError:
+                backend = StubBackend()
+        self.backend = backend
+        self.cache_path = cache_path or os.path.join(CAMPAIGNS_DIR, CACHE_FILE)
+        self.ttl = ttl
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="web")
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except ValueError:
+            return {}
+
+    def _save_cache(self) -> None:
+        """Write the cache, dropping expired entries. Hold ``_lock``."""
+        now = time.time()
+        self._cache = {k: v for k, v in self._cache.items() if now - v["time"] < self.ttl}
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp, self.cache_path)
+
+    def _cached(self, key: str, fresh_only: bool = True) -> List[Dict[str, str]] | None:
+        with self._lock:
+            hit = self._cache.get(key)
+        if hit is None or (fresh_only and time.time() - hit["time"] >= self.ttl):
+            return None
+        return hit["results"]
+
+    def search_many(
+        self,
+        queries: Iterable[str],
+        max_results: int = 3,
+        deadline: float | None = None,
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """Look up ``queries`` concurrently within one shared deadline.
+
+        Queries that miss the deadline or fail get their stale cached
+        results, or an empty list.
+        """
+        queries = list(dict.fromkeys(queries))
+        results: Dict[str, List[Dict[str, str]]] = {}
+        pending = {}
+        for query in queries:
+            cached = self._cached(_key(query, max_results))
+            if cached is not None:
+                results[query] = cached
+            else:
+                pending[self._executor.submit(self.backend, query, max_results)] = query
+        if pending:
+            done, not_done = wait(pending, timeout=self.deadline if deadline is None else deadline)
+            for future in not_done:
+                future.cancel()
+            fetched = {}
+            for future in done:
+                # empty answers are not cached so a later lookup can retry
+                if future.exception() is None and future.result():
+                    fetched[pending[future]] = future.result()
+            if fetched:
+                with self._lock:
+                    for query, found in fetched.items():
+                        self._cache[_key(query, max_results)] = {"time": time.time(), "results": found}
+                    self._save_cache()
+            for query in pending.values():
+                if query in fetched:
+                    results[query] = fetched[query]
+                else:
+                    results[query] = self._cached(_key(query, max_results), fresh_only=False) or []
+        return {query: results[query] for query in queries}
+
+    def search(self, query: str, max_results: int = 3, deadline: float | None = None) -> List[Dict[str, str]]:
+        """Return up to ``max_results`` results for ``query``."""
+        return self.search_many([query], max_results, deadline)[query]
+
+    @staticmethod
+    def save_to_memory(
+        wm,
+        result: Dict[str, str],
+        entry_type: str = "event",
+        tags: Iterable[str] = ("web",),
+    ) -> str:
+        """Store a search result as a ``WorldMemoryManager`` entry and return its ID."""
+        description = result.get("body", "")
+        if result.get("href"):
+            description += f" (source: {result['href']})"
+        return wm.add_memory_entry(
+            {
+                "type": entry_type,
+                "name": result.get("title") or result.get("body", "")[:40],
+                "description": description,
+                "tags": list(tags),
+            }
+        )
+
+
+_LOOKUP: WebLookup | None = None
+_LOOKUP_LOCK = threading.Lock()
+
+
+def get_lookup() -> WebLookup:
+    """Return the process-wide lookup service configured from :data:`CONFIG`."""
+    global _LOOKUP
+    with _LOOKUP_LOCK:
+        if _LOOKUP is None:
+            _LOOKUP = WebLookup(ttl=CONFIG.web_cache_ttl, deadline=CONFIG.web_lookup_timeout)
+        return _LOOKUP
@@ -1,10 +1,14 @@
 """World memory management for a TTRPG campaign engine."""
 
+import base64
+import binascii
+import bisect
+import copy
 import json
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
 
 # Allowed entity types for validation
 # ``villain`` and ``plot`` are used internally for DM information.
@@ -18,7 +22,26 @@ ALLOWED_TYPES = [
     "plot",
 ]
 
-from .campaign_manager import CAMPAIGNS_DIR, deep_update
+from .campaign_manager import CAMPAIGNS_DIR, deep_update, notify_change
+from .dedupe import DUPLICATE_THRESHOLD, LSHIndex
+from .maintenance import search_candidates
+from .prompt_builder import summarize_type
+from .records import RecordTable, WorldEntry
+from .sharding import is_sharded, open_store, read_entities
+
+# Folder for derived index files inside each campaign
+INDEX_DIR = "indexes"
+
+# Orders offered by :meth:`WorldMemoryManager.browse`
+BROWSE_SORTS = ("timestamp", "name", "type")
+# Description characters kept per row of the browse index
+BROWSE_SUMMARY_CHARS = 160
+# Entry types whose full entries are also kept in the pinned index, so
+# ``get_entry`` serves them without reading the data file
+PINNED_TYPES = ("villain",)
+
+# ``(before, after)`` snapshots of a changed entry; ``None`` for add/delete
+EntryChange = Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
 
 
 class WorldMemoryManager:
@@ -30,23 +53,437 @@ class WorldMemoryManager:
         self.path = os.path.join(CAMPAIGNS_DIR, campaign_name)
         os.makedirs(self.path, exist_ok=True)
         filename = "world_memory_dm.json" if hidden else "world_memory.json"
+        self.filename = filename
         self.file_path = os.path.join(self.path, filename)
-        if not os.path.exists(self.file_path):
+        stem = os.path.splitext(filename)[0]
+        self.facet_path = os.path.join(self.path, INDEX_DIR, f"{stem}.facets.json")
+        self.lsh_path = os.path.join(self.path, INDEX_DIR, f"{stem}.lsh.json")
+        self.digest_path = os.path.join(self.path, INDEX_DIR, f"{stem}.digests.json")
+        self.browse_path = os.path.join(self.path, INDEX_DIR, f"{stem}.browse.json")
+        self.pinned_path = os.path.join(self.path, INDEX_DIR, f"{stem}.pinned.json")
+        self._index_cache: Dict[str, Dict[str, Any]] = {}
+        # sort field -> (browse index stamp, sorted keys, IDs in key order)
+        self._order_cache: Dict[str, Tuple[List[int], List[Tuple[str, str]], List[str]]] = {}
+        # (source stamp, all entries) for :meth:`entries`
+        self._entries: Tuple[List[int], RecordTable] | None = None
+        if not os.path.exists(self.file_path) and not is_sharded(self.path, filename):
             with open(self.file_path, "w", encoding="utf-8") as f:
                 json.dump({}, f, indent=2)
 
     def _load(self) -> Dict[str, Any]:
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_entities(self.path, self.filename)
 
-    def _save(self, data: Dict[str, Any]) -> None:
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+    def storage_bytes(self) -> int:
+        """Return the size of the data file, or of all shards when sharded."""
+        store = open_store(self.path, self.filename)
+        return store.size_bytes() if store is not None else os.path.getsize(self.file_path)
 
-    def add_memory_entry(self, entry: Dict[str, Any]) -> str:
-        """Add a new memory entry and return its ID."""
+    def _save(
+        self,
+        data: Dict[str, Any],
+        changes: Iterable[EntryChange] = (),
+        rebuild: bool = False,
+    ) -> None:
+        """Write ``data`` and apply ``changes`` to the derived indexes.
+
+        Indexes that are stale (or all of them with ``rebuild``) are rebuilt
+        from ``data`` instead.
+        """
+        changes = list(changes)
+        facets = None if rebuild else self._read_index(self.facet_path)
+        lsh_state = None if rebuild else self._read_index(self.lsh_path)
+        lsh = LSHIndex.from_dict(lsh_state) if lsh_state else None
+        browse = None if rebuild else self._read_index(self.browse_path)
+        pinned = None if rebuild else self._read_index(self.pinned_path)
+        for before, after in changes:
+            if browse is not None:
+                if before:
+                    browse["rows"].pop(before["id"], None)
+                if after:
+                    browse["rows"][after["id"]] = self._browse_row(after)
+            if pinned is not None:
+                if before:
+                    pinned["rows"].pop(before["id"], None)
+                if after and after.get("type") in PINNED_TYPES:
+                    pinned["rows"][after["id"]] = after
+            if facets is not None:
+                if before:
+                    self._remove_facets(facets, before)
+                if after:
+                    self._add_facets(facets, after)
+            if lsh is not None:
+                if before:
+                    lsh.remove(before["id"])
+                if after:
+                    lsh.add(after)
+        if facets is None:
+            facets = self._build_facets(data)
+        store = open_store(self.path, self.filename)
+        if store is None:
+            with open(self.file_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        elif changes and not rebuild:
+            # only the shards holding changed entries are rewritten
+            ids = {(after or before)["id"] for before, after in changes}
+            store.update_many({entry_id: data.get(entry_id) for entry_id in ids})
+        else:
+            store.replace_all(data)
+        self._write_index(self.facet_path, facets)
+        self._write_index(self.browse_path, browse or self._build_browse(data))
+        self._write_index(self.pinned_path, pinned or self._build_pinned(data))
+        if lsh is not None or rebuild:
+            self._write_index(self.lsh_path, (lsh or self._build_lsh(data)).to_dict())
+        ops = [
+            ((after or before)["id"], "add" if before is None else "delete" if after is None else "update")
+            for before, after in changes
+        ]
+        notify_change(self.path, os.path.basename(self.file_path), ops or None)
+
+    # ------------------------------------------------------------------
+    # Derived index files
+    # ------------------------------------------------------------------
+    def _source_stamp(self) -> List[int]:
+        store = open_store(self.path, self.filename)
+        if store is not None:
+            return list(store.stamp())
+        stat = os.stat(self.file_path)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _read_index(self, path: str) -> Dict[str, Any] | None:
+        """Return the index at ``path`` if it matches the data file."""
+        stamp = self._source_stamp()
+        cached = self._index_cache.get(path)
+        if cached is not None and cached.get("source_stamp") == stamp:
+            return cached
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except ValueError:
+                return None
+            if index.get("source_stamp") == stamp:
+                self._index_cache[path] = index
+                return index
+        return None
+
+    def _write_index(self, path: str, index: Dict[str, Any]) -> None:
+        index["source"] = os.path.basename(self.file_path)
+        index["source_stamp"] = self._source_stamp()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, path)
+        self._index_cache[path] = index
+
+    # ------------------------------------------------------------------
+    # Facet index (type and tag -> entry IDs)
+    #
+    # ``generations`` counts changes per type; together with ``epoch``,
+    # which is renewed on every rebuild, it tells cached digests whether
+    # entries of their type changed.
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _bump_generation(facets: Dict[str, Any], entry_type: str) -> None:
+        generations = facets.setdefault("generations", {})
+        generations[entry_type] = generations.get(entry_type, 0) + 1
+
+    @classmethod
+    def _add_facets(cls, facets: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        entry_id = entry["id"]
+        cls._bump_generation(facets, str(entry.get("type")))
+        ids = facets["types"].setdefault(str(entry.get("type")), [])
+        if entry_id not in ids:
+            ids.append(entry_id)
+        for tag in dict.fromkeys(entry.get("tags") or []):
+            ids = facets["tags"].setdefault(str(tag), [])
+            if entry_id not in ids:
+                ids.append(entry_id)
+
+    @classmethod
+    def _remove_facets(cls, facets: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        entry_id = entry["id"]
+        cls._bump_generation(facets, str(entry.get("type")))
+        for group, keys in (("types", [entry.get("type")]), ("tags", entry.get("tags") or [])):
+            for key in keys:
+                ids = facets[group].get(str(key), [])
+                if entry_id in ids:
+                    ids.remove(entry_id)
+                if not ids:
+                    facets[group].pop(str(key), None)
+
+    def _build_facets(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        facets: Dict[str, Any] = {"types": {}, "tags": {}, "generations": {}, "epoch": uuid.uuid4().hex}
+        for entry_id, entry in data.items():
+            self._add_facets(facets, {**entry, "id": entry.get("id", entry_id)})
+        return facets
+
+    @staticmethod
+    def _build_lsh(data: Dict[str, Any]) -> LSHIndex:
+        return LSHIndex.build({**e, "id": e.get("id", k)} for k, e in data.items())
+
+    def _lsh_index(self, data: Dict[str, Any] | None = None) -> LSHIndex:
+        state = self._read_index(self.lsh_path)
+        if state is not None:
+            return LSHIndex.from_dict(state)
+        lsh = self._build_lsh(self._load() if data is None else data)
+        self._write_index(self.lsh_path, lsh.to_dict())
+        return lsh
+
+    def find_duplicates(self, entry: Dict[str, Any], threshold: float = DUPLICATE_THRESHOLD) -> List[str]:
+        """Return IDs of stored entries that likely duplicate ``entry``."""
+        return self._lsh_index().query(entry, threshold)
+
+    def facets(self) -> Dict[str, Any]:
+        """Return the type/tag index, rebuilding it if the data file changed."""
+        facets = self._read_index(self.facet_path)
+        if facets is None:
+            facets = self._build_facets(self._load())
+            self._write_index(self.facet_path, facets)
+        return facets
+
+    def find_ids(
+        self,
+        type: Optional[str] = None,
+        tags: Iterable[str] = (),
+        any_tags: Iterable[str] = (),
+        exclude_tags: Iterable[str] = (),
+    ) -> List[str]:
+        """Return IDs matching ``type`` AND all ``tags`` AND one of ``any_tags``.
+
+        Entries carrying any of ``exclude_tags`` are left out. Results keep
+        insertion order.
+        """
+        facets = self.facets()
+        if type is not None:
+            candidates: List[str] = list(facets["types"].get(type, []))
+        else:
+            candidates = [i for ids in facets["types"].values() for i in ids]
+        keep: Optional[Set[str]] = None
+        for tag in tags:
+            ids = set(facets["tags"].get(tag, []))
+            keep = ids if keep is None else keep & ids
+        any_tags = list(any_tags)
+        if any_tags:
+            ids = set().union(*(facets["tags"].get(t, []) for t in any_tags))
+            keep = ids if keep is None else keep & ids
+        drop = set().union(*(facets["tags"].get(t, []) for t in exclude_tags))
+        return [i for i in candidates if (keep is None or i in keep) and i not in drop]
+
+    def facet_query(self, expression: str) -> List[Dict[str, Any]]:
+        """Return entries matching a boolean facet expression.
+
+        Terms are ``type=<name>`` or ``tag=<name>``, optionally prefixed by
+        ``NOT``, joined with ``AND``; ``OR`` separates alternatives, e.g.
+        ``"type=faction AND tag=port OR type=city AND NOT tag=ruined"``.
+        """
+        matched: Dict[str, None] = {}
+        for clause in expression.split(" OR "):
+            kwargs: Dict[str, Any] = {"tags": [], "exclude_tags": []}
+            for term in clause.split(" AND "):
+                term = term.strip()
+                negate = term.startswith("NOT ")
+                key, _, value = term[4:].strip().partition("=") if negate else term.partition("=")
+                key, value = key.strip(), value.strip()
+                if key == "type" and not negate:
+                    kwargs["type"] = value
+                elif key == "tag":
+                    kwargs["exclude_tags" if negate else "tags"].append(value)
+                else:
+                    raise ValueError(f"Unsupported facet term: {term}")
+            matched.update(dict.fromkeys(self.find_ids(**kwargs)))
+        return self.get_entries(matched)
+
+    def facet_counts(self, ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        """Return entry counts per type and per tag, optionally within ``ids``."""
+        facets = self.facets()
+        subset = None if ids is None else set(ids)
+        counts: Dict[str, Dict[str, int]] = {}
+        for group in ("types", "tags"):
+            counts[group] = {}
+            for key, members in facets[group].items():
+                n = len(members) if subset is None else len(subset.intersection(members))
+                if n:
+                    counts[group][key] = n
+        return counts
+
+    def type_generation(self, entry_type: str) -> str:
+        """Return a token that changes whenever entries of ``entry_type`` do."""
+        facets = self.facets()
+        return f"{facets.get('epoch', '')}:{facets.get('generations', {}).get(entry_type, 0)}"
+
+    def digests(self, types: Optional[Iterable[str]] = None, limit: int = 20) -> Dict[str, str]:
+        """Return a short digest per entity type.
+
+        Digests are cached in ``indexes/`` and only regenerated for types
+        whose entries changed since they were written.
+        """
+        wanted = list(types) if types is not None else list(self.facets()["types"])
+        cache: Dict[str, Any] = {}
+        if os.path.exists(self.digest_path):
+            try:
+                with open(self.digest_path, "r", encoding="utf-8") as f:
+                    cache = json.load(f)
+            except ValueError:
+                cache = {}
+        result: Dict[str, str] = {}
+        dirty = False
+        for entry_type in wanted:
+            generation = self.type_generation(entry_type)
+            cached = cache.get(entry_type)
+            if cached is None or cached.get("generation") != generation or cached.get("limit") != limit:
+                entries = self.get_entries(self.find_ids(type=entry_type))
+                cached = {"generation": generation, "limit": limit, "text": summarize_type(entry_type, entries, limit)}
+                cache[entry_type] = cached
+                dirty = True
+            if cached["text"]:
+                result[entry_type] = cached["text"]
+        if dirty:
+            os.makedirs(os.path.dirname(self.digest_path), exist_ok=True)
+            tmp = f"{self.digest_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp, self.digest_path)
+        return result
+
+    # ------------------------------------------------------------------
+    # Browse index (one short row per entry, for paging without the data)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _browse_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": entry["id"],
+            "type": entry.get("type", ""),
+            "name": entry.get("name", ""),
+            "tags": entry.get("tags", []),
+            "timestamp": entry.get("timestamp", ""),
+            "summary": entry.get("description", "")[:BROWSE_SUMMARY_CHARS],
+        }
+
+    def _build_browse(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"rows": {k: self._browse_row({**e, "id": e.get("id", k)}) for k, e in data.items()}}
+
+    @staticmethod
+    def _build_pinned(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "rows": {
+                k: {**e, "id": e.get("id", k)} for k, e in data.items() if e.get("type") in PINNED_TYPES
+            }
+        }
+
+    def _browse_index(self) -> Dict[str, Any]:
+        browse = self._read_index(self.browse_path)
+        if browse is None:
+            browse = self._build_browse(self._load())
+            self._write_index(self.browse_path, browse)
+        return browse
+
+    @staticmethod
+    def _sort_key(row: Dict[str, Any], sort: str) -> Tuple[str, str]:
+        if sort == "type":
+            value = f"{row['type']}\x00{row['name'].lower()}"
+        elif sort == "name":
+            value = row["name"].lower()
+        else:
+            value = row["timestamp"]
+        return value, row["id"]
+
+    def _ordered(self, sort: str) -> Tuple[Dict[str, Any], List[Tuple[str, str]], List[str]]:
+        browse = self._browse_index()
+        cached = self._order_cache.get(sort)
+        if cached is None or cached[0] != browse["source_stamp"]:
+            keys = sorted(self._sort_key(row, sort) for row in browse["rows"].values())
+            cached = self._order_cache[sort] = (list(browse["source_stamp"]), keys, [k[1] for k in keys])
+        return browse, cached[1], cached[2]
+
+    def browse(
+        self,
+        type: Optional[str] = None,
+        tags: Iterable[str] = (),
+        sort: str = "timestamp",
+        descending: bool = False,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Return one page of entry rows matching ``type`` and all ``tags``.
+
+        Rows hold id, type, name, tags, timestamp and a short ``summary`` and
+        come from the browse index, so the data file is not read. Pass the
+        returned ``next_cursor`` to get the following page; it is ``None`` on
+        the last page. Use :meth:`get_entry` for the full entry.
+        """
+        if sort not in BROWSE_SORTS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        tags = list(tags)
+        matches = set(self.find_ids(type=type, tags=tags)) if type is not None or tags else None
+        browse, keys, ids = self._ordered(sort)
+        if cursor is None:
+            start = len(keys) - 1 if descending else 0
+        else:
+            try:
+                after = tuple(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii"))))
+            except (ValueError, TypeError, binascii.Error):
+                raise ValueError("Invalid cursor") from None
+            if len(after) != 2 or not all(isinstance(part, str) for part in after):
+                raise ValueError("Invalid cursor")
+            start = bisect.bisect_left(keys, after) - 1 if descending else bisect.bisect_right(keys, after)
+        step = -1 if descending else 1
+        page: List[int] = []
+        position = start
+        # collect one extra match to learn whether another page follows
+        while 0 <= position < len(ids) and len(page) <= limit:
+            if matches is None or ids[position] in matches:
+                page.append(position)
+            position += step
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = base64.urlsafe_b64encode(json.dumps(keys[page[-1]]).encode("utf-8")).decode("ascii")
+        return {
+            "entries": [browse["rows"][ids[p]] for p in page],
+            "next_cursor": next_cursor,
+            "total": len(keys) if matches is None else len(matches),
+        }
+
+    def entries(self) -> RecordTable:
+        """Return every entry as a read-only :class:`records.RecordTable`.
+
+        The table is kept in memory until the data file changes.
+        """
+        stamp = self._source_stamp()
+        if self._entries is None or self._entries[0] != stamp:
+            self._entries = (stamp, RecordTable.from_mapping(self._load(), WorldEntry))
+        return self._entries[1]
+
+    def get_entry(self, entry_id: str) -> Dict[str, Any]:
+        """Return a single entry or an empty dict.
+
+        Entries of :data:`PINNED_TYPES` come from the pinned index without
+        reading the data file.
+        """
+        pinned = self._read_index(self.pinned_path)
+        if pinned is not None and entry_id in pinned["rows"]:
+            return copy.deepcopy(pinned["rows"][entry_id])
+        store = open_store(self.path, self.filename)
+        if store is not None:
+            return store.get(entry_id, {})
         data = self._load()
+        if pinned is None:
+            self._write_index(self.pinned_path, self._build_pinned(data))
+        return data.get(entry_id, {})
+
+    def get_entries(self, entry_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Return the entries for ``entry_ids`` in the given order."""
+        store = open_store(self.path, self.filename)
+        entry_ids = list(entry_ids)
+        data = store.get_many(entry_ids) if store is not None else self._load()
+        return [data[i] for i in entry_ids if i in data]
 
+    @staticmethod
+    def build_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate ``entry`` and return the stored form with a new ID."""
         required = ["type", "name"]
         if any(not entry.get(k) for k in required):
             raise ValueError("Missing required fields: type and name")
@@ -55,7 +492,7 @@ class WorldMemoryManager:
             raise ValueError(f"Invalid type: {entry['type']}")
 
         entry_id = str(uuid.uuid4())
-        entry_obj = {
+        return {
             "id": entry_id,
             "type": entry.get("type", ""),
             "name": entry.get("name", ""),
@@ -64,17 +501,40 @@ class WorldMemoryManager:
             "related_to": entry.get("related_to", []),
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
-        data[entry_id] = entry_obj
-        self._save(data)
-        return entry_id
 
-    def search_memory(self, query: str, type_filter: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Search memory entries by keyword and optional type."""
+    def add_memory_entry(self, entry: Dict[str, Any]) -> str:
+        """Add a new memory entry and return its ID.
+
+        Likely near-duplicates already stored are listed in the entry's
+        ``possible_duplicates`` field.
+        """
         data = self._load()
+        entry_obj = self.build_entry(entry)
+        duplicates = self._lsh_index(data).query(entry_obj)
+        if duplicates:
+            entry_obj["possible_duplicates"] = duplicates
+        data[entry_obj["id"]] = entry_obj
+        self._save(data, [(None, entry_obj)])
+        return entry_obj["id"]
+
+    def search_memory(self, query: str, type_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search memory entries by keyword and optional type.
+
+        Only the entries the background search index points at are read when
+        the index is current.
+        """
+        candidates = search_candidates(self.path, self.filename, query)
+        if type_filter:
+            ids = self.find_ids(type=type_filter)
+            if candidates is not None:
+                ids = [i for i in ids if i in set(candidates)]
+            entries = self.get_entries(ids)
+        elif candidates is not None:
+            entries = self.get_entries(candidates) if candidates else []
+        else:
+            entries = list(self._load().values())
         results: List[Dict[str, Any]] = []
-        for entry in data.values():
-            if type_filter and entry.get("type") != type_filter:
-                continue
+        for entry in entries:
             haystack = json.dumps(entry).lower()
             if query.lower() in haystack:
                 results.append(entry)
@@ -85,8 +545,10 @@ class WorldMemoryManager:
         data = self._load()
         if entry_id not in data:
             return False
+        before = {**data[entry_id], "id": entry_id}
         deep_update(data[entry_id], updates)
-        self._save(data)
+        after = {**data[entry_id], "id": entry_id}
+        self._save(data, [(before, after)])
         return True
 
     def link_entities(self, entry_id: str, related_id: str, bidirectional: bool = False) -> bool:
@@ -94,6 +556,8 @@ class WorldMemoryManager:
         data = self._load()
         if entry_id not in data or related_id not in data:
             return False
+        changed = [entry_id, related_id] if bidirectional else [entry_id]
+        before = {i: {**data[i], "id": i} for i in changed}
         related = data[entry_id].setdefault("related_to", [])
         if related_id not in related:
             related.append(related_id)
@@ -101,5 +565,5 @@ class WorldMemoryManager:
             back = data[related_id].setdefault("related_to", [])
             if entry_id not in back:
                 back.append(entry_id)
-        self._save(data)
+        self._save(data, [(before[i], {**data[i], "id": i}) for i in changed])
         return True